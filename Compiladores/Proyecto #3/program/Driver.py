@@ -1,49 +1,81 @@
 import sys
-import os
-from antlr4 import FileStream, CommonTokenStream
-from antlr4.error.ErrorListener import ErrorListener
-from CompiscriptLexer import CompiscriptLexer
-from CompiscriptParser import CompiscriptParser
-from semantic.visitor import SemanticVisitor
-from semantic.errors import SemanticError
-
-
-class ThrowingSyntaxErrorListener(ErrorListener):
-    def __init__(self):
-        super().__init__()
-        self.errors = []
-
-    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        self.errors.append(f"[Syntax] line {line}:{column} {msg}")
-
-def run(filepath: str, tac: bool = False, ast: bool = False, mips: bool = False) -> int:
-    parser, tree, syn, visitor = parse_and_semantic(filepath)
-
+from session import CompilationSession
+from codegen.cache import ArtifactCache
+from profiling import PhaseProfiler
+
+
+def run(filepath: str, tac: bool = False, ast: bool = False, mips: bool = False,
+        cache: bool = True, verbose: bool = False, profile: bool = False,
+        profile_json: str = None, optimize=None, stream: bool = False, convention: str = None,
+        simulate: bool = False, peephole: bool = False) -> int:
+    """`optimize`: None/False sin optimizar, True todos los pases, o la lista de pases.
+    `stream`: con `mips`, escribe el .s en modo streaming en lugar de imprimirlo.
+    `convention`: convención de llamada del backend ('registers' por defecto, o 'stack').
+    `peephole`: optimiza el .text generado con las reglas de codegen/peephole.py.
+    `simulate`: ejecuta el MIPS en el simulador e imprime su salida (con `verbose`, también
+    los contadores dinámicos)."""
+    profiler = PhaseProfiler() if (profile or profile_json) else None
+    options = {}
+    if optimize:
+        options['optimize'] = optimize
+    if convention:
+        options['convention'] = convention
+    if peephole:
+        options['peephole'] = True
+    session = CompilationSession.from_file(filepath, cache=ArtifactCache.default() if cache else None,
+                                           options=options or None, profiler=profiler)
+    rc = run_session(session, tac=tac, ast=ast, mips=mips, stream=stream, simulate=simulate)
+    if verbose:
+        if session.parse_mode is not None:
+            print(f"[Parse] {session.parse_mode}")
+        if session.optimization is not None:
+            print(session.optimization)
+        if session.register_allocation is not None:
+            print(session.register_allocation.report())
+        if session.peephole is not None:
+            print(session.peephole)
+        if session.simulation is not None:
+            print(session.simulation.report())
+        if session.cache is not None:
+            print(session.cache.stats())
+    if profiler is not None:
+        profiler.stop()
+        if profile:
+            print(profiler.report(filepath))
+        if profile_json:
+            data = profiler.to_json(file=filepath, rc=rc, parse_mode=session.parse_mode,
+                                    cache_hit=session.cache is not None and session.cached is not None)
+            with open(profile_json, 'w', encoding='utf-8') as f:
+                f.write(data + '\n')
+    return rc
+
+
+def run_session(session: CompilationSession, tac: bool = False, ast: bool = False, mips: bool = False,
+                stream: bool = False, simulate: bool = False) -> int:
+    """Ejecuta las salidas pedidas sobre una sesión; cada etapa se calcula una sola vez."""
     if ast:
-        if tree is not None and parser is not None:
+        if session.tree is not None and session.parser is not None:
             try:
-                print(tree.toStringTree(recog=parser))
+                print(session.tree.toStringTree(recog=session.parser))
             except Exception:
-                print(str(tree))
+                print(str(session.tree))
             return 0
 
-    if syn and syn.errors:
-        for e in syn.errors:
+    if session.syntax_errors:
+        for e in session.syntax_errors:
             print(e)
         return 1
 
-    if isinstance(visitor, SemanticVisitor):
-        # semantic errors already printed inside parse_and_semantic if any
-        pass
+    session.report_semantic()
 
-    for w in getattr(visitor, "warnings", []):
+    for w in session.warnings:
         print(f"[Warn] {w}")
 
     if tac:
         try:
             from codegen.generate_tac import run as run_tac
             print("\n=== Código Intermedio (TAC) ===\n")
-            run_tac(filepath)
+            run_tac(session.path, session=session)
             print("\n===============================\n")
         except Exception as e:
             print(f"[Error] Fallo al generar TAC: {e}")
@@ -53,45 +85,64 @@ def run(filepath: str, tac: bool = False, ast: bool = False, mips: bool = False)
         try:
             from codegen.generate_tac import run_mips
             print("\n=== Código MIPS generado ===\n")
-            run_mips(filepath)
+            run_mips(session.path, session=session, stream=stream)
             print("\n===========================\n")
         except Exception as e:
             print(f"[Error] Fallo al generar MIPS: {e}")
             return 4
 
+    if simulate:
+        print("\n=== Ejecución (simulador MIPS) ===\n")
+        try:
+            print(session.simulate().output)
+        except Exception as e:
+            print(f"[Error] Fallo en la simulación: {e}")
+            return 5
+        print("\n==================================\n")
+
     return 0
 
 
-def parse_and_semantic(filepath: str):
-    """Parse file and run semantic visitor. Returns (parser, tree, syntax_listener, semantic_visitor).
-    The function prints semantic errors and returns visitor regardless.
-    """
-    input_stream = FileStream(filepath, encoding='utf-8')
-    lexer = CompiscriptLexer(input_stream)
-    tokens = CommonTokenStream(lexer)
-    parser = CompiscriptParser(tokens)
+def choose_passes(passes=None, optimize: bool = False, skip=()) -> object:
+    """Valor de `optimize` para run(): la lista `passes` (o todos con `optimize`) menos
+    los de `skip`; None si no se pidió optimizar."""
+    from codegen.optimize import PASSES
+    chosen = passes
+    if chosen is None:
+        if not optimize:
+            return None
+        chosen = list(PASSES)
+    chosen = [p for p in chosen if p not in skip]
+    return True if chosen == list(PASSES) else chosen
 
-    syn = ThrowingSyntaxErrorListener()
-    parser.removeErrorListeners()
-    parser.addErrorListener(syn)
-    tree = parser.program()
 
-    if syn.errors:
-        return parser, tree, syn, None
+def optimize_flags(flags) -> object:
+    """Pases pedidos en la línea de comandos: -O (todos), --passes=a,b y --no-<pase>.
+    Un nombre de pase desconocido en --passes es ValueError."""
+    from codegen.optimize import PASSES, check_passes
+    chosen = None
+    for f in flags:
+        if f.startswith("--passes="):
+            chosen = check_passes(p for p in f.split("=", 1)[1].split(",") if p)
+    skip = [p for p in PASSES if f"--no-{p}" in flags]
+    return choose_passes(chosen, "-O" in flags or "--optimize" in flags, skip)
 
-    visitor = SemanticVisitor()
-    try:
-        visitor.visit(tree)
-    except SemanticError as se:
-        print(se)
-        return parser, tree, syn, visitor
 
-    return parser, tree, syn, visitor
+def parse_and_semantic(filepath: str):
+    """Parse file and run semantic visitor. Returns (parser, tree, syntax_listener, semantic_visitor).
+    The function prints semantic errors and returns visitor regardless.
+    """
+    session = CompilationSession.from_file(filepath)
+    if session.syntax_errors:
+        return session.parser, session.tree, session.syntax, None
+    session.report_semantic()
+    return session.parser, session.tree, session.syntax, session.semantic
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Uso: python3 Driver.py <archivo.cps> [--tac] [--ast]")
+        print("Uso: python3 Driver.py <archivo.cps> [--tac] [--ast] [--mips] [--no-cache] [--verbose] [--profile] [--profile-json=PATH]"
+              " [--stream] [--callconv=registers|stack] [--peephole] [--run] [-O] [--passes=constprop,copyprop,lvn,dce] [--no-<pase>]")
         sys.exit(64)
 
     path = sys.argv[1]
@@ -100,5 +151,21 @@ if __name__ == "__main__":
     ast_flag = "--ast" in flags
     tac_flag = "--tac" in flags
     mips_flag = "--mips" in flags
+    cache_flag = "--no-cache" not in flags
+    verbose_flag = "--verbose" in flags
+    profile_flag = "--profile" in flags
+    stream_flag = "--stream" in flags
+    run_flag = "--run" in flags
+    peephole_flag = "--peephole" in flags
+    convention = next((f.split("=", 1)[1] for f in flags if f.startswith("--callconv=")), None)
+    profile_json = next((f.split("=", 1)[1] for f in flags if f.startswith("--profile-json=")), None)
+    try:
+        optimize = optimize_flags(flags)
+    except ValueError as e:
+        print(f"[Error] {e}")
+        sys.exit(64)
 
-    sys.exit(run(path, tac=tac_flag, ast=ast_flag, mips=mips_flag))
+    sys.exit(run(path, tac=tac_flag, ast=ast_flag, mips=mips_flag, cache=cache_flag, verbose=verbose_flag,
+                 profile=profile_flag, profile_json=profile_json, optimize=optimize,
+                 stream=stream_flag, convention=convention, simulate=run_flag,
+                 peephole=peephole_flag))
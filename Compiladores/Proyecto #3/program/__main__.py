@@ -1,8 +1,63 @@
-from .Driver import run
+import argparse
+import os
 import sys
 
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+from Driver import choose_passes, run
+from batch import run_batch
+from codegen.optimize import PASSES, check_passes
+
+
+def pass_list(text: str):
+    try:
+        return check_passes(p for p in text.split(',') if p)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog='python -m program',
+                                 description='Compilador Compiscript (uno o muchos archivos).')
+    ap.add_argument('paths', nargs='+', help='archivos .cps o directorios')
+    ap.add_argument('--jobs', '-j', type=int, default=None, help='procesos en paralelo (modo lote)')
+    ap.add_argument('--tac', action='store_true')
+    ap.add_argument('--ast', action='store_true')
+    ap.add_argument('--mips', action='store_true')
+    ap.add_argument('--stream', action='store_true', help='con --mips, escribir el .s sin armarlo en memoria')
+    ap.add_argument('--callconv', choices=('registers', 'stack'), default=None,
+                    help='convención de llamada del MIPS (stack: compatibilidad, todo por la pila)')
+    ap.add_argument('--peephole', action='store_true', help='optimización peephole del MIPS generado')
+    ap.add_argument('--run', action='store_true', help='ejecutar el MIPS en el simulador (solo un archivo)')
+    ap.add_argument('--no-cache', dest='cache', action='store_false', help='no usar el caché de artefactos')
+    ap.add_argument('--verbose', '-v', action='store_true')
+    ap.add_argument('-O', '--optimize', action='store_true', help='optimizar el TAC (todos los pases)')
+    ap.add_argument('--passes', type=pass_list, default=None,
+                    help='pases a correr, separados por comas (implica -O)')
+    for p in PASSES:
+        ap.add_argument(f'--no-{p}', dest='skip', action='append_const', const=p,
+                        help=f'no correr el pase {p}')
+    args = ap.parse_args(argv)
+    optimize = choose_passes(args.passes, args.optimize, args.skip or ())
+
+    single = len(args.paths) == 1 and not os.path.isdir(args.paths[0]) and args.jobs is None
+    if single:
+        return run(args.paths[0], tac=args.tac, ast=args.ast, mips=args.mips,
+                   cache=args.cache, verbose=args.verbose, optimize=optimize, stream=args.stream,
+                   convention=args.callconv, simulate=args.run, peephole=args.peephole)
+    if args.ast or args.run:
+        print(f"[Error] {'--ast' if args.ast else '--run'} no está disponible en modo lote")
+        return 64
+    jobs = args.jobs if args.jobs is not None else (os.cpu_count() or 1)
+    return run_batch(args.paths, jobs=jobs, tac=args.tac, mips=args.mips,
+                     cache=args.cache, verbose=args.verbose, optimize=optimize,
+                     convention=args.callconv, peephole=args.peephole, stream=args.stream)
+
+
 if __name__ == '__main__':
     if len(sys.argv) < 2:
-        print('Uso: python -m program <archivo.cps>')
+        print('Uso: python -m program [--jobs N] [--tac] [--mips] [--no-cache] [-O] [--passes=a,b] [--no-<pase>] <archivo.cps|dir> ...')
         sys.exit(64)
-    sys.exit(run(sys.argv[1]))
+    sys.exit(main())
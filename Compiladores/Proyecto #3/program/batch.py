@@ -0,0 +1,138 @@
+"""
+Compilación por lotes de muchos archivos Compiscript.
+
+Reparte los archivos en un pool de procesos. Cada worker importa una sola vez el
+lexer/parser generados y los calienta con un programa mínimo; como ANTLR guarda el
+ATN deserializado y las cachés DFA a nivel de clase, esos estados se reutilizan en
+todos los archivos que procese el mismo worker.
+
+El reporte final siempre sigue el orden de entrada, y cada archivo escribe su propio
+.s (como `run_mips`), así que la salida no depende del orden en que terminen los workers.
+"""
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List
+
+SOURCE_EXTS = ('.cps',)
+DIAG_PREFIXES = ('[Syntax]', '[Semantic]', '[Warn]', '[Error]', '[Aviso]')
+
+
+@dataclass
+class BatchResult:
+    path: str
+    rc: int
+    seconds: float
+    output: str = ''
+    diagnostics: List[str] = field(default_factory=list)
+
+
+def collect_sources(paths: Iterable[str]) -> List[str]:
+    """Expande directorios a sus .cps (recursivo, ordenado); los archivos explícitos se aceptan tal cual."""
+    found: List[str] = []
+    seen = set()
+    for p in paths:
+        if os.path.isdir(p):
+            candidates = []
+            for dirpath, dirnames, filenames in os.walk(p):
+                dirnames.sort()
+                for name in filenames:
+                    if name.endswith(SOURCE_EXTS):
+                        candidates.append(os.path.join(dirpath, name))
+            candidates.sort()
+        else:
+            candidates = [p]
+        for c in candidates:
+            key = os.path.abspath(c)
+            if key not in seen:
+                seen.add(key)
+                found.append(c)
+    return found
+
+
+def _output_clashes(paths: List[str]) -> List[str]:
+    """Archivos distintos que escribirían el mismo .s (p. ej. a.cps y a.txt)."""
+    owners = {}
+    clashes = []
+    for p in paths:
+        out = os.path.abspath(os.path.splitext(p)[0] + '.s')
+        if out in owners:
+            clashes.append(f"{owners[out]} y {p} escriben {out}")
+        else:
+            owners[out] = p
+    return clashes
+
+
+def _warm_worker() -> None:
+    from session import CompilationSession
+    CompilationSession.warm_up()
+
+
+def compile_one(path: str, tac: bool = False, mips: bool = False, cache: bool = True,
+                optimize=None, convention: str = None, peephole: bool = False,
+                stream: bool = False) -> BatchResult:
+    from Driver import run
+    buf = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(buf):
+        try:
+            rc = run(path, tac=tac, mips=mips, cache=cache, optimize=optimize, convention=convention,
+                     peephole=peephole, stream=stream)
+        except Exception as e:
+            print(f"[Error] {type(e).__name__}: {e}")
+            rc = 70
+    seconds = time.perf_counter() - start
+    output = buf.getvalue()
+    diags = [ln for ln in output.splitlines() if ln.startswith(DIAG_PREFIXES)]
+    return BatchResult(path, rc, seconds, output, diags)
+
+
+def _compile_job(job) -> BatchResult:
+    return compile_one(*job)
+
+
+def run_batch(paths: Iterable[str], jobs: int = 1, tac: bool = False, mips: bool = False,
+              cache: bool = True, verbose: bool = False, optimize=None, convention: str = None,
+              peephole: bool = False, stream: bool = False) -> int:
+    files = collect_sources(paths)
+    if not files:
+        print('[Error] No se encontraron archivos .cps para compilar.')
+        return 64
+    if mips:
+        clashes = _output_clashes(files)
+        if clashes:
+            for c in clashes:
+                print(f"[Error] Salida .s duplicada: {c}")
+            return 64
+
+    work = [(f, tac, mips, cache, optimize, convention, peephole, stream) for f in files]
+    start = time.perf_counter()
+    if jobs <= 1:
+        _warm_worker()
+        results = [_compile_job(j) for j in work]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_warm_worker) as pool:
+            # map conserva el orden de entrada sin importar qué worker termine primero
+            results = list(pool.map(_compile_job, work))
+    total = time.perf_counter() - start
+
+    print_report(results, total, verbose=verbose)
+    return max((r.rc for r in results), default=0)
+
+
+def print_report(results: List[BatchResult], total: float, verbose: bool = False) -> None:
+    for r in results:
+        print(f"== {r.path} (rc={r.rc}, {r.seconds * 1000:.1f} ms)")
+        body = r.output.rstrip().splitlines() if verbose else r.diagnostics
+        for ln in body:
+            print(f"   {ln}")
+
+    failed = [r for r in results if r.rc != 0]
+    width = max(len(r.path) for r in results)
+    print("\n=== Resumen ===")
+    for r in results:
+        print(f"{r.path.ljust(width)}  rc={r.rc}  {r.seconds * 1000:8.1f} ms  {len(r.diagnostics)} diag")
+    print(f"{len(results)} archivos, {len(failed)} con errores, {total:.2f} s en total")
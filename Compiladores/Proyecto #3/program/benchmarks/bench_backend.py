@@ -0,0 +1,102 @@
+"""
+Rendimiento del backend MIPS (codegen/mips_backend.py) sobre un flujo de TAC grande.
+
+Replica el TAC de un programa sintético (ver bench_dataflow.replicated_tac) hasta
+`--instrs` instrucciones y mide por separado la asignación de registros y la traducción
+instrucción por instrucción de `instr_to_mips`, además de `emit_from_emitter` completo.
+Con `--memory` compara el pico de memoria (tracemalloc) de armar el programa como string
+contra el modo streaming de `emit_to_file`.
+
+    python benchmarks/bench_backend.py [--instrs 200000] [--repeat 3] [--memory]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for p in (ROOT, HERE):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from bench_dataflow import replicated_tac
+from codegen.mips_backend import MIPSBackend
+from codegen.regalloc import allocate
+from codegen.tac import Emitter
+
+
+def tac_stream(instrs: int, scale: int = 16):
+    one = len(replicated_tac(scale, 1))
+    return replicated_tac(scale, -(-instrs // one))[:instrs]
+
+
+def translate(tac, allocation) -> MIPSBackend:
+    backend = MIPSBackend()
+    backend.allocation = allocation
+    units = allocation.units
+    for instr, unit in zip(tac, allocation.unit_of):
+        backend.unit = units[unit]
+        backend.instr_to_mips(instr)
+    return backend
+
+
+def best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def peak_memory(fn) -> int:
+    """Pico de memoria de `fn()` por encima de lo ya asignado, en bytes."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - base
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--instrs', type=int, default=200000)
+    ap.add_argument('--scale', type=int, default=16)
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--memory', action='store_true', help='medir el pico de memoria de la emisión')
+    args = ap.parse_args(argv)
+
+    tac = tac_stream(args.instrs, args.scale)
+    em = Emitter()
+    em.instrs = tac
+    allocation = allocate(tac)
+    lines = len(translate(tac, allocation).text_lines)
+    print(f"{len(tac)} instrucciones TAC -> {lines} líneas .text")
+
+    t_alloc = best(lambda: allocate(tac), args.repeat)
+    t_trans = best(lambda: translate(tac, allocation), args.repeat)
+    t_full = best(lambda: MIPSBackend().emit_from_emitter(em), args.repeat)
+    for name, t in (('regalloc', t_alloc), ('instr_to_mips', t_trans), ('emit_from_emitter', t_full)):
+        print(f"{name:<20}{t * 1000:9.1f} ms  {t * 1e9 / len(tac):8.0f} ns/instr")
+    if args.memory:
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'bench.s')
+            t_stream = best(lambda: MIPSBackend().emit_to_file(em, out), args.repeat)
+            print(f"{'emit_to_file':<20}{t_stream * 1000:9.1f} ms  {t_stream * 1e9 / len(tac):8.0f} ns/instr")
+            text = peak_memory(lambda: MIPSBackend().emit_from_emitter(em, out))
+            stream = peak_memory(lambda: MIPSBackend().emit_to_file(em, out))
+            size = os.path.getsize(out)
+        print(f"pico de memoria: string {text / 2**20:.1f} MiB, streaming {stream / 2**20:.1f} MiB "
+              f"(archivo .s de {size / 2**20:.1f} MiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Convención de llamada del backend MIPS: 'registers' ($a0-$a3, hojas sin $ra/$fp) contra
+'stack' (compatibilidad: todos los argumentos por la pila y $ra/$fp en toda función).
+
+Cuenta, por función, las instrucciones del .text y cuántas son accesos a memoria
+(lw/sw), que es lo que ahorra pasar argumentos en registros. Si el programa corre en el
+simulador (codegen/simulator.py) también muestra las instrucciones ejecutadas y los
+ciclos estimados de cada convención.
+
+    python benchmarks/bench_callconv.py [archivos...]
+"""
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for p in (ROOT, HERE):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from bench_optimize import mips_instructions
+from codegen.simulator import SimulationError, run_text
+from session import CompilationSession
+
+DEFAULT = [os.path.join(ROOT, 'tests', 'MIPS', 'BlocCodes', 'ProcedureCalls&Returns.txt'),
+           os.path.join(ROOT, 'tests', 'MIPS', 'Complex', 'Procedimientos-Retornos.txt')]
+
+
+def per_function(text: str):
+    """{función: (instrucciones, lw/sw)} del .text; lo previo a la primera función es 'global'."""
+    counts = {}
+    name = 'global'
+    for ln in text.split('.text', 1)[-1].splitlines():
+        s = ln.strip()
+        if not s or s.startswith('.'):
+            continue
+        if s.endswith(':'):
+            if not ln.startswith(' ') and (s.startswith(('func_', 'method_', 'main:'))) \
+                    and not s.endswith('_end:'):
+                name = s[:-1]
+            continue
+        n, mem = counts.get(name, (0, 0))
+        counts[name] = (n + 1, mem + (s.split()[0] in ('lw', 'sw')))
+    return counts
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('paths', nargs='*')
+    args = ap.parse_args(argv)
+
+    for path in args.paths or DEFAULT:
+        texts = {c: CompilationSession.from_file(path, options={'convention': c}).mips()
+                 for c in ('stack', 'registers')}
+        stack, regs = per_function(texts['stack']), per_function(texts['registers'])
+        print(os.path.relpath(path, ROOT))
+        print(f"  {'función':<24}{'stack':>12}{'registers':>12}")
+        for name in stack:
+            (n0, m0), (n1, m1) = stack[name], regs.get(name, (0, 0))
+            print(f"  {name:<24}{n0:>6} ({m0:>3}){n1:>6} ({m1:>3})")
+        t0, t1 = mips_instructions(texts['stack']), mips_instructions(texts['registers'])
+        print(f"  {'total':<24}{t0:>12}{t1:>12}   ({t1 - t0:+d} instrucciones)")
+        try:
+            r0, r1 = run_text(texts['stack']), run_text(texts['registers'])
+        except SimulationError as e:
+            print(f"  (sin simulación: {e})")
+            continue
+        print(f"  {'ejecutadas':<24}{r0.steps:>12}{r1.steps:>12}   ({r1.steps - r0.steps:+d})")
+        print(f"  {'ciclos':<24}{r0.cycles:>12}{r1.cycles:>12}   ({r1.cycles - r0.cycles:+d})")
+
+
+if __name__ == '__main__':
+    main()
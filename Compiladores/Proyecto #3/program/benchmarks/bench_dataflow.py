@@ -0,0 +1,76 @@
+"""
+Escalabilidad del motor de flujo de datos (codegen/dataflow.py).
+
+Compila un programa sintético una vez y replica su TAC `--copies` veces renombrando
+etiquetas, hasta tener decenas de miles de instrucciones (el código global de todas las
+copias queda en una sola unidad grande, con muchos ciclos). Mide la construcción del
+CFG y cada análisis sobre todas las unidades, con las iteraciones del worklist.
+
+    python benchmarks/bench_dataflow.py [--scale 16] [--copies 25]
+"""
+import argparse
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for p in (ROOT, HERE):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from codegen.cfg import build_cfg
+from codegen.codegen import CodeGenVisitor
+from codegen.dataflow import available_expressions, liveness, reaching_definitions
+from codegen.tac import Instr
+from session import CompilationSession
+from synth import scaled
+
+
+def replicated_tac(scale: int, copies: int):
+    gen = CodeGenVisitor()
+    gen.visit(CompilationSession.from_source(scaled(scale)).tree)
+    base = list(gen.em.instrs)
+    out = []
+    for k in range(copies):
+        for ins in base:
+            if ins.op in ('LABEL', 'GOTO', 'IFZ'):
+                ins = Instr(ins.op, f"{ins.dst}_{k}", ins.a, ins.b)
+            elif ins.op == 'CALL':
+                ins = Instr(ins.op, ins.dst, f"{ins.a}_{k}", ins.b)
+            out.append(ins)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--scale', type=int, default=16)
+    ap.add_argument('--copies', type=int, default=25)
+    args = ap.parse_args(argv)
+
+    tac = replicated_tac(args.scale, args.copies)
+    t0 = time.perf_counter()
+    cfg = build_cfg(tac)
+    t_cfg = time.perf_counter() - t0
+    units = list(cfg)
+    blocks = sum(len(u.blocks) for u in units)
+    biggest = max(units, key=lambda u: len(u.blocks))
+    print(f"{len(tac)} instrucciones, {len(units)} unidades, {blocks} bloques "
+          f"(mayor: {biggest.name} con {len(biggest.blocks)} bloques)")
+    print(f"{'cfg':<22}{t_cfg * 1000:9.1f} ms")
+    total = t_cfg
+    for analysis in (liveness, reaching_definitions, available_expressions):
+        t0 = time.perf_counter()
+        iterations = visits = 0
+        for u in units:
+            stats = analysis(u).stats
+            iterations = max(iterations, stats.iterations)
+            visits += stats.block_visits
+        dt = time.perf_counter() - t0
+        total += dt
+        print(f"{analysis.__name__:<22}{dt * 1000:9.1f} ms  iteraciones máx {iterations}, visitas {visits}")
+    print(f"{'total':<22}{total * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
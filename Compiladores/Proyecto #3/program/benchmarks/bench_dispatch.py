@@ -0,0 +1,161 @@
+"""
+Micro-benchmark del despacho de nodos en SemanticVisitor y CodeGenVisitor.
+
+Compara la tabla precomputada contra el despacho anterior por nombre (`"visit" +
+clase` con hasattr/getattr y la lista de tipos de expresión). Primero se mide solo la
+resolución del handler para cada nodo de un parse tree grande; después, como
+referencia, el recorrido completo de cada visitor (donde pesan además las reglas).
+
+    python benchmarks/bench_dispatch.py [--scale 24] [--repeat 7]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for p in (ROOT, HERE):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from codegen.codegen import CodeGenVisitor
+from dispatch import lookup
+from semantic.visitor import EXPRESSION_KINDS
+from semantic.visitor import SemanticVisitor
+from session import CompilationSession
+from synth import scaled
+
+_LEGACY_EXPRESSIONS = ['Expression', 'AssignmentExpr', 'ConditionalExpr', 'LogicalOrExpr',
+                       'LogicalAndExpr', 'EqualityExpr', 'RelationalExpr', 'AdditiveExpr',
+                       'MultiplicativeExpr', 'UnaryExpr', 'PrimaryExpr', 'LiteralExpr',
+                       'ArrayLiteral', 'LeftHandSide']
+
+
+class LegacySemanticVisitor(SemanticVisitor):
+    """El despacho por nombre que usaba SemanticVisitor.visit."""
+
+    def visit(self, tree):
+        if tree is None:
+            return None
+        class_name = tree.__class__.__name__
+        base_name = class_name[:-7] if class_name.endswith('Context') else class_name
+        method_name = f"visit{base_name}"
+        if isinstance(tree, list):
+            results = [self.visit(t) for t in tree]
+            return results[-1] if results else None
+        if hasattr(self, method_name):
+            result = getattr(self, method_name)(tree)
+            if base_name in _LEGACY_EXPRESSIONS and result is not None:
+                self.node_types[tree] = result
+            return result
+        result = self.visitChildren(tree)
+        if base_name in _LEGACY_EXPRESSIONS and result is None and tree in self.node_types:
+            return self.node_types[tree]
+        return result
+
+
+class LegacyCodeGenVisitor(CodeGenVisitor):
+    """El despacho por nombre que usaba CodeGenVisitor.visit."""
+
+    def visit(self, tree):
+        if tree is None:
+            return None
+        if isinstance(tree, list):
+            last = None
+            for t in tree:
+                last = self.visit(t)
+            return last
+        class_name = tree.__class__.__name__
+        base_name = class_name[:-7] if class_name.endswith('Context') else class_name
+        method_name = f"visit{base_name}"
+        if hasattr(self, method_name):
+            return getattr(self, method_name)(tree)
+        return self.visitChildren(tree)
+
+
+def all_nodes(tree):
+    out, stack = [], [tree]
+    while stack:
+        node = stack.pop()
+        out.append(node)
+        stack.extend(getattr(node, 'children', None) or ())
+    return out
+
+
+def legacy_resolve(visitor, node):
+    class_name = node.__class__.__name__
+    base_name = class_name[:-7] if class_name.endswith('Context') else class_name
+    method_name = f"visit{base_name}"
+    method = getattr(visitor, method_name) if hasattr(visitor, method_name) else None
+    return method, base_name in _LEGACY_EXPRESSIONS
+
+
+def table_resolve(visitor, node):
+    entry = visitor._dispatch.get(node.__class__)
+    if entry is None:
+        entry = lookup(visitor._dispatch, type(visitor), node.__class__, EXPRESSION_KINDS)
+    return entry
+
+
+def resolve_ms(resolve, visitor, nodes, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for node in nodes:
+            resolve(visitor, node)
+    return (time.perf_counter() - t0) * 1000
+
+
+def run_once(visitor_cls, tree):
+    v = visitor_cls()
+    gc.collect()
+    gc.disable()
+    try:
+        t0 = time.perf_counter()
+        v.visit(tree)
+        return (time.perf_counter() - t0) * 1000
+    finally:
+        gc.enable()
+
+
+def compare(legacy, current, tree, repeat):
+    """Mejor tiempo de cada variante, alternando el orden para repartir el ruido."""
+    t_old = t_new = float('inf')
+    for r in range(repeat):
+        if r % 2:
+            t_new = min(t_new, run_once(current, tree))
+            t_old = min(t_old, run_once(legacy, tree))
+        else:
+            t_old = min(t_old, run_once(legacy, tree))
+            t_new = min(t_new, run_once(current, tree))
+    return t_old, t_new
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--scale', type=int, default=24)
+    ap.add_argument('--repeat', type=int, default=7)
+    args = ap.parse_args(argv)
+
+    tree = CompilationSession.from_source(scaled(args.scale)).tree
+    nodes = all_nodes(tree)
+    print(f"parse tree: {len(nodes)} nodos (synth scale {args.scale})")
+
+    visitor = SemanticVisitor()
+    t_old = t_new = float('inf')
+    for _ in range(args.repeat):
+        t_old = min(t_old, resolve_ms(legacy_resolve, visitor, nodes, 10))
+        t_new = min(t_new, resolve_ms(table_resolve, visitor, nodes, 10))
+    per_old = t_old * 1e6 / (10 * len(nodes))
+    per_new = t_new * 1e6 / (10 * len(nodes))
+    print(f"despacho  por nombre {per_old:7.1f} ns/nodo   tabla {per_new:7.1f} ns/nodo   {t_old / t_new:5.2f}x")
+
+    for name, legacy, current in (('semantic', LegacySemanticVisitor, SemanticVisitor),
+                                  ('codegen', LegacyCodeGenVisitor, CodeGenVisitor)):
+        t_old, t_new = compare(legacy, current, tree, args.repeat)
+        print(f"{name:<9} por nombre {t_old:9.2f} ms   tabla {t_new:9.2f} ms   {t_old / t_new:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark del lowering de expresiones largas (CodeGenVisitor.visitAnyExpression).
+
+Genera una sola expresión de N términos mezclando +, -, * y paréntesis, y mide solo
+la fase codegen para N creciente. Con el lowering estructural el tiempo por término
+debe mantenerse constante (exponente ~1 en log-log).
+
+    python benchmarks/bench_expr.py [--terms 1250 2500 5000 10000] [--repeat 3]
+"""
+import argparse
+import gc
+import math
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for p in (ROOT, HERE):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from bench_pipeline import fit_exponent
+from codegen.codegen import CodeGenVisitor
+from session import CompilationSession
+
+
+def expression_program(terms: int) -> str:
+    atoms = ('k', '1', '(k - 2)', 'k * 3', '7')
+    ops = ('+', '-', '+', '*')
+    parts = [atoms[0]]
+    for i in range(1, terms):
+        parts.append(ops[i % len(ops)])
+        parts.append(atoms[i % len(atoms)])
+    return f"let k: integer = 3;\nlet e: integer = {' '.join(parts)};\nprint(e);\n"
+
+
+def codegen_ms(source: str, repeat: int):
+    # el análisis semántico no participa: se genera TAC directo sobre el parse tree
+    s = CompilationSession.from_source(source)
+    if s.syntax_errors:
+        raise RuntimeError(s.syntax_errors)
+    best = math.inf
+    instrs = 0
+    for _ in range(repeat):
+        gen = CodeGenVisitor()
+        gc.disable()  # como timeit: que el GC sobre el árbol grande no ensucie la curva
+        try:
+            t0 = time.perf_counter()
+            gen.visit(s.tree)
+            best = min(best, (time.perf_counter() - t0) * 1000)
+        finally:
+            gc.enable()
+        instrs = len(gen.em.instrs)
+    return best, instrs
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--terms', type=int, nargs='+', default=[1250, 2500, 5000, 10000])
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args(argv)
+
+    times = []
+    print(f"{'términos':>9}{'TAC':>8}{'codegen ms':>12}{'us/término':>12}")
+    for n in args.terms:
+        ms, instrs = codegen_ms(expression_program(n), args.repeat)
+        times.append(ms)
+        print(f"{n:>9}{instrs:>8}{ms:>12.2f}{ms * 1000 / n:>12.2f}")
+    print(f"exponente: {fit_exponent(args.terms, times):.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Efecto del pipeline de codegen/optimize.py sobre los programas de tests/MIPS/Complex.
+
+Para cada programa compara instrucciones TAC e instrucciones MIPS (líneas de .text que
+no son etiquetas) sin optimizar y con `options={'optimize': ...}`, y suma lo que
+eliminó cada pase.
+
+    python benchmarks/bench_optimize.py [--passes constprop,copyprop,lvn,dce] [archivos...]
+"""
+import argparse
+import glob
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from codegen.optimize import PASSES
+from session import CompilationSession
+
+
+def mips_instructions(text: str) -> int:
+    body = text.split('.text', 1)[-1]
+    return sum(1 for ln in body.splitlines()
+               if ln.strip() and not ln.rstrip().endswith(':') and not ln.lstrip().startswith('.'))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('paths', nargs='*')
+    ap.add_argument('--passes', default=','.join(PASSES))
+    args = ap.parse_args(argv)
+    passes = [p for p in args.passes.split(',') if p]
+    paths = args.paths or sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', 'Complex', '*.txt')))
+
+    removed = {p: 0 for p in passes}
+    totals = [0, 0, 0, 0]
+    print(f"{'programa':<30}{'TAC':>6}{'TAC -O':>8}{'MIPS':>7}{'MIPS -O':>9}")
+    for path in paths:
+        plain = CompilationSession.from_file(path)
+        if plain.syntax_errors or not plain.analyzed:
+            continue
+        opt = CompilationSession.from_file(path, options={'optimize': passes})
+        row = [len(plain.emitter.instrs), len(opt.emitter.instrs),
+               mips_instructions(plain.mips()), mips_instructions(opt.mips())]
+        totals = [t + r for t, r in zip(totals, row)]
+        for name, stats in opt.optimization.passes.items():
+            removed[name] += stats.removed
+        print(f"{os.path.basename(path):<30}{row[0]:>6}{row[1]:>8}{row[2]:>7}{row[3]:>9}")
+    print(f"{'total':<30}{totals[0]:>6}{totals[1]:>8}{totals[2]:>7}{totals[3]:>9}")
+    if totals[2]:
+        print(f"MIPS: {100.0 * (totals[2] - totals[3]) / totals[2]:.1f}% menos instrucciones")
+    print('eliminadas por pase: ' + ', '.join(f"{k}={v}" for k, v in removed.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark del parseo en dos etapas (SLL -> LL) contra LL completo.
+
+Parsea todos los programas de `tests/` (los .cps y los .txt de tests/MIPS) varias veces
+con cada estrategia y reporta el tiempo total, la aceleración y cuántos archivos
+necesitaron el reintento con LL.
+
+    python benchmarks/bench_parse.py [--repeat N]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from antlr4 import InputStream, CommonTokenStream
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from session import CompilationSession, ThrowingSyntaxErrorListener
+
+
+def corpus():
+    paths = glob.glob(os.path.join(ROOT, 'tests', '**', '*.cps'), recursive=True)
+    paths += glob.glob(os.path.join(ROOT, 'tests', 'MIPS', '**', '*.txt'), recursive=True)
+    out = []
+    for p in sorted(paths):
+        with open(p, encoding='utf-8') as f:
+            out.append((os.path.relpath(p, ROOT), f.read()))
+    return out
+
+
+def parse_ll(text):
+    """El camino anterior: LL completo con la estrategia de errores por defecto."""
+    tokens = CommonTokenStream(CompiscriptLexer(InputStream(text)))
+    tokens.fill()
+    parser = CompiscriptParser(tokens)
+    parser.removeErrorListeners()
+    parser.addErrorListener(ThrowingSyntaxErrorListener())
+    return parser.program()
+
+
+def parse_two_stage(text):
+    s = CompilationSession.from_source(text)
+    s.tokens  # el lexeo se mide igual que en parse_ll
+    s.tree
+    return s.parse_mode
+
+
+def bench(fn, sources, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in sources:
+            fn(text)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args(argv)
+
+    sources = corpus()
+    # calentar las cachés DFA compartidas para que ninguna estrategia pague el arranque
+    bench(parse_ll, sources, 1)
+    bench(parse_two_stage, sources, 1)
+
+    modes = [parse_two_stage(text) for _, text in sources]
+    t_ll = bench(parse_ll, sources, args.repeat)
+    t_two = bench(parse_two_stage, sources, args.repeat)
+
+    print(f"{len(sources)} archivos x {args.repeat} repeticiones")
+    print(f"LL completo     : {t_ll * 1000:9.1f} ms")
+    print(f"SLL -> LL       : {t_two * 1000:9.1f} ms")
+    print(f"aceleración     : {t_ll / t_two:9.2f}x")
+    print(f"reintentos LL   : {modes.count('LL')} de {len(modes)}")
+    for (name, _), mode in zip(sources, modes):
+        if mode == 'LL':
+            print(f"  LL: {name}")
+
+
+if __name__ == '__main__':
+    main()
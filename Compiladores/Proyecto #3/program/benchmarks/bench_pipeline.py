@@ -0,0 +1,162 @@
+"""
+Benchmark de escalabilidad del pipeline completo sobre programas sintéticos.
+
+Genera programas con `synth.scaled(n)` para tamaños crecientes, compila cada uno sin
+caché midiendo cada fase (lex, parse, semantic, codegen, mips) y ajusta una curva
+potencia t = c * tokens^k por fase (regresión lineal en log-log). El exponente `k`
+dice cómo crece la fase: ~1 lineal, ~2 cuadrática.
+
+Los resultados se comparan contra `benchmarks/baseline.json`; el script termina con
+código 1 si el exponente de alguna fase supera el de la línea base más la tolerancia,
+o si el tiempo en el tamaño mayor empeora más allá del factor permitido. Ese tiempo se
+guarda y se compara relativo a un ciclo de calibración en Python puro medido en la misma
+corrida, para que la línea base sirva en otra máquina.
+
+    python benchmarks/bench_pipeline.py                    # medir y comparar
+    python benchmarks/bench_pipeline.py --update-baseline  # guardar nueva línea base
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for p in (ROOT, HERE):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from profiling import PhaseProfiler
+from session import CompilationSession
+from synth import scaled
+
+BASELINE = os.path.join(HERE, 'baseline.json')
+PHASES = ('lex', 'parse', 'semantic', 'codegen', 'mips')
+DEFAULT_SCALES = (2, 4, 8, 16, 32)
+
+
+def measure(source: str, repeat: int):
+    """Mejor tiempo de pared (ms) por fase en `repeat` compilaciones, y nº de tokens."""
+    best = {}
+    tokens = 0
+    for _ in range(repeat):
+        prof = PhaseProfiler(memory=False)
+        s = CompilationSession.from_source(source, profiler=prof)
+        s.mips()
+        if s.syntax_errors or s.semantic_error:
+            raise RuntimeError(f"programa sintético inválido: {s.syntax_errors or s.semantic_error}")
+        tokens = prof.counts.get('tokens', 0)
+        for p in prof.phases:
+            best[p['name']] = min(best.get(p['name'], math.inf), p['wall_ms'])
+    return tokens, best
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Mejor tiempo (ms) de un trabajo fijo en Python puro (diccionarios, cadenas, enteros),
+    la unidad de los tiempos relativos."""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        table = {}
+        for i in range(200_000):
+            key = 't' + str(i % 997)
+            table[key] = table.get(key, 0) + (i ^ (i >> 3))
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def fit_exponent(xs, ys):
+    """Pendiente de la recta de mínimos cuadrados en log-log."""
+    lx = [math.log(x) for x in xs]
+    ly = [math.log(max(y, 1e-3)) for y in ys]
+    mx = sum(lx) / len(lx)
+    my = sum(ly) / len(ly)
+    num = sum((a - mx) * (b - my) for a, b in zip(lx, ly))
+    den = sum((a - mx) ** 2 for a in lx)
+    return num / den if den else 0.0
+
+
+def run(scales, repeat):
+    # calentar cachés DFA del parser para no medir el arranque en el tamaño menor
+    CompilationSession.from_source(scaled(1)).mips()
+    rows = []
+    for n in scales:
+        tokens, times = measure(scaled(n), repeat)
+        rows.append({'scale': n, 'tokens': tokens, 'ms': times})
+    unit = calibrate()
+    xs = [r['tokens'] for r in rows]
+    result = {'scales': list(scales), 'calibration_ms': round(unit, 3), 'rows': rows, 'phases': {}}
+    for name in PHASES:
+        ys = [r['ms'].get(name, 0.0) for r in rows]
+        result['phases'][name] = {'exponent': round(fit_exponent(xs, ys), 3),
+                                  'max_ms': round(ys[-1], 3),
+                                  'relative': round(ys[-1] / unit, 3)}
+    return result
+
+
+def compare(result, baseline, exp_tolerance, time_factor):
+    """Lista de regresiones (texto) de `result` frente a `baseline`. El tiempo se compara
+    con `relative` (tiempo / calibración), no con los ms absolutos de otra máquina."""
+    problems = []
+    if baseline.get('scales') != result['scales']:
+        problems.append(f"escalas distintas a la línea base ({baseline.get('scales')})")
+        return problems
+    for name, cur in result['phases'].items():
+        ref = baseline['phases'].get(name)
+        if ref is None:
+            continue
+        if cur['exponent'] > ref['exponent'] + exp_tolerance:
+            problems.append(f"{name}: exponente {cur['exponent']:.2f} > base {ref['exponent']:.2f}"
+                            f" + {exp_tolerance}")
+        if 'relative' not in ref:
+            problems.append(f"{name}: la línea base no tiene tiempos relativos; use --update-baseline")
+        elif cur['relative'] > ref['relative'] * time_factor:
+            problems.append(f"{name}: {cur['relative']:.2f} calibraciones > {time_factor}x base "
+                            f"{ref['relative']:.2f} ({cur['max_ms']:.1f} ms)")
+    return problems
+
+
+def print_report(result):
+    print(f"{'escala':>7}{'tokens':>9}" + ''.join(f"{p:>11}" for p in PHASES))
+    for r in result['rows']:
+        print(f"{r['scale']:>7}{r['tokens']:>9}" + ''.join(f"{r['ms'].get(p, 0.0):>11.2f}" for p in PHASES))
+    print('exponente ' + ' ' * 6 + ''.join(f"{result['phases'][p]['exponent']:>11.2f}" for p in PHASES))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Curvas de crecimiento del compilador por fase.')
+    ap.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES))
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--baseline', default=BASELINE)
+    ap.add_argument('--update-baseline', action='store_true')
+    ap.add_argument('--exp-tolerance', type=float, default=0.25)
+    ap.add_argument('--time-factor', type=float, default=3.0)
+    args = ap.parse_args(argv)
+
+    result = run(args.scales, args.repeat)
+    print_report(result)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+            f.write('\n')
+        print(f"[Bench] línea base guardada en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("[Bench] sin línea base; use --update-baseline")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    problems = compare(result, baseline, args.exp_tolerance, args.time_factor)
+    for p in problems:
+        print(f"[Regresión] {p}")
+    if not problems:
+        print("[Bench] sin regresiones frente a la línea base")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Memoria por instrucción TAC: lista de dataclasses (representación anterior) contra el
+InstrBuffer compacto de codegen/tac.py.
+
+Genera el TAC de un programa sintético grande con cada representación y mide con
+tracemalloc cuánta memoria queda retenida tras el codegen (instrucciones y operandos;
+el parse tree se construye antes y no cuenta).
+
+    python benchmarks/bench_tac_memory.py [--scale 48]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for p in (ROOT, HERE):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from codegen.codegen import CodeGenVisitor
+from codegen.tac import Emitter
+from session import CompilationSession
+from synth import scaled
+
+
+@dataclass
+class LegacyInstr:
+    op: str
+    dst: Optional[str] = None
+    a: Optional[str] = None
+    b: Optional[str] = None
+
+
+class LegacyEmitter(Emitter):
+    """Emitter con `instrs` como lista de dataclasses, como antes."""
+
+    def __init__(self):
+        super().__init__()
+        self._instrs = []
+
+    def emit(self, op, dst=None, a=None, b=None):
+        self._instrs.append(LegacyInstr(op, dst, a, b))
+
+
+def retained_bytes(tree, emitter_cls):
+    gen = CodeGenVisitor()
+    gen.em = emitter_cls()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        gen.visit(tree)
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, len(gen.em.instrs)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--scale', type=int, default=48)
+    args = ap.parse_args(argv)
+
+    tree = CompilationSession.from_source(scaled(args.scale)).tree
+    old, n = retained_bytes(tree, LegacyEmitter)
+    new, n2 = retained_bytes(tree, Emitter)
+    assert n == n2
+    print(f"{n} instrucciones TAC (synth scale {args.scale})")
+    print(f"lista de dataclasses : {old / 1024:9.1f} KiB  {old / n:6.1f} B/instr")
+    print(f"InstrBuffer compacto : {new / 1024:9.1f} KiB  {new / n:6.1f} B/instr")
+    print(f"reducción            : {old / new:9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Generador de programas Compiscript sintéticos (válidos) parametrizados por tamaño.
+
+    functions  funciones globales, cada una con `depth` ifs anidados
+    classes    clases con un campo, constructor y un método que lo actualiza
+    depth      profundidad de anidamiento dentro de cada función
+    chain      términos de la cadena de expresión aritmética
+    array      elementos del arreglo literal
+    loops      ciclos while que recorren el arreglo
+
+    python benchmarks/synth.py --functions 10 --classes 3 --chain 50 > big.cps
+"""
+import argparse
+import random
+from typing import List
+
+
+def _chain(terms: int, rng: random.Random, atoms: List[str]) -> str:
+    parts = [rng.choice(atoms)]
+    for _ in range(terms - 1):
+        parts.append(rng.choice(('+', '-', '*')))
+        parts.append(rng.choice(atoms))
+    return ' '.join(parts)
+
+
+def _function(idx: int, depth: int, rng: random.Random) -> List[str]:
+    out = [f"function f{idx}(x: integer): integer {{", "  let acc: integer = x;"]
+    indent = '  '
+    for d in range(depth):
+        out.append(f"{indent}if (acc > {rng.randint(0, 9)}) {{")
+        indent += '  '
+        out.append(f"{indent}acc = acc - {d + 1};")
+    for _ in range(depth):
+        indent = indent[:-2]
+        out.append(f"{indent}}}")
+    out.append("  return acc;")
+    out.append("}")
+    return out
+
+
+def _class(idx: int) -> List[str]:
+    return [
+        f"class C{idx} {{",
+        "  let v: integer;",
+        "  function constructor(v: integer) { this.v = v; }",
+        "  function set(d: integer) { this.v = d; }",
+        "}",
+    ]
+
+
+def generate_program(functions: int = 1, classes: int = 1, depth: int = 1, chain: int = 4,
+                     array: int = 4, loops: int = 1, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines: List[str] = []
+    for i in range(functions):
+        lines += _function(i, depth, rng)
+    for i in range(classes):
+        lines += _class(i)
+
+    n = max(array, 1)
+    lines.append(f"let arr: integer[] = [{', '.join(str(rng.randint(0, 99)) for _ in range(n))}];")
+    lines.append("let total: integer = 0;")
+    lines.append("let k: integer = 3;")
+    lines.append(f"let e: integer = {_chain(max(chain, 1), rng, ['k', 'total', '1', '2', '7'])};")
+
+    for i in range(loops):
+        lines.append(f"let i{i}: integer = 0;")
+        lines.append(f"while (i{i} < {n}) {{")
+        lines.append(f"  total = total + arr[i{i}];")
+        lines.append(f"  i{i} = i{i} + 1;")
+        lines.append("}")
+
+    for i in range(classes):
+        lines.append(f"let c{i}: C{i} = new C{i}({i});")
+        lines.append(f"c{i}.set(total);")
+    for i in range(functions):
+        lines.append(f"total = total + f{i}(e);")
+    lines.append("print(total);")
+    return '\n'.join(lines) + '\n'
+
+
+def scaled(scale: int, seed: int = 0) -> str:
+    """Programa con todas las dimensiones creciendo linealmente con `scale`."""
+    return generate_program(functions=scale, classes=scale, depth=min(2 + scale // 4, 12),
+                            chain=8 * scale, array=8 * scale, loops=scale, seed=seed)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Genera un programa Compiscript sintético.')
+    for name, default in (('functions', 4), ('classes', 2), ('depth', 3), ('chain', 16),
+                          ('array', 16), ('loops', 2), ('seed', 0)):
+        ap.add_argument(f'--{name}', type=int, default=default)
+    args = ap.parse_args(argv)
+    print(generate_program(**vars(args)), end='')
+
+
+if __name__ == '__main__':
+    main()
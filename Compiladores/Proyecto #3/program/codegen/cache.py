@@ -0,0 +1,152 @@
+"""
+Caché en disco de artefactos de compilación (TAC, static_arrays y MIPS).
+
+Cada entrada se direcciona por contenido: SHA-256 del texto fuente, la versión del
+compilador y las opciones que afectan la salida. La "versión" es una huella de los
+fuentes del compilador, así que cualquier cambio en el front end o en el backend
+invalida las entradas viejas sin tener que subir un número a mano. Los fuentes son
+session.py y todo módulo del proyecto que importa, directa o indirectamente (incluidos
+los imports dentro de funciones), así que un módulo nuevo entra solo.
+
+El tamaño total está acotado; al excederlo se descartan las entradas usadas hace más
+tiempo (LRU por mtime, que se actualiza en cada acierto).
+"""
+import ast
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'compiscript')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+ENTRY = 'session.py'
+_version: Optional[str] = None
+
+
+def _module_file(base: str) -> Optional[str]:
+    for path in (base + '.py', os.path.join(base, '__init__.py')):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _imported_files(path: str) -> List[str]:
+    """Archivos del proyecto que importa `path` (absolutos desde ROOT o relativos al paquete)."""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+    bases = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            bases += [os.path.join(ROOT, *a.name.split('.')) for a in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                package = os.path.dirname(path)
+                for _ in range(node.level - 1):
+                    package = os.path.dirname(package)
+            else:
+                package = ROOT
+            module = os.path.join(package, *node.module.split('.')) if node.module else package
+            bases += [module] + [os.path.join(module, a.name) for a in node.names]
+    return [f for f in map(_module_file, bases) if f is not None]
+
+
+def compiler_sources(entry: str = ENTRY) -> List[str]:
+    """`entry` y los módulos del proyecto que importa transitivamente, ordenados."""
+    seen = set()
+    pending = [os.path.join(ROOT, entry)]
+    while pending:
+        path = os.path.normpath(pending.pop())
+        if path not in seen:
+            seen.add(path)
+            pending += _imported_files(path)
+    return sorted(seen)
+
+
+def compiler_version() -> str:
+    """Huella SHA-256 de los fuentes del compilador (se calcula una vez por proceso)."""
+    global _version
+    if _version is None:
+        h = hashlib.sha256()
+        for path in compiler_sources():
+            h.update(os.path.relpath(path, ROOT).encode('utf-8'))
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        _version = h.hexdigest()
+    return _version
+
+
+class ArtifactCache:
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or DEFAULT_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def default(cls) -> 'ArtifactCache':
+        """Caché configurado por COMPISCRIPT_CACHE_DIR / COMPISCRIPT_CACHE_MB."""
+        directory = os.environ.get('COMPISCRIPT_CACHE_DIR') or DEFAULT_DIR
+        max_mb = os.environ.get('COMPISCRIPT_CACHE_MB')
+        max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+        return cls(directory, max_bytes)
+
+    def key(self, source: str, options: Optional[Dict] = None) -> str:
+        h = hashlib.sha256()
+        h.update(source.encode('utf-8'))
+        h.update(b'\0' + compiler_version().encode('ascii'))
+        h.update(b'\0' + json.dumps(options or {}, sort_keys=True).encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # marca como usado recientemente
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            return  # el caché es opcional: un disco lleno no debe romper la compilación
+        self.evict()
+
+    def evict(self) -> None:
+        files = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> str:
+        return f"[Cache] hits={self.hits} misses={self.misses} evictions={self.evictions}"
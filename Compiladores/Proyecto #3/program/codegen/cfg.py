@@ -0,0 +1,421 @@
+"""
+Bloques básicos y grafo de flujo de control (CFG) sobre las instrucciones TAC.
+
+El TAC del Emitter es una secuencia plana donde las funciones (`LABEL func_*` /
+`LABEL method_*` ... `LABEL end_*`) quedan intercaladas con el código global. Aquí se
+divide esa secuencia en unidades (cada función y el código global '<global>'), cada
+unidad en bloques básicos, y sobre cada unidad se calculan sucesores/predecesores,
+dominadores y ciclos naturales.
+
+Los bloques guardan copias mutables de las instrucciones; un pase puede modificar
+`block.instrs` y llamar `unit.rebuild_block(block)`, que solo vuelve a partir y enlazar
+ese bloque. Dominadores y ciclos se recalculan al pedirlos de nuevo.
+`ProgramCFG.instructions()` devuelve el TAC linealizado en el orden original.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+from codegen.tac import Instr
+
+GLOBAL = '<global>'
+TERMINATORS = ('GOTO', 'IFZ', 'JUMPTABLE', 'RET')
+
+
+def jump_targets(ins: Instr) -> List[str]:
+    """Etiquetas a las que puede saltar un terminador (sin contar el fallthrough)."""
+    if ins.op in ('GOTO', 'IFZ'):
+        return [ins.dst] if ins.dst else []
+    if ins.op == 'JUMPTABLE':
+        return list(dict.fromkeys(ins.b[1:-1].split(','))) + [ins.dst]
+    return []
+
+
+def is_function_label(ins: Instr) -> bool:
+    return ins.op == 'LABEL' and isinstance(ins.dst, str) and \
+        (ins.dst.startswith('func_') or ins.dst.startswith('method_'))
+
+
+def is_end_label(ins: Instr) -> bool:
+    return ins.op == 'LABEL' and isinstance(ins.dst, str) and ins.dst.startswith('end_')
+
+
+class BasicBlock:
+    def __init__(self, bid: int, instrs: List[Instr], seg: int = 0):
+        self.id = bid
+        self.instrs = instrs
+        self.seg = seg  # tramo del TAC original al que pertenece (para linealizar)
+        self.succs: List['BasicBlock'] = []
+        self.preds: List['BasicBlock'] = []
+
+    @property
+    def label(self) -> Optional[str]:
+        if self.instrs and self.instrs[0].op == 'LABEL':
+            return self.instrs[0].dst
+        return None
+
+    @property
+    def terminator(self) -> Optional[Instr]:
+        if self.instrs and self.instrs[-1].op in TERMINATORS:
+            return self.instrs[-1]
+        return None
+
+    def __repr__(self):
+        return f"B{self.id}({self.label or ''})"
+
+
+class Loop:
+    """Ciclo natural: cabecera, bloques del cuerpo (incluye la cabecera) y latches."""
+
+    def __init__(self, header: BasicBlock):
+        self.header = header
+        self.body: Set[BasicBlock] = {header}
+        self.latches: List[BasicBlock] = []
+        self.parent: Optional['Loop'] = None
+
+    @property
+    def depth(self) -> int:
+        d, p = 1, self.parent
+        while p is not None:
+            d, p = d + 1, p.parent
+        return d
+
+    def __repr__(self):
+        return f"Loop({self.header!r}, {len(self.body)} bloques)"
+
+
+def split_blocks(instrs: List[Instr], next_id) -> List[BasicBlock]:
+    """Parte una secuencia en bloques: líder en cada LABEL y tras GOTO/IFZ/RET."""
+    blocks: List[BasicBlock] = []
+    cur: List[Instr] = []
+    for ins in instrs:
+        if ins.op == 'LABEL' and cur:
+            blocks.append(BasicBlock(next_id(), cur))
+            cur = []
+        cur.append(ins)
+        if ins.op in TERMINATORS:
+            blocks.append(BasicBlock(next_id(), cur))
+            cur = []
+    if cur:
+        blocks.append(BasicBlock(next_id(), cur))
+    return blocks
+
+
+class FunctionCFG:
+    """CFG de una unidad: una función/método o el código global."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.blocks: List[BasicBlock] = []
+        self.labels: Dict[str, BasicBlock] = {}
+        self._next_id = 0
+        self._idom: Optional[Dict[BasicBlock, BasicBlock]] = None
+        self._rpo: Optional[List[BasicBlock]] = None
+        self._loops: Optional[List[Loop]] = None
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id - 1
+
+    @property
+    def entry(self) -> Optional[BasicBlock]:
+        return self.blocks[0] if self.blocks else None
+
+    def block_of(self, label: str) -> Optional[BasicBlock]:
+        return self.labels.get(label)
+
+    # ---------- Aristas ----------
+    def _targets(self, i: int) -> List[BasicBlock]:
+        block = self.blocks[i]
+        last = block.instrs[-1] if block.instrs else None
+        fall = self.blocks[i + 1] if i + 1 < len(self.blocks) else None
+        if last is None:
+            return [fall] if fall else []
+        if last.op == 'RET':
+            return []
+        out = []
+        for label in jump_targets(last):
+            target = self.labels.get(label)
+            if target and target not in out:
+                out.append(target)
+        if last.op in ('GOTO', 'JUMPTABLE'):
+            return out
+        if fall and fall not in out:
+            out.append(fall)
+        return out
+
+    def _link(self, i: int) -> None:
+        block = self.blocks[i]
+        for s in block.succs:
+            s.preds.remove(block)
+        block.succs = self._targets(i)
+        for s in block.succs:
+            s.preds.append(block)
+
+    def link_all(self) -> None:
+        self.labels = {b.label: b for b in self.blocks if b.label}
+        for b in self.blocks:
+            b.succs, b.preds = [], []
+        for i in range(len(self.blocks)):
+            self._link(i)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Descarta dominadores y ciclos; se recalculan cuando se pidan."""
+        self._idom = None
+        self._rpo = None
+        self._loops = None
+
+    # ---------- Edición incremental ----------
+    def rebuild_block(self, block: BasicBlock) -> List[BasicBlock]:
+        """Vuelve a partir `block` tras mutar sus instrucciones y reenlaza solo lo afectado.
+
+        Devuelve los bloques que lo reemplazan (uno si no cambió la estructura, ninguno
+        si quedó vacío)."""
+        i = self.blocks.index(block)
+        new_blocks = split_blocks(block.instrs, self._new_id)
+        if len(new_blocks) == 1:
+            new_blocks[0].id = block.id  # mismo bloque lógico, conserva el id
+        for nb in new_blocks:
+            nb.seg = block.seg
+        for succ in block.succs:
+            succ.preds.remove(block)
+        preds = block.preds
+        for p in preds:
+            p.succs = [x for x in p.succs if x is not block]
+        block.succs, block.preds = [], []
+        old_label = block.label
+        if old_label and self.labels.get(old_label) is block:
+            del self.labels[old_label]
+        self.blocks[i:i + 1] = new_blocks
+        new_labels = set()
+        for nb in new_blocks:
+            if nb.label:
+                self.labels[nb.label] = nb
+                new_labels.add(nb.label)
+        # se reenlazan los predecesores del bloque viejo, el anterior (fallthrough),
+        # los bloques nuevos y quien salte a una etiqueta que antes no existía
+        index = {b: k for k, b in enumerate(self.blocks)}
+        touched = [p for p in preds if p in index]
+        if i > 0:
+            touched.append(self.blocks[i - 1])
+        touched.extend(new_blocks)
+        new_labels.discard(old_label)
+        if new_labels:
+            touched.extend(b for b in self.blocks
+                           if b.terminator is not None and new_labels.intersection(jump_targets(b.terminator)))
+        for b in dict.fromkeys(touched):
+            self._link(index[b])
+        self.invalidate()
+        return new_blocks
+
+    def insert_block_before(self, anchor: BasicBlock, instrs: List[Instr]) -> BasicBlock:
+        """Inserta un bloque nuevo justo antes de `anchor` en el orden de la unidad."""
+        i = self.blocks.index(anchor)
+        nb = BasicBlock(self._new_id(), instrs, anchor.seg)
+        self.blocks.insert(i, nb)
+        touched = [i]
+        if i > 0:
+            touched.append(i - 1)  # su fallthrough ahora cae en el bloque nuevo
+        if nb.label:
+            self.labels[nb.label] = nb
+            touched.extend(k for k, b in enumerate(self.blocks)
+                           if b.terminator is not None and b.terminator.dst == nb.label)
+        for k in dict.fromkeys(touched):
+            self._link(k)
+        self.invalidate()
+        return nb
+
+    # ---------- Dominadores ----------
+    def reverse_postorder(self) -> List[BasicBlock]:
+        if self._rpo is None:
+            order: List[BasicBlock] = []
+            if self.entry is not None:
+                seen = {self.entry}
+                stack = [(self.entry, iter(self.entry.succs))]
+                while stack:
+                    node, it = stack[-1]
+                    nxt = next(it, None)
+                    if nxt is None:
+                        stack.pop()
+                        order.append(node)
+                    elif nxt not in seen:
+                        seen.add(nxt)
+                        stack.append((nxt, iter(nxt.succs)))
+            order.reverse()
+            self._rpo = order
+        return self._rpo
+
+    def idom(self) -> Dict[BasicBlock, BasicBlock]:
+        """Dominador inmediato de cada bloque alcanzable (Cooper, Harvey y Kennedy)."""
+        if self._idom is None:
+            rpo = self.reverse_postorder()
+            index = {b: i for i, b in enumerate(rpo)}
+            idom: Dict[BasicBlock, BasicBlock] = {}
+            if rpo:
+                idom[rpo[0]] = rpo[0]
+            changed = True
+            while changed:
+                changed = False
+                for b in rpo[1:]:
+                    new = None
+                    for p in b.preds:
+                        if p not in idom:
+                            continue
+                        if new is None:
+                            new = p
+                            continue
+                        x, y = p, new
+                        while x is not y:
+                            while index[x] > index[y]:
+                                x = idom[x]
+                            while index[y] > index[x]:
+                                y = idom[y]
+                        new = x
+                    if new is not None and idom.get(b) is not new:
+                        idom[b] = new
+                        changed = True
+            self._idom = idom
+        return self._idom
+
+    def dominates(self, a: BasicBlock, b: BasicBlock) -> bool:
+        idom = self.idom()
+        if b not in idom:
+            return False
+        while True:
+            if b is a:
+                return True
+            parent = idom[b]
+            if parent is b:
+                return False
+            b = parent
+
+    def dominators(self, b: BasicBlock) -> List[BasicBlock]:
+        """Dominadores de `b`, desde `b` hasta la entrada."""
+        idom = self.idom()
+        out = []
+        while b in idom:
+            out.append(b)
+            if idom[b] is b:
+                break
+            b = idom[b]
+        return out
+
+    # ---------- Ciclos naturales ----------
+    def loops(self) -> List[Loop]:
+        """Ciclos naturales, uno por cabecera, de los más internos a los externos."""
+        if self._loops is None:
+            by_header: Dict[BasicBlock, Loop] = {}
+            for b in self.reverse_postorder():
+                for h in b.succs:
+                    if not self.dominates(h, b):
+                        continue
+                    loop = by_header.get(h)
+                    if loop is None:
+                        loop = by_header[h] = Loop(h)
+                    loop.latches.append(b)
+                    stack = [b]
+                    while stack:
+                        n = stack.pop()
+                        if n not in loop.body:
+                            loop.body.add(n)
+                            stack.extend(n.preds)
+            loops = sorted(by_header.values(), key=lambda l: len(l.body))
+            for i, inner in enumerate(loops):
+                for outer in loops[i + 1:]:
+                    if inner.header in outer.body and inner is not outer:
+                        inner.parent = outer
+                        break
+            self._loops = loops
+        return self._loops
+
+    def preheader(self, loop: Loop) -> Optional[BasicBlock]:
+        """Bloque por el que se entra al ciclo desde afuera, que solo sigue a la cabecera.
+
+        Si no existe se crea `<cabecera>_pre` justo antes de la cabecera y los saltos de
+        afuera pasan a apuntarle. None si no se puede: cabecera sin etiqueta o que es la
+        entrada de la unidad, o un bloque del ciclo que cae en ella por fallthrough."""
+        header = loop.header
+        outside = [p for p in header.preds if p not in loop.body]
+        if len(outside) == 1 and outside[0].succs == [header]:
+            return outside[0]
+        i = self.blocks.index(header)
+        if header.label is None or i == 0 or is_function_label(header.instrs[0]):
+            return None
+        prev = self.blocks[i - 1]
+        if prev in loop.body and header in prev.succs and \
+                (not prev.instrs or prev.instrs[-1].op not in ('GOTO', 'JUMPTABLE', 'RET')):
+            return None
+        label = f"{header.label}_pre"
+        pre = BasicBlock(self._new_id(), [Instr('LABEL', label)], header.seg)
+        self.blocks.insert(i, pre)
+        for p in outside:
+            term = p.terminator
+            if term is not None and header.label in jump_targets(term):
+                table = term.b
+                if term.op == 'JUMPTABLE':
+                    table = '[' + ','.join(label if x == header.label else x
+                                           for x in table[1:-1].split(',')) + ']'
+                dst = label if term.dst == header.label else term.dst
+                p.instrs[-1] = Instr(term.op, dst, term.a, table)
+        self.link_all()
+        return pre
+
+    def instructions(self) -> List[Instr]:
+        return [ins for b in self.blocks for ins in b.instrs]
+
+
+class ProgramCFG:
+    """Todas las unidades de un programa y el orden original de sus bloques."""
+
+    def __init__(self, instrs: Iterable[Instr]):
+        self.functions: Dict[str, FunctionCFG] = {GLOBAL: FunctionCFG(GLOBAL)}
+        # tramos en orden original: (unidad, instrucciones contiguas de esa unidad)
+        segments: List[tuple] = []
+        stack = [self.functions[GLOBAL]]
+        cur: List[Instr] = []
+
+        def flush():
+            if cur:
+                segments.append((stack[-1], list(cur)))
+                cur.clear()
+
+        for ins in instrs:
+            ins = Instr(ins.op, ins.dst, ins.a, ins.b)
+            if is_function_label(ins):
+                flush()
+                unit = self.functions[ins.dst] = FunctionCFG(ins.dst)
+                stack.append(unit)
+                cur.append(ins)
+            elif is_end_label(ins) and len(stack) > 1:
+                cur.append(ins)
+                flush()
+                stack.pop()
+            else:
+                cur.append(ins)
+        flush()
+
+        self._segments = len(segments)
+        for k, (unit, seg) in enumerate(segments):
+            blocks = split_blocks(seg, unit._new_id)
+            for b in blocks:
+                b.seg = k
+            unit.blocks.extend(blocks)
+        for unit in self.functions.values():
+            unit.link_all()
+
+    def __iter__(self):
+        return iter(self.functions.values())
+
+    def function(self, name: str) -> FunctionCFG:
+        return self.functions[name]
+
+    def instructions(self) -> List[Instr]:
+        """TAC linealizado en el orden original, con los cambios hechos en los bloques."""
+        by_seg: List[List[BasicBlock]] = [[] for _ in range(self._segments)]
+        for unit in self.functions.values():
+            for b in unit.blocks:
+                by_seg[b.seg].append(b)
+        return [ins for seg in by_seg for b in seg for ins in b.instrs]
+
+
+def build_cfg(instrs: Iterable[Instr]) -> ProgramCFG:
+    return ProgramCFG(instrs)
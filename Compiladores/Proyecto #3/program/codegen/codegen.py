@@ -1,6 +1,8 @@
+from antlr4.tree.Tree import TerminalNode
 from CompiscriptVisitor import CompiscriptVisitor
 from CompiscriptParser import CompiscriptParser
 from codegen.tac import Emitter
+from dispatch import dispatch_table, lookup
 
 
 class CodeGenVisitor(CompiscriptVisitor):
@@ -8,6 +10,8 @@ class CodeGenVisitor(CompiscriptVisitor):
         super().__init__()
         self.em = Emitter()
         self.static_arrays = {}  # <--- Agrega esto
+        self._switches = 0
+        self._dispatch = dispatch_table(type(self))
 
     def _expr_node(self, node):
         """Helper: ANTLR may return a single node or a list; normalize to single node or None."""
@@ -21,15 +25,6 @@ class CodeGenVisitor(CompiscriptVisitor):
             pass
         return node
 
-    def visit(self, tree):  # type: ignore[override]
-        if tree is None:
-            return None
-        method_name = 'visit' + type(tree).__name__.replace('Context', '')
-        visitor = getattr(self, method_name, None)
-        if visitor:
-            return visitor(tree)
-        return super().visit(tree)
-
     def visitProgram(self, ctx: CompiscriptParser.ProgramContext):
         # Visitar explícitamente cada statement para asegurar recorrido completo
         idx = 0
@@ -49,11 +44,11 @@ class CodeGenVisitor(CompiscriptVisitor):
                 last = self.visit(t)
             return last
 
-        class_name = tree.__class__.__name__
-        base_name = class_name[:-7] if class_name.endswith('Context') else class_name
-        method_name = f"visit{base_name}"
-        if hasattr(self, method_name):
-            return getattr(self, method_name)(tree)
+        method = self._dispatch.get(tree.__class__)
+        if method is None:
+            method = lookup(self._dispatch, type(self), tree.__class__)
+        if method[0] is not None:
+            return method[0](self, tree)
         return self.visitChildren(tree)
 
     def visitProgram(self, ctx: CompiscriptParser.ProgramContext):
@@ -211,287 +206,300 @@ class CodeGenVisitor(CompiscriptVisitor):
             if isinstance(val, str) and val.startswith('t'):
                 self.em.free_temp(val)
 
-    def visitAnyExpression(self, ctx):
-        """Recursively visit expressions to produce a value or temporary."""
-        cname = type(ctx).__name__
-        ctext = ctx.getText()
-        children = list(ctx.getChildren()) if hasattr(ctx, 'getChildren') else []
+    # ---------- Expresiones ----------
+    # El lowering recorre el árbol una sola vez guiado por el tipo de cada nodo: los
+    # operadores se leen de los terminales y los nombres de los tokens Identifier, sin
+    # reconstruir el texto de subárboles ni volver a buscar dentro de ellos.
 
-        if not hasattr(ctx, 'getChildCount'):
-            return None
+    _BINARY_OPS = {
+        '+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV', '%': 'MOD',
+        '==': 'EQ', '!=': 'NE', '<': 'LT', '<=': 'LE', '>': 'GT', '>=': 'GE',
+        '&&': 'AND', '||': 'OR',
+    }
 
-        if 'Literal' in cname:
-            return ctext
-        
-        # Check if this is array indexing: identifier[expression]
-        if '[' in ctext and ']' in ctext and not ctext.startswith('new'):
-            # Extract array name and index expression
-            try:
-                arr_name = ctext.split('[')[0].strip()
-                # Find the index expression within brackets
-                
-                # Look for array access pattern in children
-                for i, ch in enumerate(children):
-                    ch_text = ch.getText() if hasattr(ch, 'getText') else ''
-                    if ch_text == '[':
-                        # Next child should be the index expression
-                        if i + 1 < len(children):
-                            idx_expr = children[i + 1]
-                            idx_val = self.visitAnyExpression(idx_expr)
-                            
-                            # Generate TAC for array access
-                            t_base = self.em.new_temp()
-                            self.em.emit('LOAD', dst=t_base, a=arr_name)
-                            
-                            t_off = self.em.new_temp()
-                            self.em.emit('MUL', dst=t_off, a=idx_val, b='4')
-                            
-                            t_addr = self.em.new_temp()
-                            self.em.emit('ADD', dst=t_addr, a=t_base, b=t_off)
-                            
-                            t_result = self.em.new_temp()
-                            self.em.emit('LOAD', dst=t_result, a=t_addr)
-                            
-                            return t_result
-            except Exception:
-                pass
-
-        if 'AdditiveExpr' in cname and ctx.getChildCount() > 1:
-            left = self.visitAnyExpression(ctx.getChild(0))
-            op = ctx.getChild(1).getText()
-            right = self.visitAnyExpression(ctx.getChild(2))
-            dst = self.em.new_temp()
-            self.em.emit('ADD' if op == '+' else 'SUB', dst=dst, a=left, b=right)
-            return dst
+    _NEGATED = {'EQ': 'NE', 'NE': 'EQ', 'LT': 'GE', 'GE': 'LT', 'GT': 'LE', 'LE': 'GT'}
 
-        if ('RelationalExpr' in cname or 'EqualityExpr' in cname) and ctx.getChildCount() > 1:
-            left = self.visitAnyExpression(ctx.getChild(0))
-            op = ctx.getChild(1).getText()
-            right = self.visitAnyExpression(ctx.getChild(2))
-            dst = self.em.new_temp()
-            map_op = {
-                '==': 'EQ', '!=': 'NE', '<': 'LT', '<=': 'LE', '>': 'GT', '>=': 'GE'
-            }
-            opcode = map_op.get(op, 'SUB')
-            self.em.emit(opcode, dst=dst, a=left, b=right)
-            return dst
+    @staticmethod
+    def _unwrap(ctx, parens=False):
+        """Baja por los nodos envoltorio de un solo hijo (y por los paréntesis si `parens`)."""
+        P = CompiscriptParser
+        while True:
+            if isinstance(ctx, (P.ExpressionContext, P.ExprNoAssignContext, P.PrimaryExprContext)) \
+                    and ctx.getChildCount() == 1:
+                ctx = ctx.getChild(0)
+                continue
+            if isinstance(ctx, (P.TernaryExprContext, P.LogicalOrExprContext, P.LogicalAndExprContext,
+                                P.EqualityExprContext, P.RelationalExprContext, P.AdditiveExprContext,
+                                P.MultiplicativeExprContext, P.UnaryExprContext)) and ctx.getChildCount() == 1:
+                ctx = ctx.getChild(0)
+                continue
+            if parens and isinstance(ctx, P.PrimaryExprContext) and ctx.expression() is not None:
+                ctx = ctx.expression()
+                continue
+            return ctx
 
-        # function call handling: detect CallExpr or arguments anywhere in subtree
-        def find_call_node(node):
-            try:
-                node_text = node.getText() if hasattr(node, 'getText') else ''
-                # Exclude array indexing patterns
-                if '[' in node_text and ']' in node_text:
-                    return None
-                if 'CallExpr' in type(node).__name__:
-                    return node
-                if hasattr(node, 'arguments') and node.arguments():
-                    return node
-            except Exception:
-                pass
-            try:
-                for i in range(node.getChildCount()):
-                    ch = node.getChild(i)
-                    res = find_call_node(ch)
-                    if res:
-                        return res
-            except Exception:
-                # not a parser node
-                return None
+    def visitAnyExpression(self, ctx):
+        """Recursively visit expressions to produce a value or temporary."""
+        if ctx is None or not hasattr(ctx, 'getChildCount'):
             return None
-
-        call_node = find_call_node(ctx)
-        if call_node is None and '(' in ctext and ctext.endswith(')') and '[' not in ctext:
-            call_node = ctx
-
-        if call_node:
-            # HANDLE: constructor 'new Class(...)' -> NEWOBJ + CALL init
-            # --- CONSTRUCTOR: new Clase(...) ---
-            if isinstance(ctext, str) and ctext.strip().startswith('new'):
-                class_name = ctext.replace('new', '', 1).split('(')[0].strip()
-                dst_new = self.em.new_temp()
-                self.em.emit('NEWOBJ', dst=dst_new, a=class_name)
-                args = []
-                if hasattr(call_node, 'arguments') and call_node.arguments():
-                    for ex in call_node.arguments().expression():
-                        val = self.visitAnyExpression(ex)
-                        if val is not None:
-                            args.append(val)
-                if not args:
-                    for ch in children:
-                        if hasattr(ch, 'accept') and 'Expression' in type(ch).__name__:
-                            val = self.visitAnyExpression(ch)
-                            if val is not None:
-                                args.append(val)
-                self.em.emit('ARG', a=dst_new)
-                for a in args:
-                    self.em.emit('ARG', a=a)
-                self.em.emit('CALL', dst=dst_new, a=f'method_{class_name}_init')
-                return dst_new
-            # --- resto: llamadas a métodos normales ---
-            args = []
-            try:
-                if hasattr(call_node, 'arguments') and call_node.arguments():
-                    for ex in call_node.arguments().expression():
-                        val = self.visitAnyExpression(ex)
-                        if val is not None:
-                            args.append(val)
-            except Exception:
-                pass
-            if not args:
-                for ch in children:
-                    if hasattr(ch, 'accept') and 'Expression' in type(ch).__name__:
-                        val = self.visitAnyExpression(ch)
-                        if val is not None:
-                            args.append(val)
-            emit_args = []
-            try:
-                left_text = ctext.split('(')[0].strip()
-                if '.' in left_text:
-                    obj_name = left_text.split('.', 1)[0].strip()
-                    if obj_name:
-                        tmp_obj = self.em.new_temp()
-                        self.em.emit('LOAD', dst=tmp_obj, a=obj_name)
-                        emit_args.append(tmp_obj)
-            except Exception:
-                pass
-            for a in args:
-                emit_args.append(a)
-            for a in emit_args:
-                self.em.emit('ARG', a=a)
+        P = CompiscriptParser
+        # bajar por los nodos envoltorio de un solo hijo sin recursión
+        ctx = self._unwrap(ctx)
+
+        if isinstance(ctx, P.LiteralExprContext):
+            if ctx.arrayLiteral() is not None:
+                return ctx.getText()
+            return ctx.getChild(0).getText()
+        if isinstance(ctx, P.LeftHandSideContext):
+            return self._lower_lhs(ctx)
+        if isinstance(ctx, (P.LogicalOrExprContext, P.LogicalAndExprContext)):
+            return self._lower_logical(ctx)
+        if isinstance(ctx, (P.EqualityExprContext, P.RelationalExprContext, P.AdditiveExprContext,
+                            P.MultiplicativeExprContext)):
+            return self._lower_binary(ctx)
+        if isinstance(ctx, P.UnaryExprContext):
+            op = ctx.getChild(0).getText()
+            val = self.visitAnyExpression(ctx.unaryExpr())
             dst = self.em.new_temp()
-            fname = None
-            try:
-                left = ctext.split('(')[0].strip()
-                if '.' in left:
-                    obj_name, method_name = left.split('.', 1)
-                    obj_name = obj_name.strip()
-                    method_name = method_name.strip()
-                    if obj_name and method_name:
-                        fname = f"method_{obj_name}_{method_name}"
-                else:
-                    if left:
-                        fname = f"func_{left}"
-                    else:
-                        def find_identifier(node):
-                            try:
-                                if hasattr(node, 'Identifier') and node.Identifier():
-                                    return node.Identifier().getText()
-                            except Exception:
-                                pass
-                            try:
-                                for i in range(node.getChildCount()):
-                                    ch = node.getChild(i)
-                                    res = find_identifier(ch)
-                                    if res:
-                                        return res
-                            except Exception:
-                                return None
-                            return None
-                        f = find_identifier(call_node)
-                        if f:
-                            fname = f"func_{f}"
-            except Exception:
-                pass
-            if not fname or 'Unknown' in fname:
-                raise Exception(f"No se pudo resolver el nombre del método/procedimiento para la llamada: {ctext}")
-            self.em.emit('CALL', dst=dst, a=fname)
+            if op == '-':
+                self.em.emit('SUB', dst=dst, a='0', b=val)
+            else:
+                self.em.emit('NOT', dst=dst, a=val)
             return dst
+        if isinstance(ctx, P.PrimaryExprContext):
+            # '(' expression ')'
+            return self.visitAnyExpression(ctx.expression())
+        if isinstance(ctx, P.TernaryExprContext):
+            return self._lower_ternary(ctx)
+        if isinstance(ctx, P.AssignExprContext):
+            return self._lower_assign_expr(ctx)
+        if isinstance(ctx, P.PropertyAssignExprContext):
+            val = self.visitAnyExpression(ctx.assignmentExpr())
+            obj = self._lower_lhs(ctx.lhs)
+            self.em.emit('SETPROP', dst=obj, a=f'"{ctx.Identifier().getText()}"', b=val)
+            return val
+
+        # nodo no reconocido: evaluar los hijos que sean reglas y quedarse con el último valor
+        last_val = None
+        for i in range(ctx.getChildCount()):
+            ch = ctx.getChild(i)
+            if hasattr(ch, 'getChildCount') and not isinstance(ch, TerminalNode):
+                val = self.visitAnyExpression(ch)
+                if val is not None:
+                    last_val = val
+        return last_val
+
+    def _lower_binary(self, ctx):
+        """Cadena asociativa a la izquierda: operando (op operando)*."""
+        left = self.visitAnyExpression(ctx.getChild(0))
+        for i in range(1, ctx.getChildCount(), 2):
+            op = ctx.getChild(i).getText()
+            right = self.visitAnyExpression(ctx.getChild(i + 1))
+            dst = self.em.new_temp()
+            self.em.emit(self._BINARY_OPS.get(op, 'SUB'), dst=dst, a=left, b=right)
+            left = dst
+        return left
 
-        if 'MultiplicativeExpr' in cname and ctx.getChildCount() > 1:
+    # ---------- Condiciones (código de saltos) ----------
+    # `&&` y `||` se traducen con saltos: cada operando salta directo al destino que le
+    # corresponde y los que ya no hacen falta no se evalúan. Solo se usan IFZ y GOTO, así
+    # que el backend y los pases sobre el TAC no necesitan nada nuevo.
+
+    def _jump_if(self, ctx, label, when):
+        """Salta a `label` si la condición vale `when` (True/False); si no, sigue de largo."""
+        P = CompiscriptParser
+        ctx = self._unwrap(ctx, parens=True)
+        if isinstance(ctx, (P.LogicalAndExprContext, P.LogicalOrExprContext)):
+            operands = [ctx.getChild(i) for i in range(0, ctx.getChildCount(), 2)]
+            # el valor de la cadena queda decidido apenas un operando vale `decides`
+            decides = isinstance(ctx, P.LogicalOrExprContext)
+            if when == decides:
+                for op in operands:
+                    self._jump_if(op, label, when)
+                return
+            skip = self.em.new_label()
+            for op in operands[:-1]:
+                self._jump_if(op, skip, decides)
+            self._jump_if(operands[-1], label, when)
+            self.em.emit('LABEL', dst=skip)
+            return
+        if isinstance(ctx, P.UnaryExprContext) and ctx.getChild(0).getText() == '!':
+            self._jump_if(ctx.unaryExpr(), label, not when)
+            return
+        if isinstance(ctx, P.LiteralExprContext) and ctx.getChild(0).getText() in ('true', 'false'):
+            if (ctx.getChild(0).getText() == 'true') == when:
+                self.em.emit('GOTO', dst=label)
+            return
+        if isinstance(ctx, (P.EqualityExprContext, P.RelationalExprContext)) and ctx.getChildCount() == 3:
+            # una sola comparación: IFZ sobre ella (o sobre la negada); el backend la
+            # fusiona en un único branch
+            op = self._BINARY_OPS[ctx.getChild(1).getText()]
             left = self.visitAnyExpression(ctx.getChild(0))
-            op = ctx.getChild(1).getText()
             right = self.visitAnyExpression(ctx.getChild(2))
             dst = self.em.new_temp()
-            self.em.emit('MUL' if op == '*' else 'DIV', dst=dst, a=left, b=right)
-            return dst
+            self.em.emit(self._NEGATED[op] if when else op, dst=dst, a=left, b=right)
+            self.em.emit('IFZ', dst=label, a=dst)
+            return
+        val = self.visitAnyExpression(ctx)
+        if when:
+            dst = self.em.new_temp()
+            self.em.emit('EQ', dst=dst, a=val, b='0')
+            val = dst
+        self.em.emit('IFZ', dst=label, a=val)
 
-        if 'LeftHandSide' in cname or 'PrimaryAtom' in cname or 'Identifier' in cname:
-            name = ctx.getText()
-            
-            # **PRIMERO: Check for array access**
-            if isinstance(name, str) and '[' in name and ']' in name:
-                try:
-                    arr_name = name.split('[')[0].strip()
-                    idx_str = name[name.index('[')+1:name.rindex(']')].strip()
-                    
-                    # Si el índice es solo un número
-                    if idx_str.isdigit():
-                        idx_val = idx_str
-                    else:
-                        # Si es una expresión más compleja, necesitamos evaluarla
-                        # pero por ahora usamos el valor directo
-                        idx_val = idx_str
-                    
-                    # Generate TAC for array access
-                    t_base = self.em.new_temp()
-                    self.em.emit('LOAD', dst=t_base, a=arr_name)
-                    
-                    t_off = self.em.new_temp()
-                    self.em.emit('MUL', dst=t_off, a=idx_val, b='4')
-                    
-                    t_addr = self.em.new_temp()
-                    self.em.emit('ADD', dst=t_addr, a=t_base, b=t_off)
-                    
-                    t_result = self.em.new_temp()
-                    self.em.emit('LOAD', dst=t_result, a=t_addr)
-                    
-                    return t_result
-                except Exception:
-                    pass
-            
-            # Property access like obj.prop -> GETPROP
-            try:
-                if isinstance(name, str) and '.' in name and '[' not in name:
-                    obj_name, prop = name.split('.', 1)
-                    obj_tmp = self.em.new_temp()
-                    self.em.emit('LOAD', dst=obj_tmp, a=obj_name)
-                    dst_prop = self.em.new_temp()
-                    self.em.emit('GETPROP', dst=dst_prop, a=obj_tmp, b=f'"{prop}"')
-                    return dst_prop
-            except Exception:
-                pass
-            
-            # Simple identifier load
-            tmp = self.em.new_temp()
-            self.em.emit('LOAD', dst=tmp, a=name)
-            return tmp
+    def _lower_logical(self, ctx):
+        """`&&`/`||` como valor: código de saltos que deja 1 o 0 en un temporal."""
+        false_lbl = self.em.new_label()
+        end_lbl = self.em.new_label()
+        dst = self.em.new_temp()
+        self._jump_if(ctx, false_lbl, False)
+        self.em.emit('MOV', dst=dst, a='1')
+        self.em.emit('GOTO', dst=end_lbl)
+        self.em.emit('LABEL', dst=false_lbl)
+        self.em.emit('MOV', dst=dst, a='0')
+        self.em.emit('LABEL', dst=end_lbl)
+        return dst
 
-        if ctext.startswith('(') and ctext.endswith(')'):
-            for ch in ctx.getChildren():
-                if hasattr(ch, 'accept'):
-                    return self.visitAnyExpression(ch)
+    def _lower_ternary(self, ctx):
+        else_lbl = self.em.new_label()
+        end_lbl = self.em.new_label()
+        dst = self.em.new_temp()
+        self._jump_if(ctx.logicalOrExpr(), else_lbl, False)
+        val = self.visitAnyExpression(ctx.expression(0))
+        self.em.emit('ADD', dst=dst, a=val, b='0')
+        self.em.emit('GOTO', dst=end_lbl)
+        self.em.emit('LABEL', dst=else_lbl)
+        val = self.visitAnyExpression(ctx.expression(1))
+        self.em.emit('ADD', dst=dst, a=val, b='0')
+        self.em.emit('LABEL', dst=end_lbl)
+        return dst
+
+    def _lower_assign_expr(self, ctx):
+        """`lhs = expr` usado como expresión; devuelve el valor asignado."""
+        lhs = ctx.lhs
+        suffixes = lhs.suffixOp()
+        atom = lhs.primaryAtom()
+        if not suffixes and isinstance(atom, CompiscriptParser.IdentifierExprContext):
+            val = self.visitAnyExpression(ctx.assignmentExpr())
+            self.em.emit('STORE', dst=atom.Identifier().getText(), a=val)
+            return val
+        if suffixes and isinstance(suffixes[-1], CompiscriptParser.PropertyAccessExprContext):
+            val = self.visitAnyExpression(ctx.assignmentExpr())
+            obj = self._lower_lhs(lhs, len(suffixes) - 1)
+            self.em.emit('SETPROP', dst=obj, a=f'"{suffixes[-1].Identifier().getText()}"', b=val)
+            return val
+        # arr[i] = v: el TAC todavía no tiene store indirecto; se evalúan ambos lados
+        self._lower_lhs(lhs)
+        return self.visitAnyExpression(ctx.assignmentExpr())
+
+    def _simple_operand(self, ctx):
+        """Texto de un literal o identificador suelto (sin generar código); None si no lo es."""
+        while ctx is not None and not isinstance(ctx, TerminalNode) and ctx.getChildCount() == 1:
+            if isinstance(ctx, CompiscriptParser.LeftHandSideContext):
+                atom = ctx.primaryAtom()
+                if isinstance(atom, CompiscriptParser.IdentifierExprContext):
+                    return atom.Identifier().getText()
+                return None
+            if isinstance(ctx, CompiscriptParser.LiteralExprContext):
+                return None if ctx.arrayLiteral() is not None else ctx.getChild(0).getText()
+            ctx = ctx.getChild(0)
+        return None
 
-        # Refuerzo: si el nodo no es reconocido, recorre todos los hijos y combina los resultados
-        last_val = None
-        op = None
-        for ch in children:
-            if hasattr(ch, 'accept'):
-                val = self.visitAnyExpression(ch)
+    def _lower_args(self, args_ctx):
+        args = []
+        if args_ctx is not None:
+            for ex in args_ctx.expression():
+                val = self.visitAnyExpression(ex)
                 if val is not None:
-                    if last_val is None:
-                        last_val = val
-                    elif op is not None:
-                        dst = self.em.new_temp()
-                        if op == '+':
-                            self.em.emit('ADD', dst=dst, a=last_val, b=val)
-                        elif op == '-':
-                            self.em.emit('SUB', dst=dst, a=last_val, b=val)
-                        elif op == '*':
-                            self.em.emit('MUL', dst=dst, a=last_val, b=val)
-                        elif op == '/':
-                            self.em.emit('DIV', dst=dst, a=last_val, b=val)
-                        last_val = dst
-                        op = None
-                    else:
-                        last_val = val
-            elif hasattr(ch, 'getText'):
-                text = ch.getText()
-                if text in ['+', '-', '*', '/']:
-                    op = text
-        if last_val is not None:
-            return last_val
-        return None
+                    args.append(val)
+        return args
+
+    def _lower_new(self, atom):
+        # --- CONSTRUCTOR: new Clase(...) -> NEWOBJ + CALL init ---
+        class_name = atom.Identifier().getText()
+        dst_new = self.em.new_temp()
+        self.em.emit('NEWOBJ', dst=dst_new, a=class_name)
+        args = self._lower_args(atom.arguments())
+        self.em.emit('ARG', a=dst_new)
+        for a in args:
+            self.em.emit('ARG', a=a)
+        self.em.emit('CALL', dst=dst_new, a=f'method_{class_name}_init')
+        return dst_new
+
+    def _lower_call(self, fname, receiver, args_ctx):
+        """Argumentos, receptor (métodos) y CALL; `receiver` es el nombre del objeto o None."""
+        args = self._lower_args(args_ctx)
+        emit_args = []
+        if receiver is not None:
+            tmp_obj = self.em.new_temp()
+            self.em.emit('LOAD', dst=tmp_obj, a=receiver)
+            emit_args.append(tmp_obj)
+        emit_args.extend(args)
+        for a in emit_args:
+            self.em.emit('ARG', a=a)
+        dst = self.em.new_temp()
+        self.em.emit('CALL', dst=dst, a=fname)
+        return dst
+
+    def _lower_lhs(self, ctx, count=None):
+        """primaryAtom seguido de sufijos (llamada, índice, propiedad); `count` limita los sufijos."""
+        P = CompiscriptParser
+        atom = ctx.primaryAtom()
+        suffixes = ctx.suffixOp()
+        if count is not None:
+            suffixes = suffixes[:count]
+        if isinstance(atom, P.NewExprContext):
+            cur, name = self._lower_new(atom), None
+        else:
+            # Identifier o 'this': el nombre todavía no se ha cargado
+            cur = None
+            name = atom.Identifier().getText() if isinstance(atom, P.IdentifierExprContext) else 'this'
+
+        i = 0
+        n = len(suffixes)
+        while i < n:
+            s = suffixes[i]
+            if isinstance(s, P.CallExprContext):
+                if name is None:
+                    raise Exception(f"No se pudo resolver el nombre del procedimiento en la línea {s.start.line}")
+                cur, name = self._lower_call(f'func_{name}', None, s.arguments()), None
+            elif isinstance(s, P.PropertyAccessExprContext):
+                prop = s.Identifier().getText()
+                if i + 1 < n and isinstance(suffixes[i + 1], P.CallExprContext):
+                    if name is None:
+                        raise Exception(f"No se pudo resolver el método '{prop}' en la línea {s.start.line}")
+                    cur, name = self._lower_call(f'method_{name}_{prop}', name, suffixes[i + 1].arguments()), None
+                    i += 2
+                    continue
+                obj = cur
+                if obj is None:
+                    obj = self.em.new_temp()
+                    self.em.emit('LOAD', dst=obj, a=name)
+                dst_prop = self.em.new_temp()
+                self.em.emit('GETPROP', dst=dst_prop, a=obj, b=f'"{prop}"')
+                cur, name = dst_prop, None
+            else:
+                # índice: arr[expr] -> base + idx*4
+                idx_val = self._simple_operand(s.expression())
+                if idx_val is None:
+                    idx_val = self.visitAnyExpression(s.expression())
+                t_base = cur
+                if t_base is None:
+                    t_base = self.em.new_temp()
+                    self.em.emit('LOAD', dst=t_base, a=name)
+                t_off = self.em.new_temp()
+                self.em.emit('MUL', dst=t_off, a=idx_val, b='4')
+                t_addr = self.em.new_temp()
+                self.em.emit('ADD', dst=t_addr, a=t_base, b=t_off)
+                t_result = self.em.new_temp()
+                self.em.emit('LOAD', dst=t_result, a=t_addr)
+                cur, name = t_result, None
+            i += 1
+
+        if cur is None:
+            cur = self.em.new_temp()
+            self.em.emit('LOAD', dst=cur, a=name)
+        return cur
 
     def visitAssignment(self, ctx):
         # Robustly obtain left-hand side name or node
@@ -624,9 +632,8 @@ class CodeGenVisitor(CompiscriptVisitor):
         left = self.visit(ctx.unaryExpr(0))
         for i in range(1, len(ctx.unaryExpr())):
             right = self.visit(ctx.unaryExpr(i))
-            op = '*' if '*' in ctx.getText() else '/'
             dst = self.em.new_temp()
-            self.em.emit('MUL' if op == '*' else 'DIV', dst=dst, a=left, b=right)
+            self.em.emit(self._BINARY_OPS[ctx.getChild(2 * i - 1).getText()], dst=dst, a=left, b=right)
             if isinstance(left, str) and left.startswith('t'):
                 self.em.free_temp(left)
             if isinstance(right, str) and right.startswith('t'):
@@ -653,10 +660,9 @@ class CodeGenVisitor(CompiscriptVisitor):
     def visitIfStatement(self, ctx):
         # if '(' expression ')' block ('else' block)?;
         # evaluate condition using expression visitor (robust for relational/etc.)
-        cond = self.visitAnyExpression(self._expr_node(ctx.expression())) if hasattr(ctx, 'expression') and ctx.expression() else None
         else_lbl = self.em.new_label()
         end_lbl = self.em.new_label()
-        self.em.emit('IFZ', dst=else_lbl, a=cond)
+        self._jump_if(self._expr_node(ctx.expression()), else_lbl, False)
         # then-block
         if hasattr(ctx, 'block') and ctx.block(0):
             self.visit(ctx.block(0))
@@ -677,8 +683,7 @@ class CodeGenVisitor(CompiscriptVisitor):
         start = self.em.new_label()
         end = self.em.new_label()
         self.em.emit('LABEL', dst=start)
-        cond = self.visitAnyExpression(self._expr_node(ctx.expression())) if hasattr(ctx, 'expression') and ctx.expression() else None
-        self.em.emit('IFZ', dst=end, a=cond)
+        self._jump_if(self._expr_node(ctx.expression()), end, False)
         # Robust: accept both block and statement as body
         if hasattr(ctx, 'block') and ctx.block() is not None:
             self.visit(ctx.block())
@@ -697,10 +702,8 @@ class CodeGenVisitor(CompiscriptVisitor):
             self.visit(ctx.block())
         elif hasattr(ctx, 'statement') and ctx.statement() is not None:
             self.visit(ctx.statement())
-        cond = self.visitAnyExpression(self._expr_node(ctx.expression())) if hasattr(ctx, 'expression') and ctx.expression() else None
-        # if condition false -> end
-        self.em.emit('IFZ', dst=end, a=cond)
-        self.em.emit('GOTO', dst=start)
+        # si la condición es verdadera -> otra vuelta
+        self._jump_if(self._expr_node(ctx.expression()), start, True)
         self.em.emit('LABEL', dst=end)
         return None
 
@@ -717,14 +720,8 @@ class CodeGenVisitor(CompiscriptVisitor):
         end = self.em.new_label()
         self.em.emit('LABEL', dst=start)
         # condition is expression(0) if present
-        cond = None
-        try:
-            if ctx.expression() and len(ctx.expression()) >= 1:
-                cond = self.visitAnyExpression(ctx.expression(0))
-        except Exception:
-            cond = None
-        if cond is not None:
-            self.em.emit('IFZ', dst=end, a=cond)
+        if ctx.expression():
+            self._jump_if(ctx.expression(0), end, False)
         # body
         if hasattr(ctx, 'block') and ctx.block() is not None:
             self.visit(ctx.block())
@@ -740,6 +737,106 @@ class CodeGenVisitor(CompiscriptVisitor):
         self.em.emit('LABEL', dst=end)
         return None
 
+    # ---------- switch ----------
+    # Cada caso termina saltando al final del switch (no hay fallthrough: el análisis
+    # semántico solo acepta `break` dentro de ciclos). El despacho depende de los casos:
+    #   linear    pocos casos o constantes no enteras: una comparación por caso
+    #   jumptable constantes enteras densas: chequeo de rango y salto indexado
+    #   bsearch   constantes enteras dispersas: búsqueda binaria con comparaciones
+    # La estrategia elegida queda a la vista en el TAC como la etiqueta `swN_<estrategia>`.
+    SWITCH_LINEAR_MAX = 3      # hasta cuántos casos se comparan en fila
+    SWITCH_MIN_DENSITY = 0.5   # casos / tamaño del rango para usar tabla
+    SWITCH_TABLE_MAX = 1024    # entradas máximas de una tabla
+
+    def _int_constant(self, ctx):
+        """Valor de una constante entera (`5`, `-3`, `(7)`); None si no lo es."""
+        ctx = self._unwrap(ctx, parens=True)
+        sign = 1
+        if isinstance(ctx, CompiscriptParser.UnaryExprContext) and ctx.getChild(0).getText() == '-':
+            sign = -1
+            ctx = self._unwrap(ctx.unaryExpr(), parens=True)
+        if isinstance(ctx, CompiscriptParser.LiteralExprContext) and ctx.Literal() is not None:
+            text = ctx.Literal().getText()
+            if text.isdigit():
+                return sign * int(text)
+        return None
+
+    def _switch_strategy(self, values):
+        if any(v is None for v in values) or len(values) <= self.SWITCH_LINEAR_MAX:
+            return 'linear'
+        span = max(values) - min(values) + 1
+        if span <= self.SWITCH_TABLE_MAX and len(set(values)) >= self.SWITCH_MIN_DENSITY * span:
+            return 'jumptable'
+        return 'bsearch'
+
+    def _switch_compare(self, disc, cases, default):
+        """Despacho lineal: `disc == v` salta al caso; si ninguno coincide, al default.
+        Un caso que no es constante llega como nodo y se evalúa en su turno."""
+        for value, target in cases:
+            if not isinstance(value, str):
+                value = self.visitAnyExpression(value)
+            t = self.em.new_temp()
+            self.em.emit('NE', dst=t, a=disc, b=value)
+            self.em.emit('IFZ', dst=target, a=t)
+        self.em.emit('GOTO', dst=default)
+
+    def _switch_bsearch(self, disc, cases, default):
+        """`cases` ordenado por valor: parte en la mediana hasta llegar a pocos casos."""
+        if len(cases) <= self.SWITCH_LINEAR_MAX:
+            self._switch_compare(disc, cases, default)
+            return
+        mid = len(cases) // 2
+        upper = self.em.new_label()
+        t = self.em.new_temp()
+        self.em.emit('LT', dst=t, a=disc, b=cases[mid][0])
+        self.em.emit('IFZ', dst=upper, a=t)
+        self._switch_bsearch(disc, cases[:mid], default)
+        self.em.emit('LABEL', dst=upper)
+        self._switch_bsearch(disc, cases[mid:], default)
+
+    def _switch_table(self, disc, cases, default):
+        low = min(int(v) for v, _ in cases)
+        high = max(int(v) for v, _ in cases)
+        table = [default] * (high - low + 1)
+        for value, target in reversed(cases):  # con constantes repetidas gana la primera
+            table[int(value) - low] = target
+        index = disc
+        if low != 0:
+            index = self.em.new_temp()
+            self.em.emit('SUB', dst=index, a=disc, b=str(low))
+        self.em.emit('JUMPTABLE', dst=default, a=index, b=f"[{','.join(table)}]")
+
+    def visitSwitchStatement(self, ctx):
+        disc = self.visitAnyExpression(ctx.expression())
+        clauses = ctx.switchCase()
+        values = [self._int_constant(c.expression()) for c in clauses]
+        labels = [self.em.new_label() for _ in clauses]
+        end = self.em.new_label()
+        default = self.em.new_label() if ctx.defaultCase() is not None else end
+        strategy = self._switch_strategy(values)
+        self.em.emit('LABEL', dst=f'sw{self._switches}_{strategy}')
+        self._switches += 1
+        if strategy == 'linear':
+            self._switch_compare(disc, [(str(v) if v is not None else c.expression(), target)
+                                        for c, v, target in zip(clauses, values, labels)], default)
+        else:
+            cases = [(str(v), target) for v, target in sorted(zip(values, labels), key=lambda vt: vt[0])]
+            if strategy == 'jumptable':
+                self._switch_table(disc, cases, default)
+            else:
+                self._switch_bsearch(disc, cases, default)
+        for c, target in zip(clauses, labels):
+            self.em.emit('LABEL', dst=target)
+            for st in c.statement():
+                self.visit(st)
+            self.em.emit('GOTO', dst=end)
+        if ctx.defaultCase() is not None:
+            self.em.emit('LABEL', dst=default)
+            for st in ctx.defaultCase().statement():
+                self.visit(st)
+        self.em.emit('LABEL', dst=end)
+        return None
+
     def visitReturnStatement(self, ctx):
         val = None
         if ctx.expression():
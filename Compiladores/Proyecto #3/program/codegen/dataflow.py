@@ -0,0 +1,366 @@
+"""
+Análisis de flujo de datos sobre el CFG de codegen/cfg.py.
+
+Motor genérico de worklist donde gen/kill/in/out de cada bloque son enteros de Python
+usados como bitsets sobre un universo numerado (variables y temporales, sitios de
+definición o expresiones). Incluye vida de variables (liveness), definiciones que
+alcanzan (reaching definitions), expresiones disponibles y copias disponibles.
+
+Cada análisis devuelve un `DataflowResult` con `stats`: número de iteraciones del
+worklist, bloques que cambiaron en cada una y visitas totales, para perfilar la
+convergencia.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from codegen.cfg import BasicBlock, FunctionCFG
+from codegen.tac import Instr
+
+ARITH_OPS = ('ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'SHL', 'EQ', 'NE', 'LT', 'LE', 'GT', 'GE', 'AND', 'OR')
+NOT_NAMES = ('None', 'null', 'true', 'false', 'undefined', 'this')
+
+
+def is_temp(x) -> bool:
+    return isinstance(x, str) and len(x) > 1 and x[0] == 't' and x[1:].isdigit()
+
+
+def is_immediate(x) -> bool:
+    if not isinstance(x, str):
+        return False
+    s = x[1:] if x.startswith('-') else x
+    return s.isdigit()
+
+
+def is_name(x) -> bool:
+    """Operando que nombra una variable o temporal (no literal, no etiqueta de string)."""
+    return isinstance(x, str) and bool(x) and not is_immediate(x) and x[0] not in '"[' \
+        and x not in NOT_NAMES
+
+
+def defs_uses(ins: Instr) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Nombres que la instrucción define y usa."""
+    op = ins.op
+    if op in ARITH_OPS:
+        return ((ins.dst,) if is_name(ins.dst) else ()), tuple(x for x in (ins.a, ins.b) if is_name(x))
+    if op in ('MOV', 'NOT', 'LOAD', 'GETPROP', 'ALLOC'):
+        return ((ins.dst,) if is_name(ins.dst) else ()), ((ins.a,) if is_name(ins.a) else ())
+    if op == 'STORE':
+        return ((ins.dst,) if is_name(ins.dst) else ()), ((ins.a,) if is_name(ins.a) else ())
+    if op in ('IFZ', 'JUMPTABLE', 'ARG', 'PRINT'):
+        return (), ((ins.a,) if is_name(ins.a) else ())
+    if op == 'RET':
+        return (), ((ins.dst,) if is_name(ins.dst) else ())
+    if op in ('CALL', 'NEWOBJ'):
+        return ((ins.dst,) if is_name(ins.dst) else ()), ()
+    if op == 'SETPROP':
+        return (), tuple(x for x in (ins.dst, ins.b) if is_name(x))
+    return (), ()
+
+
+class Universe:
+    """Numeración de elementos (nombres, definiciones, expresiones) a bits."""
+
+    def __init__(self, items: Iterable = ()):
+        self.items: List = []
+        self.index: Dict = {}
+        for it in items:
+            self.add(it)
+
+    def add(self, item) -> int:
+        i = self.index.get(item)
+        if i is None:
+            i = self.index[item] = len(self.items)
+            self.items.append(item)
+        return i
+
+    def bit(self, item) -> int:
+        return 1 << self.index[item]
+
+    def mask(self, items: Iterable) -> int:
+        m = 0
+        for it in items:
+            m |= 1 << self.index[it]
+        return m
+
+    @property
+    def full(self) -> int:
+        return (1 << len(self.items)) - 1
+
+    def decode(self, bits: int) -> List:
+        out = []
+        i = 0
+        while bits:
+            if bits & 1:
+                out.append(self.items[i])
+            bits >>= 1
+            i += 1
+        return out
+
+    def __len__(self):
+        return len(self.items)
+
+
+class DataflowStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.iterations = 0
+        self.changed_per_iteration: List[int] = []
+        self.block_visits = 0
+
+    def as_dict(self) -> Dict:
+        return {'analysis': self.name, 'iterations': self.iterations,
+                'changed_per_iteration': self.changed_per_iteration,
+                'block_visits': self.block_visits}
+
+    def __repr__(self):
+        return (f"{self.name}: {self.iterations} iteraciones, {self.block_visits} visitas, "
+                f"cambios {self.changed_per_iteration}")
+
+
+class DataflowResult:
+    def __init__(self, universe: Universe, in_: Dict[BasicBlock, int], out: Dict[BasicBlock, int],
+                 stats: DataflowStats):
+        self.universe = universe
+        self.in_ = in_
+        self.out = out
+        self.stats = stats
+
+
+def solve(unit: FunctionCFG, gen: Dict[BasicBlock, int], kill: Dict[BasicBlock, int],
+          forward: bool, union: bool, boundary: int, init: int, name: str,
+          universe: Universe) -> DataflowResult:
+    """Worklist genérico: out = gen | (in & ~kill) (o al revés si es hacia atrás).
+
+    `boundary` es el valor en la entrada (hacia adelante) o en las salidas (hacia atrás);
+    `init` el valor inicial del resto (vacío para unión, universo para intersección)."""
+    stats = DataflowStats(name)
+    order = unit.reverse_postorder()
+    reachable = set(order)
+    order = order + [b for b in unit.blocks if b not in reachable]
+    if not forward:
+        order.reverse()
+    position = {b: i for i, b in enumerate(order)}
+    in_: Dict[BasicBlock, int] = {}
+    out: Dict[BasicBlock, int] = {}
+    for b in order:
+        in_[b] = init
+        out[b] = init
+
+    entry = unit.entry
+    facts = out if forward else in_  # lo que fluye por las aristas
+    pending = set(order)
+    while pending:
+        stats.iterations += 1
+        changed = 0
+        batch = sorted(pending, key=position.__getitem__)
+        pending = set()
+        for b in batch:
+            stats.block_visits += 1
+            edges = b.preds if forward else b.succs
+            if edges:
+                it = iter(edges)
+                merged = facts[next(it)]
+                if union:
+                    for p in it:
+                        merged |= facts[p]
+                else:
+                    for p in it:
+                        merged &= facts[p]
+                if forward and b is entry:
+                    merged = merged | boundary if union else merged & boundary
+            else:
+                merged = boundary
+            transfer = gen[b] | (merged & ~kill[b])
+            if forward:
+                in_[b] = merged
+                if transfer != out[b]:
+                    out[b] = transfer
+                    changed += 1
+                    pending.update(b.succs)
+            else:
+                out[b] = merged
+                if transfer != in_[b]:
+                    in_[b] = transfer
+                    changed += 1
+                    pending.update(b.preds)
+        stats.changed_per_iteration.append(changed)
+    return DataflowResult(universe, in_, out, stats)
+
+
+# ---------- Liveness ----------
+def name_universe(unit: FunctionCFG) -> Universe:
+    u = Universe()
+    for b in unit.blocks:
+        for ins in b.instrs:
+            d, us = defs_uses(ins)
+            for x in d + us:
+                u.add(x)
+    return u
+
+
+def liveness(unit: FunctionCFG, universe: Optional[Universe] = None) -> DataflowResult:
+    """Variables vivas (hacia atrás, unión). Las variables no temporales se consideran
+    vivas al salir de la unidad y leídas por cada CALL, porque pueden ser globales."""
+    u = universe or name_universe(unit)
+    variables = u.mask(x for x in u.items if not is_temp(x))
+    gen: Dict[BasicBlock, int] = {}
+    kill: Dict[BasicBlock, int] = {}
+    for b in unit.blocks:
+        use = 0
+        defs = 0
+        for ins in b.instrs:
+            d, us = defs_uses(ins)
+            for x in us:
+                bit = u.bit(x)
+                if not defs & bit:
+                    use |= bit
+            if ins.op == 'CALL':
+                use |= variables & ~defs
+            for x in d:
+                defs |= u.bit(x)
+        gen[b] = use
+        kill[b] = defs
+    return solve(unit, gen, kill, forward=False, union=True, boundary=variables, init=0,
+                 name='liveness', universe=u)
+
+
+def live_after(block: BasicBlock, live_out: int, universe: Universe) -> List[int]:
+    """Bitset vivo justo después de cada instrucción del bloque."""
+    variables = universe.mask(x for x in universe.items if not is_temp(x))
+    live = live_out
+    after = [0] * len(block.instrs)
+    for i in range(len(block.instrs) - 1, -1, -1):
+        after[i] = live
+        ins = block.instrs[i]
+        d, us = defs_uses(ins)
+        for x in d:
+            live &= ~universe.bit(x)
+        for x in us:
+            live |= universe.bit(x)
+        if ins.op == 'CALL':
+            live |= variables
+    return after
+
+
+# ---------- Reaching definitions ----------
+def reaching_definitions(unit: FunctionCFG) -> DataflowResult:
+    """Definiciones que alcanzan (hacia adelante, unión). El universo son sitios
+    (bloque, índice, nombre) de cada definición."""
+    u = Universe()
+    by_name: Dict[str, int] = {}
+    for b in unit.blocks:
+        for i, ins in enumerate(b.instrs):
+            for x in defs_uses(ins)[0]:
+                bit = 1 << u.add((b.id, i, x))
+                by_name[x] = by_name.get(x, 0) | bit
+    gen: Dict[BasicBlock, int] = {}
+    kill: Dict[BasicBlock, int] = {}
+    for b in unit.blocks:
+        g = 0
+        k = 0
+        for i, ins in enumerate(b.instrs):
+            for x in defs_uses(ins)[0]:
+                all_x = by_name[x]
+                g = (g & ~all_x) | u.bit((b.id, i, x))
+                k |= all_x
+        gen[b] = g
+        kill[b] = k & ~g
+    return solve(unit, gen, kill, forward=True, union=True, boundary=0, init=0,
+                 name='reaching', universe=u)
+
+
+# ---------- Available expressions ----------
+def expression_key(ins: Instr) -> Optional[Tuple]:
+    """Expresión que calcula la instrucción, si es pura: (op, a, b)."""
+    if ins.op in ARITH_OPS:
+        return (ins.op, ins.a, ins.b)
+    if ins.op == 'NOT':
+        return ('NOT', ins.a, None)
+    if ins.op == 'LOAD' and is_name(ins.a) and not is_temp(ins.a):
+        return ('LOAD', ins.a, None)
+    return None
+
+
+def available_expressions(unit: FunctionCFG) -> DataflowResult:
+    """Expresiones disponibles (hacia adelante, intersección). Un CALL invalida las
+    lecturas de variables (LOAD), que pueden ser globales modificadas por la llamada."""
+    u = Universe()
+    for b in unit.blocks:
+        for ins in b.instrs:
+            key = expression_key(ins)
+            if key is not None:
+                u.add(key)
+    using: Dict[str, int] = {}
+    loads = 0
+    for key in u.items:
+        bit = u.bit(key)
+        if key[0] == 'LOAD':
+            loads |= bit
+        for x in key[1:]:
+            if is_name(x):
+                using[x] = using.get(x, 0) | bit
+    gen: Dict[BasicBlock, int] = {}
+    kill: Dict[BasicBlock, int] = {}
+    for b in unit.blocks:
+        g = 0
+        k = 0
+        for ins in b.instrs:
+            key = expression_key(ins)
+            if key is not None:
+                g |= u.bit(key)
+            killed = loads if ins.op == 'CALL' else 0
+            for x in defs_uses(ins)[0]:
+                killed |= using.get(x, 0)
+            g &= ~killed
+            k |= killed
+        gen[b] = g
+        kill[b] = k & ~g
+    return solve(unit, gen, kill, forward=True, union=False, boundary=0, init=u.full,
+                 name='available', universe=u)
+
+
+# ---------- Copias disponibles ----------
+def copy_source(ins: Instr) -> Optional[Tuple[str, str]]:
+    """(destino, valor) si la instrucción copia un valor: `d = MOV v` o `STORE v -> d`."""
+    if ins.op in ('MOV', 'STORE') and is_name(ins.dst) and isinstance(ins.a, str) \
+            and ins.a != ins.dst and (is_immediate(ins.a) or is_name(ins.a)):
+        return ins.dst, ins.a
+    return None
+
+
+def available_copies(unit: FunctionCFG, accept=lambda value: True) -> DataflowResult:
+    """Copias `d = v` que valen en cada punto (hacia adelante, intersección).
+
+    `accept(v)` filtra qué valores se rastrean (constantes, temporales...). Redefinir `d`
+    o `v` invalida la copia; un CALL invalida las copias hacia variables no temporales."""
+    u = Universe()
+    for b in unit.blocks:
+        for ins in b.instrs:
+            pair = copy_source(ins)
+            if pair is not None and accept(pair[1]):
+                u.add(pair)
+    mentions: Dict[str, int] = {}
+    to_vars = 0
+    for pair in u.items:
+        bit = u.bit(pair)
+        for x in pair:
+            mentions[x] = mentions.get(x, 0) | bit
+        if not is_temp(pair[0]):
+            to_vars |= bit
+    gen: Dict[BasicBlock, int] = {}
+    kill: Dict[BasicBlock, int] = {}
+    for b in unit.blocks:
+        g = 0
+        k = 0
+        for ins in b.instrs:
+            killed = to_vars if ins.op == 'CALL' else 0
+            for x in defs_uses(ins)[0]:
+                killed |= mentions.get(x, 0)
+            g &= ~killed
+            k |= killed
+            pair = copy_source(ins)
+            if pair is not None and accept(pair[1]):
+                g |= u.bit(pair)
+        gen[b] = g
+        kill[b] = k & ~g
+    return solve(unit, gen, kill, forward=True, union=False, boundary=0, init=u.full,
+                 name='copies', universe=u)
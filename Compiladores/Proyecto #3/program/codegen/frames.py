@@ -0,0 +1,171 @@
+"""
+Layout del frame de cada función para el backend MIPS.
+
+$fp apunta al $sp que había al entrar (el tope del frame). Hacia abajo quedan $ra, el
+$fp del llamador, los callee-saved que usa la asignación de registros, las variables
+locales (los parámetros se copian a un slot propio en el prólogo), los slots de spill y,
+al fondo, el área de argumentos salientes: el cuerpo de la función no mueve $sp, así que
+los argumentos de cada CALL se escriben en 0($sp), 4($sp), ... y el llamado los encuentra
+en 0($fp), 4($fp), ...
+
+    4*i($fp)        parámetro i (área saliente del llamador)
+    -4($fp)         $ra
+    -8($fp)         $fp del llamador
+    -12($fp) ...    callee-saved, locales, spills
+    0($sp) ...      argumentos salientes
+
+Con la convención 'registers' (la de por defecto) los primeros cuatro argumentos van en
+$a0-$a3 y solo el resto pasa por el área saliente (el parámetro i >= 4 queda en
+4*(i-4)($fp)). Una función hoja (sin CALLs) no guarda $ra ni $fp: no los modifica, y como
+$sp no se mueve en el cuerpo, su frame se direcciona desde $sp. Con 'stack' (modo de
+compatibilidad) todos los argumentos van por la pila y toda función guarda $ra/$fp.
+
+Qué nombres son locales se decide con todo el programa: es global lo que aparece en el
+código global, lo declarado en el ámbito global de la tabla de símbolos, los arreglos
+estáticos y lo capturado por alguna función; el resto de los nombres de una función son
+locales suyos.
+"""
+from typing import Dict, List, Optional
+
+from codegen.cfg import GLOBAL
+from codegen.dataflow import defs_uses, is_name, is_temp
+from codegen.regalloc import Allocation
+from codegen.tac import Instr
+
+WORD = 4
+CONVENTIONS = ('registers', 'stack')
+ARG_REGS = ('$a0', '$a1', '$a2', '$a3')
+
+
+class FrameLayout:
+    """Offsets relativos a $fp de todo lo que vive en el frame de una función."""
+
+    def __init__(self, name: str, params: List[str], locals_: List[str], saved: List[str],
+                 spills: int, outgoing: int, leaf: bool = False, reg_params: int = 0):
+        self.name = name
+        self.params = params
+        self.locals = locals_      # incluye los parámetros, en el mismo orden al inicio
+        self.saved = saved
+        self.spills = spills
+        self.outgoing = outgoing
+        self.leaf = leaf              # sin $ra/$fp guardados; offsets rebasados a $sp
+        self.reg_params = reg_params  # parámetros que llegan en $a0-$a3
+        self._var_index = {v: i for i, v in enumerate(locals_)}
+        self._link = 0 if leaf else 2
+        words = self._link + len(saved) + len(locals_) + spills + outgoing
+        self.size = (WORD * words + 7) // 8 * 8
+
+    # la sección de palabras bajo $ra/$fp: callee-saved, locales y spills en ese orden
+    def _word(self, i: int) -> int:
+        return -WORD * (self._link + 1) - WORD * i
+
+    def ref(self, off: int) -> str:
+        """Operando de memoria para un offset relativo a $fp (en hojas, relativo a $sp)."""
+        return f"{self.size + off}($sp)" if self.leaf else f"{off}($fp)"
+
+    @property
+    def ra_offset(self) -> int:
+        return -WORD
+
+    @property
+    def fp_offset(self) -> int:
+        return -2 * WORD
+
+    def saved_offset(self, reg: str) -> int:
+        return self._word(self.saved.index(reg))
+
+    def var_offset(self, name: str) -> Optional[int]:
+        """Offset del slot de una variable local o parámetro; None si no es local."""
+        i = self._var_index.get(name)
+        return None if i is None else self._word(len(self.saved) + i)
+
+    def slot_offset(self, slot: int) -> int:
+        return self._word(len(self.saved) + len(self.locals) + slot)
+
+    def param_offset(self, i: int) -> int:
+        """Donde el llamador dejó el argumento i >= reg_params (arriba de $fp)."""
+        return WORD * (i - self.reg_params)
+
+    def as_dict(self) -> Dict:
+        return {'function': self.name, 'size': self.size, 'params': list(self.params),
+                'locals': len(self.locals) - len(self.params), 'saved': list(self.saved),
+                'spills': self.spills, 'outgoing': self.outgoing, 'leaf': self.leaf}
+
+
+def function_symbol(symtab, label: str):
+    """FuncSymbol de `func_f` o `method_C_m` en el ámbito global de la tabla, si existe."""
+    if symtab is None:
+        return None
+    scope = symtab.scopes[0].symbols
+    if label.startswith('func_'):
+        return scope.get(label[len('func_'):])
+    if label.startswith('method_'):
+        for cls in (s for s in scope.values() if hasattr(s, 'methods')):
+            prefix = f"method_{cls.name}_"
+            if label.startswith(prefix):
+                return cls.methods.get(label[len(prefix):])
+    return None
+
+
+def global_names(instrs: List[Instr], allocation: Allocation, symtab=None,
+                 static_arrays: Optional[dict] = None) -> set:
+    names = set(static_arrays or ())
+    for ins, unit in zip(instrs, allocation.unit_of):
+        if unit == GLOBAL:
+            d, us = defs_uses(ins)
+            names.update(x for x in d + us if not is_temp(x))
+    if symtab is not None:
+        funcs = []
+        for sym in symtab.scopes[0].symbols.values():
+            if hasattr(sym, 'params'):
+                funcs.append(sym)
+            elif hasattr(sym, 'methods'):
+                funcs.extend(sym.methods.values())
+            else:
+                names.add(sym.name)
+        for f in funcs:
+            names.update(f.captures)
+    return names
+
+
+def layout_frames(instrs, allocation: Allocation, symtab=None,
+                  static_arrays: Optional[dict] = None,
+                  convention: str = 'registers') -> Dict[str, FrameLayout]:
+    """Calcula el FrameLayout de cada función y lo deja también en `UnitAllocation.frame`."""
+    if convention not in CONVENTIONS:
+        raise ValueError(f"convención de llamada desconocida: {convention}")
+    in_regs = len(ARG_REGS) if convention == 'registers' else 0
+    instrs = list(instrs)
+    globals_ = global_names(instrs, allocation, symtab, static_arrays)
+    seen: Dict[str, Dict[str, None]] = {}
+    outgoing: Dict[str, int] = {}
+    pending: Dict[str, int] = {}
+    calls: Dict[str, int] = {}
+    for ins, unit in zip(instrs, allocation.unit_of):
+        if unit == GLOBAL:
+            continue
+        names = seen.setdefault(unit, {})
+        d, us = defs_uses(ins)
+        for x in d + us:
+            # los accesos xs[i] siguen yendo a la etiqueta global del arreglo
+            if is_name(x) and not is_temp(x) and x not in globals_ and '[' not in x:
+                names[x] = None
+        if ins.op == 'ARG':
+            pending[unit] = pending.get(unit, 0) + 1
+        elif ins.op == 'CALL':
+            calls[unit] = calls.get(unit, 0) + 1
+            outgoing[unit] = max(outgoing.get(unit, 0), pending.get(unit, 0) - in_regs)
+            pending[unit] = 0
+
+    frames: Dict[str, FrameLayout] = {}
+    for name, ua in allocation.units.items():
+        if name == GLOBAL:
+            continue
+        sym = function_symbol(symtab, name)
+        params = [p.name for p in sym.params] if sym is not None else []
+        locals_ = params + [v for v in seen.get(name, ()) if v not in params]
+        leaf = convention == 'registers' and not calls.get(name)
+        frame = FrameLayout(name, params, locals_, ua.saved, ua.spilled, outgoing.get(name, 0),
+                            leaf=leaf, reg_params=min(len(params), in_regs))
+        frames[name] = ua.frame = frame
+    return frames
@@ -5,25 +5,27 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from codegen.codegen import CodeGenVisitor
-from Driver import parse_and_semantic
-from codegen.mips_backend import emit_mips
+from typing import Optional
 
+from session import CompilationSession
+from codegen.cache import ArtifactCache
 
-def run(filepath: str) -> int:
-    parser, tree, syn, sem_visitor = parse_and_semantic(filepath)
 
-    if syn and syn.errors:
-        for e in syn.errors:
+def run(filepath: str, session: Optional[CompilationSession] = None) -> int:
+    # Reutiliza la sesión del Driver si viene; si no, hace su propio front end
+    session = session or CompilationSession.from_file(filepath)
+
+    if session.syntax_errors:
+        for e in session.syntax_errors:
             print(e)
         return 1
 
-    if sem_visitor is None:
+    session.report_semantic()
+    if not session.analyzed:
         print('[Error] Falló el análisis semántico, no se puede generar TAC.')
         return 2
 
-    cg = CodeGenVisitor()
-    emitter, _ = cg.visitProgram(tree)
+    emitter = session.emitter
 
     if emitter is None:
         print('[Error] No se generó ningún código intermedio.')
@@ -38,29 +40,32 @@ def run(filepath: str) -> int:
     return 0
 
 
-def run_mips(filepath: str) -> int:
-    parser, tree, syn, sem_visitor = parse_and_semantic(filepath)
-    if syn and syn.errors:
-        for e in syn.errors:
+def run_mips(filepath: str, session: Optional[CompilationSession] = None, stream: bool = False) -> int:
+    """Genera el .s junto al fuente y lo imprime; con `stream` solo lo escribe (sin armar
+    el programa en memoria) e imprime la ruta."""
+    # Sin sesión del Driver se usa el caché por defecto: un acierto evita todo el front end
+    session = session or CompilationSession.from_file(filepath, cache=ArtifactCache.default())
+    if session.syntax_errors:
+        for e in session.syntax_errors:
             print(e)
         return 1
-    if sem_visitor is None:
+    session.report_semantic()
+    if not session.analyzed:
         print('[Error] Falló el análisis semántico, no se puede generar MIPS.')
         return 2
-    cg = CodeGenVisitor()
-    emitter, static_arrays = cg.visitProgram(tree)
-    if emitter is None:
+    if session.emitter is None:
         print('[Error] No se generó ningún código intermedio.')
         return 2
     # output path: same dir, same base name with .s
-    out_path = os.path.splitext(filepath)[0] + '.s'
-    mips = emit_mips(emitter, sem_visitor.symtab if sem_visitor else None, out_path=out_path, static_arrays=static_arrays)
+    out_path = os.path.splitext(filepath)[0] + '.s' if filepath else None
+    if stream and out_path is not None:
+        print(f"[MIPS] {session.write_mips(out_path)}")
+        return 0
+    mips = session.mips(out_path=out_path)
     # Solo imprime el código ensamblador, no el mensaje de guardado
     print(mips)
     return 0
 
-    return 0
-
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
@@ -0,0 +1,367 @@
+"""
+Optimizaciones de ciclos sobre el CFG de codegen/cfg.py (pases de codegen/optimize.py).
+
+    licm      instrucciones invariantes del ciclo (aritmética, `LOAD` de variables que el
+              ciclo no escribe, `GETPROP` de objetos que no modifica) al preheader
+    strength  multiplicación por una potencia de dos -> corrimiento (`t = a SHL k`)
+    ivs       en cada ciclo natural, las lecturas de la base de un arreglo (`LOAD xs`
+              con xs sin escribir en el ciclo) pasan al preheader, y los accesos
+              `base + i*k` con `i` variable de inducción básica (una sola escritura
+              por vuelta, `i = i ± c`) usan un puntero que arranca en el preheader y
+              avanza `c*k` junto con `i`
+
+Un acceso a arreglo de CodeGenVisitor es `tb = LOAD xs; ts = i MUL 4; ta = tb ADD ts;
+LOAD ta`. `ivs` lo deja en `tb = MOV h` y `ta = MOV p` (h y p temporales nuevos del
+preheader); `copyprop` y `dce` terminan de limpiar. Los ciclos con CALL no se tocan: la
+llamada puede escribir cualquier variable global.
+
+`licm` decide qué operandos son invariantes con definiciones que alcanzan: ninguna
+definición dentro del ciclo, o una sola que ya se sacó. Como los temporales se reciclan,
+la instrucción no se mueve tal cual: se calcula en un temporal nuevo del preheader y en
+el ciclo queda `d = MOV h`. DIV, MOD y GETPROP pueden fallar, así que solo salen si su bloque
+domina todas las salidas del ciclo (se ejecutan en toda entrada al ciclo).
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from codegen.cfg import BasicBlock, FunctionCFG, Loop
+from codegen.dataflow import (ARITH_OPS, defs_uses, is_immediate, is_name, is_temp,
+                              reaching_definitions)
+from codegen.tac import Instr
+
+
+def _log2(x) -> Optional[int]:
+    if not is_immediate(x):
+        return None
+    v = int(x)
+    return v.bit_length() - 1 if v > 0 and v & (v - 1) == 0 else None
+
+
+def is_variable(x) -> bool:
+    return is_name(x) and not is_temp(x)
+
+
+def fresh_temps(unit: FunctionCFG) -> Callable[[], str]:
+    """Generador de temporales que no aparecen en la unidad."""
+    top = max((int(x[1:]) for b in unit.blocks for ins in b.instrs
+               for x in (ins.dst, ins.a, ins.b) if is_temp(x)), default=-1)
+    counter = [top]
+
+    def fresh() -> str:
+        counter[0] += 1
+        return f"t{counter[0]}"
+    return fresh
+
+
+class LoopSummary:
+    """Lo que escribe un ciclo: variables (con el sitio de cada STORE), temporales
+    definidos y si tiene llamadas."""
+
+    def __init__(self, unit: FunctionCFG, loop: Loop):
+        self.blocks: List[BasicBlock] = [b for b in unit.blocks if b in loop.body]
+        self.stores: Dict[str, List[Tuple[BasicBlock, int]]] = {}
+        self.defined = set()
+        self.has_call = False
+        self.writes_memory = False   # SETPROP o STORE a una dirección
+        for b in self.blocks:
+            for k, ins in enumerate(b.instrs):
+                if ins.op == 'CALL':
+                    self.has_call = True
+                if ins.op == 'SETPROP' or (ins.op == 'STORE' and is_temp(ins.dst)):
+                    self.writes_memory = True
+                if ins.op == 'STORE' and is_variable(ins.dst):
+                    self.stores.setdefault(ins.dst, []).append((b, k))
+                else:
+                    self.defined.update(defs_uses(ins)[0])
+
+    def invariant(self, x) -> bool:
+        """Operando cuyo valor no cambia dentro del ciclo."""
+        if is_temp(x):
+            return x not in self.defined
+        return is_immediate(x) or (is_variable(x) and x not in self.stores and not self.has_call)
+
+
+def hoist(block: BasicBlock, instrs: List[Instr]) -> None:
+    """Agrega instrucciones al final del preheader (antes de su salto, si tiene)."""
+    k = len(block.instrs) - (1 if block.terminator is not None else 0)
+    block.instrs[k:k] = instrs
+
+
+class _Values:
+    """Qué variable tiene cada temporal en un punto del bloque (`t = LOAD v`, copias)."""
+
+    def __init__(self):
+        self.holds: Dict[str, str] = {}
+
+    def var_of(self, x) -> Optional[str]:
+        return x if is_variable(x) else self.holds.get(x)
+
+    def update(self, ins: Instr) -> None:
+        if ins.op == 'STORE' and is_variable(ins.dst):
+            for t in [t for t, v in self.holds.items() if v == ins.dst]:
+                del self.holds[t]
+            return
+        for d in defs_uses(ins)[0]:
+            self.holds.pop(d, None)
+        if is_temp(ins.dst) and (ins.op == 'MOV' or (ins.op == 'LOAD' and not is_temp(ins.a))):
+            v = self.var_of(ins.a)
+            if v is not None:
+                self.holds[ins.dst] = v
+
+
+def _scale(ins: Instr, values: _Values) -> Optional[Tuple[Optional[str], int]]:
+    """Desplazamiento escalado `t = x MUL k` / `t = x SHL s`: (variable que tiene x o
+    None, factor)."""
+    if ins.op == 'MUL':
+        for x, k in ((ins.a, ins.b), (ins.b, ins.a)):
+            if is_immediate(k) and not is_immediate(x):
+                return values.var_of(x), int(k)
+    if ins.op == 'SHL' and is_immediate(ins.b) and 0 <= int(ins.b) < 31 and not is_immediate(ins.a):
+        return values.var_of(ins.a), 1 << int(ins.b)
+    return None
+
+
+# ---------- Reducción de fuerza ----------
+def strength_reduction(unit: FunctionCFG, stats) -> bool:
+    changed = False
+    for b in unit.blocks:
+        for k, ins in enumerate(b.instrs):
+            if ins.op != 'MUL':
+                continue
+            x, n = ins.a, _log2(ins.b)
+            if n is None:
+                x, n = ins.b, _log2(ins.a)
+            if not n or is_immediate(x):
+                continue
+            b.instrs[k] = Instr('SHL', ins.dst, x, str(n))
+            stats.rewritten += 1
+            changed = True
+    return changed
+
+
+# ---------- Variables de inducción ----------
+def basic_induction_variables(unit: FunctionCFG, loop: Loop,
+                              summary: LoopSummary) -> Dict[str, Tuple[BasicBlock, int, int]]:
+    """Variables que se escriben una sola vez por vuelta como `v = v ± c`:
+    v -> (bloque, índice del STORE, c)."""
+    inner = [l for l in unit.loops() if l is not loop and l.body < loop.body]
+    out = {}
+    for v, sites in summary.stores.items():
+        if len(sites) != 1:
+            continue
+        b, idx = sites[0]
+        if not all(unit.dominates(b, latch) for latch in loop.latches) \
+                or any(b in l.body for l in inner):
+            continue
+        values = _Values()
+        steps: Dict[str, int] = {}  # temp -> c de `temp = v ± c`
+        for ins in b.instrs[:idx]:
+            values.update(ins)
+            for d in defs_uses(ins)[0]:
+                steps.pop(d, None)
+            if ins.op in ('ADD', 'SUB') and is_temp(ins.dst):
+                pairs = [(ins.a, ins.b)] + ([(ins.b, ins.a)] if ins.op == 'ADD' else [])
+                for x, c in pairs:
+                    if values.var_of(x) == v and is_immediate(c):
+                        steps[ins.dst] = int(c) if ins.op == 'ADD' else -int(c)
+                        break
+        step = steps.get(b.instrs[idx].a)
+        if step:
+            out[v] = (b, idx, step)
+    return out
+
+
+def _induction_loop(unit: FunctionCFG, loop: Loop, stats, fresh: Callable[[], str]) -> bool:
+    summary = LoopSummary(unit, loop)
+    if summary.has_call:
+        return False
+    ivs = basic_induction_variables(unit, loop, summary)
+    base_loads: Dict[Tuple[BasicBlock, int], str] = {}   # LOAD de una base -> variable
+    accesses: List[Tuple[BasicBlock, int, Tuple]] = []   # ADD base + v*k -> (base, v, k)
+    for b in summary.blocks:
+        values = _Values()
+        scaled: Dict[str, Tuple[str, int]] = {}
+        loads: Dict[str, Tuple[int, str]] = {}   # temp -> (índice, xs) de `temp = LOAD xs`
+        aliases: Dict[str, str] = {}             # temp -> temporal invariante que copia
+        for k, ins in enumerate(b.instrs):
+            if ins.op == 'ADD' and is_temp(ins.dst):
+                for x, y in ((ins.a, ins.b), (ins.b, ins.a)):
+                    if y not in scaled:
+                        continue
+                    if x in loads:
+                        base_loads[(b, loads[x][0])] = loads[x][1]
+                        base = ('var', loads[x][1])
+                    elif x in aliases or (is_temp(x) and summary.invariant(x)):
+                        base = ('temp', aliases.get(x, x))
+                    else:
+                        continue
+                    v, factor = scaled[y]
+                    if v is not None and v in ivs:
+                        accesses.append((b, k, (base, v, factor)))
+                    break
+            values.update(ins)
+            if ins.op == 'STORE' and is_variable(ins.dst):
+                for t in [t for t, s in scaled.items() if s[0] == ins.dst]:
+                    scaled[t] = (None, scaled[t][1])
+                continue
+            for d in defs_uses(ins)[0]:
+                scaled.pop(d, None)
+                loads.pop(d, None)
+                aliases.pop(d, None)
+            s = _scale(ins, values)
+            if s is not None:
+                scaled[ins.dst] = s
+            elif ins.op == 'LOAD' and is_variable(ins.a) and summary.invariant(ins.a):
+                loads[ins.dst] = (k, ins.a)
+            elif ins.op == 'MOV' and is_temp(ins.a) and summary.invariant(ins.a):
+                aliases[ins.dst] = ins.a
+    if not base_loads and not accesses:
+        return False
+    pre = unit.preheader(loop)
+    if pre is None:
+        return False
+
+    hoisted: List[Instr] = []
+    bases: Dict[str, str] = {}
+
+    def base_temp(base) -> str:
+        kind, name = base
+        if kind == 'temp':
+            return name
+        if name not in bases:
+            bases[name] = fresh()
+            hoisted.append(Instr('LOAD', bases[name], name))
+        return bases[name]
+
+    for (b, k), xs in base_loads.items():
+        b.instrs[k] = Instr('MOV', b.instrs[k].dst, base_temp(('var', xs)))
+        stats.rewritten += 1
+    pointers: Dict[Tuple, str] = {}
+    for b, k, key in accesses:
+        p = pointers.get(key)
+        if p is None:
+            base, v, factor = key
+            hb = base_temp(base)
+            tv, off, p = fresh(), fresh(), fresh()
+            hoisted += [Instr('LOAD', tv, v), Instr('MUL', off, tv, str(factor)), Instr('ADD', p, hb, off)]
+            pointers[key] = p
+        b.instrs[k] = Instr('MOV', b.instrs[k].dst, p)
+        stats.rewritten += 1
+    # cada puntero avanza justo después de la escritura de su variable de inducción
+    # (de atrás hacia adelante para no correr los índices de los otros STORE)
+    steps = [(ivs[v], p, factor) for (_, v, factor), p in pointers.items()]
+    for (b, idx, step), p, factor in sorted(steps, key=lambda s: s[0][1], reverse=True):
+        b.instrs.insert(idx + 1, Instr('ADD', p, p, str(step * factor)))
+    hoist(pre, hoisted)
+    return True
+
+
+# ---------- Movimiento de código invariante ----------
+LICM_OPS = ARITH_OPS + ('NOT', 'MOV', 'LOAD', 'GETPROP')
+
+
+class _Reaching:
+    """Definiciones de un nombre que alcanzan cada instrucción, a partir del análisis
+    por bloques de codegen/dataflow.py."""
+
+    def __init__(self, unit: FunctionCFG):
+        result = reaching_definitions(unit)
+        by_id = {b.id: b for b in unit.blocks}
+        self.entry: Dict[BasicBlock, Dict[str, List[Tuple[BasicBlock, int]]]] = {}
+        for b in unit.blocks:
+            sites: Dict[str, List[Tuple[BasicBlock, int]]] = {}
+            for bid, idx, x in result.universe.decode(result.in_.get(b, 0)):
+                sites.setdefault(x, []).append((by_id[bid], idx))
+            self.entry[b] = sites
+
+    def at(self, block: BasicBlock, idx: int, x: str) -> List[Tuple[BasicBlock, int]]:
+        for k in range(idx - 1, -1, -1):
+            if x in defs_uses(block.instrs[k])[0]:
+                return [(block, k)]
+        return self.entry[block].get(x, [])
+
+
+def _licm_loop(unit: FunctionCFG, loop: Loop, stats, fresh: Callable[[], str]) -> bool:
+    summary = LoopSummary(unit, loop)
+    reaching = _Reaching(unit)
+    exits = [b for b in summary.blocks if any(s not in loop.body for s in b.succs)]
+    values: Dict[Tuple[BasicBlock, int], str] = {}   # instrucción invariante -> su valor
+    hoisted: List[Instr] = []
+
+    def operand(b: BasicBlock, k: int, x) -> Optional[str]:
+        """Operando con el que se puede calcular la instrucción en el preheader."""
+        if not is_name(x):
+            return x
+        if is_variable(x) and summary.has_call:
+            return None
+        inside = [site for site in reaching.at(b, k, x) if site[0] in loop.body]
+        if not inside:
+            return x
+        if len(inside) == 1 and len(reaching.at(b, k, x)) == 1:
+            return values.get(inside[0])
+        return None
+
+    def movable(b: BasicBlock, ins: Instr) -> bool:
+        if ins.op in ARITH_OPS or ins.op == 'NOT':
+            return ins.op not in ('DIV', 'MOD') or all(unit.dominates(b, e) for e in exits)
+        if ins.op == 'LOAD':
+            return is_variable(ins.a)
+        if ins.op == 'GETPROP':
+            return not (summary.has_call or summary.writes_memory) \
+                and all(unit.dominates(b, e) for e in exits)
+        return False
+
+    changed = True
+    while changed:
+        changed = False
+        for b in summary.blocks:
+            for k, ins in enumerate(b.instrs):
+                if (b, k) in values or not is_temp(ins.dst) or ins.op not in LICM_OPS:
+                    continue
+                a, c = operand(b, k, ins.a), operand(b, k, ins.b)
+                if a is None or (c is None and ins.b is not None):
+                    continue
+                if ins.op == 'MOV':
+                    values[(b, k)] = a   # copia de algo invariante: no se mueve, se sigue
+                elif movable(b, ins):
+                    values[(b, k)] = h = fresh()
+                    hoisted.append(Instr(ins.op, h, a, c))
+                else:
+                    continue
+                changed = True
+    moved = [(b, k, h) for (b, k), h in values.items() if b.instrs[k].op != 'MOV']
+    if not moved:
+        return False
+    pre = unit.preheader(loop)
+    if pre is None:
+        return False
+    for b, k, h in moved:
+        b.instrs[k] = Instr('MOV', b.instrs[k].dst, h)
+    hoist(pre, hoisted)
+    stats.hoisted += len(moved)
+    return True
+
+
+def loop_invariant_code_motion(unit: FunctionCFG, stats) -> bool:
+    fresh = fresh_temps(unit)
+    return for_each_loop(unit, lambda loop: _licm_loop(unit, loop, stats, fresh))
+
+
+def for_each_loop(unit: FunctionCFG, transform) -> bool:
+    """Aplica `transform(loop)` a cada ciclo, de los internos a los externos, recalculando
+    los ciclos después de cada cambio (un preheader nuevo cambia el cuerpo del externo)."""
+    changed = False
+    done = set()
+    while True:
+        pending = [l for l in unit.loops() if l.header not in done]
+        if not pending:
+            return changed
+        loop = pending[0]
+        done.add(loop.header)
+        if transform(loop):
+            changed = True
+            unit.invalidate()
+
+
+def induction_variables(unit: FunctionCFG, stats) -> bool:
+    fresh = fresh_temps(unit)
+    return for_each_loop(unit, lambda loop: _induction_loop(unit, loop, stats, fresh))
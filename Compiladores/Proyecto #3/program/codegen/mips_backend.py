@@ -1,15 +1,62 @@
-from typing import List, Dict, Optional
+import tempfile
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
 from codegen.tac import Instr, Emitter
+from codegen.cfg import GLOBAL
+from codegen.frames import ARG_REGS, CONVENTIONS, FrameLayout, layout_frames
+from codegen.peephole import Peephole
+from codegen.regalloc import Allocation, UnitAllocation, allocate
+
+# tipos de operando del TAC
+TEMP = 'temp'          # t0, t1, ...
+IMMEDIATE = 'imm'      # 5, -3
+STRING = 'str'         # "hola"
+ARRAY = 'array'        # xs[2] (acceso con índice dentro del operando)
+VAR = 'var'            # variable global (o parámetro, por simplicidad)
+NONE = 'none'          # None, "None" o ""
+
+
+def operand_kind(x: Optional[str]) -> str:
+    if not isinstance(x, str) or x in ("None", ""):
+        return NONE
+    if x[0] == '"' and x[-1] == '"' and len(x) >= 2:
+        return STRING
+    if x[0] == "t" and x[1:].isdigit():
+        return TEMP
+    if x.isdigit() or (x[0] == "-" and x[1:].isdigit()):
+        return IMMEDIATE
+    if '[' in x and ']' in x:
+        return ARRAY
+    return VAR
 
 class MIPSBackend:
-    def __init__(self) -> None:
-        # líneas de código de la sección .text
+    # final que se agrega siempre al programa
+    EXIT_STUB = ("    li $v0, 10                # service: exit", "    syscall")
+
+    def __init__(self, symtab=None, convention: str = 'registers', peephole: bool = False,
+                 fuse_branches: bool = True) -> None:
+        # tabla de símbolos del análisis semántico (parámetros de cada función, globales)
+        self.symtab = symtab
+        # convención de llamada: 'registers' ($a0-$a3, hojas sin $ra/$fp) o 'stack' (compat)
+        if convention not in CONVENTIONS:
+            raise ValueError(f"convención de llamada desconocida: {convention}")
+        self.convention = convention
+        # optimización peephole del .text (codegen/peephole.py); queda con sus contadores
+        self.peephole: Optional[Peephole] = Peephole() if peephole else None
+        # `t = a REL b` + `IFZ t` -> un solo salto condicional (ver translate)
+        self.fuse_branches = fuse_branches
+        self.fused_branches = 0
+        # líneas de código de la sección .text (en modo streaming van a un archivo temporal)
         self.text_lines: List[str] = []
+        self.sink = self.text_lines.append
         # nombres de variables globales detectadas
         self.global_vars = set()
         # literales de string: texto -> label
         self.string_literals: Dict[str, str] = {}
         self.next_string_id: int = 0
+        # tablas de saltos de los switch densos: label -> etiquetas de destino
+        self.jump_tables: Dict[str, List[str]] = {}
 
         # campos de objetos: nombre_campo -> offset en bytes
         self.field_offsets: Dict[str, int] = {}
@@ -18,9 +65,12 @@ class MIPSBackend:
         # si se detecta uso de heap (NEWOBJ o ALLOC)
         self.uses_heap: bool = False
 
-        # estado de funciones
+        # estado de funciones: funciones abiertas (label sin su end_ todavía)
         self.current_func: Optional[str] = None
+        self.open_funcs: List[str] = []
         self.has_main: bool = False
+        # sin func_main el código global es el punto de entrada: las funciones se saltan
+        self.skip_functions: bool = False
 
         # argumentos pendientes antes de un CALL
         self.pending_args: List[str] = []
@@ -28,28 +78,41 @@ class MIPSBackend:
         # arreglos/variables inicializados en .data
         self.static_arrays = {}
 
+        # asignación de registros (codegen/regalloc.py) y unidad de la instrucción actual
+        self.allocation: Optional[Allocation] = None
+        self.unit: Optional[UnitAllocation] = None
+        self.global_spills: int = 0
+
+        # operando -> tipo, clasificado una sola vez (ver operand_kind)
+        self.kinds: Dict[Optional[str], str] = {}
+        # opcode -> handler(op, dst, a, b)
+        self.handlers = {op: getattr(self, name) for op, name in self.HANDLERS.items()}
+
     def emit(self, line: str) -> None:
         """Agrega una línea al código .text."""
-        self.text_lines.append(line)
+        self.sink(line)
+
+    def kind(self, x: Optional[str]) -> str:
+        k = self.kinds.get(x)
+        if k is None:
+            k = self.kinds[x] = operand_kind(x)
+        return k
 
     def is_temp(self, name: Optional[str]) -> bool:
-        return isinstance(name, str) and name.startswith("t") and name[1:].isdigit()
+        return self.kind(name) == TEMP
 
     def is_immediate(self, x: Optional[str]) -> bool:
-        if not isinstance(x, str):
-            return False
-        if x.isdigit():
-            return True
-        if x.startswith("-") and x[1:].isdigit():
-            return True
-        return False
+        return self.kind(x) == IMMEDIATE
 
     def is_string_literal(self, x: Optional[str]) -> bool:
-        # Heurística: en tu TAC los strings suelen venir entre comillas
-        return isinstance(x, str) and len(x) >= 2 and x[0] == '"' and x[-1] == '"'
+        # en el TAC los strings vienen entre comillas
+        return self.kind(x) == STRING
 
     def temp_reg(self, tname: str) -> str:
-        """Mapea t0, t1, ... a $t0..$t9 (cíclico)."""
+        """Registro asignado a `tname` en la unidad actual. Sin asignación (instr_to_mips
+        suelto) mapea t0, t1, ... a $t0..$t9 (cíclico)."""
+        if self.unit is not None:
+            return self.unit.reg(tname) or "$t7"
         try:
             n = int(tname[1:])
         except ValueError:
@@ -57,20 +120,62 @@ class MIPSBackend:
         n = n % 10
         return f"$t{n}"
 
+    def spill_slot(self, tname: str) -> Optional[str]:
+        """Dirección del slot de un temporal derramado, o None si vive en registro."""
+        if self.unit is None:
+            return None
+        slot = self.unit.slot(tname)
+        if slot is None:
+            return None
+        if self.unit.name == GLOBAL:
+            self.global_spills = max(self.global_spills, slot + 1)
+            return f"__spill{slot}"
+        frame = self.frame()
+        return frame.ref(frame.slot_offset(slot))
+
+    def read_temp(self, tname: str, scratch: str) -> str:
+        """Registro con el valor de `tname`; si está derramado lo recarga en `scratch`."""
+        slot = self.spill_slot(tname)
+        if slot is None:
+            return self.temp_reg(tname)
+        self.emit(f"    lw {scratch}, {slot}")
+        self.unit.spill_loads += 1
+        return scratch
+
+    def dest_reg(self, tname: str) -> str:
+        """Registro donde calcular `tname` ($t7 si está derramado; ver spill_store)."""
+        return "$t7" if self.spill_slot(tname) else self.temp_reg(tname)
+
+    def spill_store(self, tname: str) -> None:
+        slot = self.spill_slot(tname)
+        if slot is not None:
+            self.emit(f"    sw $t7, {slot}")
+            self.unit.spill_stores += 1
+
+    def operand_reg(self, operand: str, scratch: str) -> str:
+        """Registro con el valor de `operand` sin copiarlo si ya está en uno."""
+        if self.kind(operand) == TEMP:
+            return self.read_temp(operand, scratch)
+        return self.load_operand_to_reg(operand, scratch)
+
+    def frame(self) -> Optional[FrameLayout]:
+        """Frame de la función actual; None en el código global."""
+        return self.unit.frame if self.unit is not None else None
+
+    def var_ref(self, name: str) -> str:
+        """Dirección de una variable: su slot en el frame si es local, o su etiqueta global."""
+        frame = self.frame()
+        off = frame.var_offset(name) if frame is not None else None
+        if off is not None:
+            return frame.ref(off)
+        self.ensure_global(name)
+        return name
+
     def ensure_global(self, name: str) -> None:
         """Registra un nombre como variable global si no es temp, ni literal, ni None."""
-        if not isinstance(name, str):
-            return
-        if self.is_temp(name):
-            return
-        if self.is_immediate(name):
-            return
-        if self.is_string_literal(name):
-            return
-        if name in ("None", "", None):
-            return
         # parámetros como "arg0" los tratamos como globales por simplicidad
-        self.global_vars.add(name)
+        if self.kind(name) == VAR:
+            self.global_vars.add(name)
 
     def string_label_for(self, literal: str) -> str:
         """Devuelve etiqueta de .data para un literal de string."""
@@ -90,71 +195,78 @@ class MIPSBackend:
 
 
     def load_operand_to_reg(self, operand: str, target_reg: str, is_array: bool = False) -> str:
-        """
-        Garantiza que 'operand' quede en 'target_reg'.
-        Para acceso a arreglos, sigue el patrón profesional: la base en $t0, offset en $t1, resultado en $t2, etc.
-        """
-        # Si es acceso a arreglo tipo xs[idx]
-        if isinstance(operand, str) and '[' in operand and ']' in operand:
-            # Extraer nombre y el índice
-            arr_name = operand[:operand.index('[')]
-            idx_str = operand[operand.index('[')+1:operand.index(']')]
-            try:
-                idx = int(idx_str)
-            except Exception:
-                idx = idx_str
-            # la $t0, xs
-            self.emit(f"    la $t0, {arr_name}")
-            # li $t1, idx
-            self.emit(f"    li $t1, {idx}")
-            # mul $t1, $t1, 4
-            self.emit(f"    mul $t1, $t1, 4")
-            # add $t0, $t0, $t1
-            self.emit(f"    add $t0, $t0, $t1")
-            # lw $t2, 0($t0)
-            self.emit(f"    lw {target_reg}, 0($t0)")
-            return target_reg
+        """Garantiza que 'operand' quede en 'target_reg'."""
+        kind = self.kind(operand)
+        if kind == ARRAY:
+            # el TAC direcciona los arreglos con temporales (ADD base, i*4 + LOAD);
+            # un operando xs[i] solo aparece en los inicializadores, que op_store salta
+            raise ValueError(f"operando de arreglo no soportado: {operand}")
         # Si es temporal
-        if self.is_temp(operand):
-            reg = self.temp_reg(operand)
+        if kind == TEMP:
+            reg = self.read_temp(operand, target_reg)
             if reg != target_reg:
                 self.emit(f"    move {target_reg}, {reg}")
             return target_reg
-        elif self.is_immediate(operand):
+        elif kind == IMMEDIATE:
             self.emit(f"    li {target_reg}, {operand}")
             return target_reg
-        elif self.is_string_literal(operand):
+        elif kind == STRING:
             lbl = self.string_label_for(operand)
             self.emit(f"    la {target_reg}, {lbl}")
             return target_reg
         else:
-            # variable global
-            self.ensure_global(operand)
+            # variable local (en el frame) o global
             if is_array:
+                self.ensure_global(operand)
                 self.emit(f"    la {target_reg}, {operand}")
             else:
-                self.emit(f"    lw {target_reg}, {operand}")
+                self.emit(f"    lw {target_reg}, {self.var_ref(operand)}")
             return target_reg
 
-    def is_temp_addr(self, name: Optional[str]) -> bool:
-        # Heurística: si es un temporal (tN) lo tratamos como dirección calculada
-        return self.is_temp(name)
-
     def is_static_array(self, name: str) -> bool:
         """Verifica si un nombre es un array estático"""
         # Necesitamos pasar static_arrays como atributo de la clase
         return hasattr(self, 'static_arrays') and name in self.static_arrays
 
 
-    def emit_epilogue(self):
-        """Emite el epílogo estándar para main o funciones. Si es main, termina con syscall."""
-        self.emit("    move $sp, $fp")
-        self.emit("    lw $ra, 28($sp)")
-        self.emit("    lw $fp, 24($sp)")
-        self.emit("    addi $sp, $sp, 32")
-        # Si estamos en main, terminar con syscall
-        if getattr(self, 'current_func', None) == 'func_main' or getattr(self, 'current_func', None) == 'main':
-            self.emit("    li $v0, 10                # service: exit")
+    def emit_prologue(self, func: str) -> None:
+        """Reserva el frame, guarda $fp/$ra (salvo en hojas) y los callee-saved, y copia los
+        parámetros desde $a0-$a3 o el área de argumentos del llamador a sus slots locales."""
+        frame = self.frame()
+        if frame.size:
+            self.emit(f"    addi $sp, $sp, -{frame.size}")
+        if not frame.leaf:
+            self.emit(f"    sw $fp, {frame.size + frame.fp_offset}($sp)")
+            self.emit(f"    addi $fp, $sp, {frame.size}")
+            self.emit(f"    sw $ra, {frame.ra_offset}($fp)")
+        for reg in frame.saved:
+            self.emit(f"    sw {reg}, {frame.ref(frame.saved_offset(reg))}")
+        for i, param in enumerate(frame.params):
+            slot = frame.ref(frame.var_offset(param))
+            if i < frame.reg_params:
+                self.emit(f"    sw {ARG_REGS[i]}, {slot}")
+            else:
+                self.emit(f"    lw $t8, {frame.ref(frame.param_offset(i))}")
+                self.emit(f"    sw $t8, {slot}")
+
+    def emit_epilogue(self, func: str) -> None:
+        """Epílogo único de la función (los RET saltan a `<func>_end`). El cuerpo no mueve
+        $sp, así que se restaura relativo a $sp. Si es main, termina con exit2 y su valor
+        de retorno como código de salida."""
+        frame = self.frame()
+        if func == 'func_main':
+            self.emit("    li $v0, 0")  # main que termina sin return: código 0
+        self.emit(f"{func}_end:")
+        for reg in frame.saved:
+            self.emit(f"    lw {reg}, {frame.size + frame.saved_offset(reg)}($sp)")
+        if not frame.leaf:
+            self.emit(f"    lw $ra, {frame.size + frame.ra_offset}($sp)")
+            self.emit(f"    lw $fp, {frame.size + frame.fp_offset}($sp)")
+        if frame.size:
+            self.emit(f"    addi $sp, $sp, {frame.size}")
+        if func == 'func_main':
+            self.emit("    move $a0, $v0")
+            self.emit("    li $v0, 17                # service: exit2")
             self.emit("    syscall")
         else:
             self.emit("    jr $ra")
@@ -162,468 +274,390 @@ class MIPSBackend:
     # ---------------------------------------------------------
     # ACA PASA LA MAGIA DEL TAC
     # ---------------------------------------------------------
-    def instr_to_mips(self, instr: Instr) -> None:
-        op = instr.op
-        dst = getattr(instr, "dst", None)
-        a = getattr(instr, "a", None)
-        b = getattr(instr, "b", None)
-
-        # ---------- Relacionales ----------
-        if op in ("EQ", "NE", "LT", "LE", "GT", "GE"):
-            if dst is None or not self.is_temp(dst):
-                return
-
-            rd = self.temp_reg(dst)
-            ra = self.load_operand_to_reg(a, "$t9")
-            rb = self.load_operand_to_reg(b, "$t8")
-
-            if op == "EQ":
-                self.emit(f"    seq {rd}, {ra}, {rb}")
-            elif op == "NE":
-                self.emit(f"    sne {rd}, {ra}, {rb}")
-            elif op == "LT":
-                self.emit(f"    slt {rd}, {ra}, {rb}")
-            elif op == "LE":
-                self.emit(f"    sle {rd}, {ra}, {rb}")
-            elif op == "GT":
-                self.emit(f"    sgt {rd}, {ra}, {rb}")
-            elif op == "GE":
-                self.emit(f"    sge {rd}, {ra}, {rb}")
-
-            return
-
-        # ---------- Lógicos ----------
-        if op in ("AND", "OR"):
-            if dst is None or not self.is_temp(dst):
-                return
-
-            rd = self.temp_reg(dst)
-            ra = self.load_operand_to_reg(a, "$t9")
-            rb = self.load_operand_to_reg(b, "$t8")
-
-            if op == "AND":
-                self.emit(f"    and {rd}, {ra}, {rb}")
-            elif op == "OR":
-                self.emit(f"    or {rd}, {ra}, {rb}")
+    # opcode -> nombre del handler; cada opcode se registra una sola vez
+    HANDLERS = {
+        'EQ': 'op_compare', 'NE': 'op_compare', 'LT': 'op_compare',
+        'LE': 'op_compare', 'GT': 'op_compare', 'GE': 'op_compare',
+        'AND': 'op_logic', 'OR': 'op_logic', 'NOT': 'op_not',
+        'ADD': 'op_arith', 'SUB': 'op_arith', 'MUL': 'op_arith', 'DIV': 'op_arith', 'MOD': 'op_arith', 'SHL': 'op_arith',
+        'MOV': 'op_mov', 'LOAD': 'op_load', 'STORE': 'op_store', 'GETPROP': 'op_getprop', 'SETPROP': 'op_setprop',
+        'LABEL': 'op_label', 'GOTO': 'op_goto', 'IFZ': 'op_ifz', 'JUMPTABLE': 'op_jumptable',
+        'ARG': 'op_arg', 'CALL': 'op_call', 'RET': 'op_ret',
+        'NEWOBJ': 'op_newobj', 'ALLOC': 'op_alloc', 'PRINT': 'op_print',
+    }
+    MNEMONICS = {'EQ': 'seq', 'NE': 'sne', 'LT': 'slt', 'LE': 'sle', 'GT': 'sgt', 'GE': 'sge',
+                 'AND': 'and', 'OR': 'or', 'ADD': 'add', 'SUB': 'sub', 'MUL': 'mul', 'SHL': 'sllv'}
+    # IFZ salta cuando la condición es falsa: la rama inversa de cada relacional
+    FALSE_BRANCH = {'EQ': 'bne', 'NE': 'beq', 'LT': 'bge', 'LE': 'bgt', 'GT': 'ble', 'GE': 'blt'}
 
+    def instr_to_mips(self, instr: Instr) -> None:
+        handler = self.handlers.get(instr.op)
+        # Los opcodes no soportados se ignoran para no romper el backend.
+        if handler is not None:
+            handler(instr.op, instr.dst, instr.a, instr.b)
+
+    # ---------- Relacionales y lógicos: dst = a op b ----------
+    def op_compare(self, op, dst, a, b) -> None:
+        if self.kind(dst) != TEMP:
             return
+        ra = self.operand_reg(a, "$t9")
+        rb = self.operand_reg(b, "$t8")
+        rd = self.dest_reg(dst)
+        self.emit(f"    {self.MNEMONICS[op]} {rd}, {ra}, {rb}")
+        self.spill_store(dst)
 
-        # ---------- NOT ----------
-        if op == "NOT":
-            if dst is None or not self.is_temp(dst):
-                return
+    op_logic = op_compare
 
-            rd = self.temp_reg(dst)
-            ra = self.load_operand_to_reg(a, "$t9")
-            self.emit(f"    seq {rd}, {ra}, $zero")
+    def op_not(self, op, dst, a, b) -> None:
+        if self.kind(dst) != TEMP:
             return
-
-        # Soporte para CALL con asignación: tX = CALL foo
-        if op == "CALL" and dst is not None and dst not in ("None", ""):
-            # Llama a la función normalmente
-            self.instr_to_mips(Instr("CALL", a=a))
-            # Si dst es global, siempre guardar el puntero retornado
-            if not self.is_temp(dst):
-                self.ensure_global(dst)
-                self.emit(f"    sw $v0, {dst}")
-            else:
-                rd = self.temp_reg(dst)
-                self.emit(f"    move {rd}, $v0")
+        ra = self.operand_reg(a, "$t9")
+        rd = self.dest_reg(dst)
+        self.emit(f"    seq {rd}, {ra}, $zero")
+        self.spill_store(dst)
+
+    # ---------- Aritmética ----------
+    def op_arith(self, op, dst, a, b) -> None:
+        if self.kind(dst) != TEMP or a is None or b is None:
             return
-
-        # Soporte para PRINT con asignación a None: None = PRINT t1
-        if op == "PRINT" and dst == "None":
-            # Ejecuta como PRINT normal
-            instr2 = Instr("PRINT", a=a)
-            self.instr_to_mips(instr2)
+        ra = self.operand_reg(a, "$t7")
+        if op == "SHL" and self.kind(b) == IMMEDIATE:
+            rd = self.dest_reg(dst)
+            self.emit(f"    sll {rd}, {ra}, {int(b) & 31}")
+            self.spill_store(dst)
             return
+        rb = self.operand_reg(b, "$t8")
+        rd = self.dest_reg(dst)
+        if op in ("DIV", "MOD"):
+            self.emit(f"    div {ra}, {rb}")
+            self.emit(f"    {'mflo' if op == 'DIV' else 'mfhi'} {rd}")
+        else:
+            self.emit(f"    {self.MNEMONICS[op]} {rd}, {ra}, {rb}")
+        self.spill_store(dst)
 
-        # Soporte para tX = LOAD var o tX = LOAD t_addr (acceso a memoria)
-        if op == "LOAD" and dst is not None and self.is_temp(dst):
-            rd = self.temp_reg(dst)
-            if a is None:
-                return
-            if self.is_immediate(a) or self.is_string_literal(a):
-                self.load_operand_to_reg(a, rd)
-            elif self.is_temp_addr(a):
-                reg_addr = self.temp_reg(a)
-                self.emit(f"    lw {rd}, 0({reg_addr})")
-            else:
-                is_arr = self.is_static_array(a)
-                self.ensure_global(a)
-                if is_arr:
-                    self.emit(f"    la {rd}, {a}")  # Load address para arrays
-                else:
-                    self.emit(f"    lw {rd}, {a}")  # Load word para variables normales
+    # ---------- MOV (copia que deja el optimizador) ----------
+    def op_mov(self, op, dst, a, b) -> None:
+        if self.kind(dst) != TEMP or a is None:
             return
+        self.load_operand_to_reg(a, self.dest_reg(dst), is_array=self.is_static_array(a))
+        self.spill_store(dst)
 
-        # Soporte para tX = GETPROP tY, campo
-        if op == "GETPROP" and dst is not None and self.is_temp(dst):
-            # Espera: GETPROP dst, obj, campo
-            # Si a y b no están, pero hay un campo extra, intenta extraerlo
-            if a is not None and b is not None:
-                rd = self.temp_reg(dst)
-                obj = a
-                field = b
-                offset = self.field_offset(field)
-                self.load_operand_to_reg(obj, "$t9")
-                if offset != 0:
-                    self.emit(f"    addi $t9, $t9, {offset}")
-                self.emit(f"    lw {rd}, 0($t9)")
-                return
-
-        # Soporte para SETPROP tY, campo, tX
-        if op == "SETPROP" and a is not None and b is not None and dst is not None:
-            obj = a
-            field = b
-            val = dst
-            offset = self.field_offset(field)
-            self.load_operand_to_reg(obj, "$t9")
-            if offset != 0:
-                self.emit(f"    addi $t9, $t9, {offset}")
-            reg_val = self.load_operand_to_reg(val, "$t8")
-            if reg_val != "$t8":
-                self.emit(f"    move $t8, {reg_val}")
-            self.emit("    sw $t8, 0($t9)")
+    # ---------- LOAD: tX = LOAD var o tX = LOAD t_addr (acceso a memoria) ----------
+    def op_load(self, op, dst, a, b) -> None:
+        if self.kind(dst) != TEMP or a is None:
             return
+        kind = self.kind(a)
+        reg_addr = self.read_temp(a, "$t9") if kind == TEMP else None
+        rd = self.dest_reg(dst)
+        if kind == IMMEDIATE or kind == STRING:
+            self.load_operand_to_reg(a, rd)
+        elif reg_addr is not None:
+            self.emit(f"    lw {rd}, 0({reg_addr})")
+        elif self.is_static_array(a):
+            self.ensure_global(a)
+            self.emit(f"    la {rd}, {a}")  # Load address para arrays
+        else:
+            self.emit(f"    lw {rd}, {self.var_ref(a)}")  # Load word: local o global
+        self.spill_store(dst)
 
-        # ---------- LABEL ----------
-        if op == "LABEL":
-            lbl = dst
-            if not lbl:
-                return
-
-            if lbl.startswith("func_") or lbl.startswith("method_"):
-                self.current_func = lbl
-                if lbl == "func_main":
-                    self.has_main = True
-                    self.emit("main:")
-                else:
-                    self.emit(f"{lbl}:")
-                # prologue estándar para TODA función
-                self.emit("    addi $sp, $sp, -32")
-                self.emit("    sw $ra, 28($sp)")
-                self.emit("    sw $fp, 24($sp)")
-                self.emit("    move $fp, $sp")
-                # Si es un constructor (newClase), reservar heap aquí
-                if lbl.startswith("func_new") or lbl.startswith("method_new"):
-                    self.emit("    lw $t9, heap_ptr")
-                    self.emit("    move $v0, $t9")
-                    self.emit("    addi $t9, $t9, 32")
-                    self.emit("    sw $t9, heap_ptr")
-            else:
-                self.emit(f"{lbl}:")
+    # ---------- STORE a -> dst ----------
+    def op_store(self, op, dst, a, b) -> None:
+        if a is None or self.kind(dst) == NONE:
             return
-        # ---------- GOTO ----------
-        if op == "GOTO":
-            if dst:
-                self.emit(f"    j {dst}")
+        kind = self.kind(dst)
+        # los arreglos estáticos ya quedan inicializados en .data ("STORE [..] -> xs")
+        if self.is_static_array(dst) or a.startswith('['):
             return
-
-        # ---------- IFZ ----------
-        if op == "IFZ":
-            # if a == 0: goto dst
-            if a is None or dst is None:
-                return
-            reg = self.load_operand_to_reg(a, "$t9")
-            # Salta si la condición es falsa (a == 0)
-            self.emit(f"    beq {reg}, $zero, {dst}")
-            # El flujo sigue al bloque if si la condición es verdadera
+        if kind == TEMP:
+            # tX = a
+            self.load_operand_to_reg(a, self.dest_reg(dst), is_array=self.is_static_array(a))
+            self.spill_store(dst)
+        elif kind == VAR:
+            reg = self.operand_reg(a, "$t9")
+            self.emit(f"    sw {reg}, {self.var_ref(dst)}")
+
+    # ---------- GETPROP: tX = GETPROP obj, campo ----------
+    def op_getprop(self, op, dst, a, b) -> None:
+        if self.kind(dst) != TEMP or a is None or b is None:
             return
-        # ---------- STORE ----------
-        if op == "STORE":
-            if dst is None:
-                return
-            
-        # IGNORAR STORE a arrays estáticos
-        if hasattr(self, 'static_arrays') and dst in self.static_arrays:
-            return  # No emitir nada para arrays estáticos
-    
-            # dst = a   (asignación a temporal)
-            if self.is_temp(dst):
-                rd = self.temp_reg(dst)
-                if a is None:
-                    return
-                self.load_operand_to_reg(a, rd)
-                return
-
-            # Si dst es un temporal (dirección calculada), acceso a memoria (arreglo)
-            if self.is_temp_addr(dst):
-                reg_addr = self.temp_reg(dst)
-                reg_val = self.load_operand_to_reg(a, "$t9")
-                self.emit(f"    sw {reg_val}, 0({reg_addr})")
-                return
-
-            # global = a
-            self.ensure_global(dst)
-            # Si la variable global ya está inicializada en .data y a == 0, NO sobrescribas
-            if hasattr(self, 'static_arrays') and dst in self.static_arrays:
-                return
-            if a is None:
-                return
-            # Si la variable global es un arreglo inicializado, no sobrescribas
-            if hasattr(self, 'static_arrays') and dst in self.static_arrays:
-                return
-            reg = self.load_operand_to_reg(a, "$t9")
-            self.emit(f"    sw {reg}, {dst}")
+        offset = self.field_offset(b)
+        base = self.operand_reg(a, "$t9")
+        rd = self.dest_reg(dst)
+        self.emit(f"    lw {rd}, {offset}({base})")
+        self.spill_store(dst)
+
+    # ---------- SETPROP obj, campo, val (dst=obj, a=campo, b=val) ----------
+    def op_setprop(self, op, dst, a, b) -> None:
+        if a is None or b is None or dst is None:
             return
-
-        # ---------- LOAD ----------
-        if op == "LOAD":
-            # LOAD dst, a   => dst = contenido de variable global a
-            if dst is None or not self.is_temp(dst):
-                return
-            rd = self.temp_reg(dst)
-            if a is None:
-                return
-            if self.is_immediate(a) or self.is_string_literal(a):
-                # caso degenerado: lo tratamos como literal
-                self.load_operand_to_reg(a, rd)
-            else:
-                self.ensure_global(a)
-                self.emit(f"    lw {rd}, {a}")
+        offset = self.field_offset(a)
+        base = self.operand_reg(dst, "$t9")
+        reg_val = self.operand_reg(b, "$t8")
+        self.emit(f"    sw {reg_val}, {offset}({base})")
+
+    # ---------- LABEL ----------
+    def op_label(self, op, dst, a, b) -> None:
+        lbl = dst
+        if not lbl:
             return
-
-        # ---------- Aritmética ----------
-        if op in ("ADD", "SUB", "MUL", "DIV"):
-            if dst is None or not self.is_temp(dst):
-                return
-            rd = self.temp_reg(dst)
-            if a is None or b is None:
-                return
-            # Si alguno de los operandos es acceso a arreglo, usa el patrón profesional
-            if (isinstance(a, str) and '[' in a and ']' in a) or (isinstance(b, str) and '[' in b and ']' in b):
-                # a y/o b pueden ser acceso a arreglo
-                if isinstance(a, str) and '[' in a and ']' in a:
-                    self.load_operand_to_reg(a, "$t7")
-                    ra = "$t7"
-                else:
-                    ra = self.load_operand_to_reg(a, "$t7")
-                if isinstance(b, str) and '[' in b and ']' in b:
-                    self.load_operand_to_reg(b, "$t1")
-                    rb = "$t1"
-                else:
-                    rb = self.load_operand_to_reg(b, "$t1")
+        if lbl.startswith("func_") or lbl.startswith("method_"):
+            self.current_func = lbl
+            if self.skip_functions and not self.open_funcs:
+                self.emit(f"    j {lbl}_skip")
+            self.open_funcs.append(lbl)
+            if lbl == "func_main":
+                self.has_main = True
+                self.emit("main:")
             else:
-                ra = self.load_operand_to_reg(a, "$t7")
-                rb = self.load_operand_to_reg(b, "$t1")
-            if op == "ADD":
-                self.emit(f"    add {rd}, {ra}, {rb}")
-            elif op == "SUB":
-                self.emit(f"    sub {rd}, {ra}, {rb}")
-            elif op == "MUL":
-                self.emit(f"    mul {rd}, {ra}, {rb}")
-            elif op == "DIV":
-                self.emit(f"    div {ra}, {rb}")
-                self.emit(f"    mflo {rd}")
-            return
-
-        # ---------- ARG ----------
-        if op == "ARG":
-            # vamos acumulando los argumentos hasta ver CALL
-            if a is not None:
-                self.pending_args.append(a)
+                self.emit(f"{lbl}:")
+            self.emit_prologue(lbl)
+            # Si es un constructor (newClase), reservar heap aquí
+            if lbl.startswith("func_new") or lbl.startswith("method_new"):
+                self.emit("    lw $t9, heap_ptr")
+                self.emit("    move $v0, $t9")
+                self.emit("    addi $t9, $t9, 32")
+                self.emit("    sw $t9, heap_ptr")
             return
-
-        # ---------- CALL ----------
-        if op == "CALL":
-            func_name = a
-            if func_name is None:
-                return
-
-
-            # Solo emitir 'jal' si func_name es una función real (por convención de prefijo)
-            if not (str(func_name).startswith('func_') or str(func_name).startswith('method_')):
-                # No es función, no emitir nada
-                self.pending_args = []
-                return
-
-            num_args = len(self.pending_args)
-            if num_args > 0:
-                # reservar espacio para args
-                self.emit(f"    addi $sp, $sp, -{4 * num_args}")
-                # guardar cada arg en stack
-                for idx, arg in enumerate(self.pending_args):
-                    reg = self.load_operand_to_reg(arg, "$t9")
-                    self.emit(f"    sw {reg}, {idx * 4}($sp)")
-            # llamada
-            self.emit(f"    jal {func_name}")
-            # liberar args
-            if num_args > 0:
-                self.emit(f"    addi $sp, $sp, {4 * num_args}")
-            # resultado en dst si corresponde
-            if dst is not None and dst not in ("None", ""):
-                # si es temporal
-                if self.is_temp(dst):
-                    rd = self.temp_reg(dst)
-                    self.emit(f"    move {rd}, $v0")
-                else:
-                    # variable global
-                    self.ensure_global(dst)
-                    self.emit(f"    sw $v0, {dst}")
-            # limpiar lista de args
-            self.pending_args = []
+        self.emit(f"{lbl}:")
+        # end_f cierra la función abierta: aquí va su epílogo (también si el cuerpo no
+        # termina en RETURN)
+        if lbl.startswith("end_") and self.open_funcs and self.unit is not None \
+                and self.unit.name == self.open_funcs[-1]:
+            self.close_function()
+
+    def close_function(self) -> None:
+        """Epílogo de la función abierta más interna; al salir de la última, el código
+        global sigue en `<func>_skip`."""
+        func = self.open_funcs.pop()
+        self.emit_epilogue(func)
+        if self.skip_functions and not self.open_funcs:
+            self.emit(f"{func}_skip:")
+
+    # ---------- GOTO ----------
+    def op_goto(self, op, dst, a, b) -> None:
+        if dst:
+            self.emit(f"    j {dst}")
+
+    def branch_operand(self, operand: str, scratch: str) -> str:
+        """Operando de un salto condicional: los inmediatos van tal cual (0 es $zero)."""
+        if self.kind(operand) == IMMEDIATE:
+            return "$zero" if int(operand) == 0 else operand
+        return self.operand_reg(operand, scratch)
+
+    def emit_fused_branch(self, rel: Instr, target: str) -> None:
+        """`t = a REL b` seguido de `IFZ t, L` (con t muerto después): salta a L con la
+        condición invertida sin materializar t."""
+        if self.kind(rel.a) == IMMEDIATE:
+            ra = self.load_operand_to_reg(rel.a, "$t9")
+        else:
+            ra = self.operand_reg(rel.a, "$t9")
+        rb = self.branch_operand(rel.b, "$t8")
+        self.emit(f"    {self.FALSE_BRANCH[rel.op]} {ra}, {rb}, {target}")
+        self.fused_branches += 1
+
+    # ---------- IFZ: if a == 0 goto dst ----------
+    def op_ifz(self, op, dst, a, b) -> None:
+        if a is None or dst is None:
             return
+        reg = self.operand_reg(a, "$t9")
+        # Salta si la condición es falsa (a == 0); si no, sigue al bloque del if
+        self.emit(f"    beq {reg}, $zero, {dst}")
 
-        # ---------- RET (RETURN) ----------
-        if op == "RET":
-            val = dst if dst is not None else a
-            if val is not None:
-                reg = self.load_operand_to_reg(val, "$v0")
-                if reg != "$v0":
-                    self.emit(f"    move $v0, {reg}")
-            # epílogo profesional
-            self.emit_epilogue()
+    # ---------- JUMPTABLE i, [L0,L1,...], default ----------
+    def op_jumptable(self, op, dst, a, b) -> None:
+        if a is None or dst is None or not b:
             return
-
-        # ---------- NEWOBJ ----------
-        if op == "NEWOBJ":
-            # NEWOBJ dst, Clase
-            self.uses_heap = True
+        label = f"__jt{len(self.jump_tables)}"
+        self.jump_tables[label] = b[1:-1].split(',')
+        ri = self.operand_reg(a, "$t9")
+        # una sola comparación sin signo descarta i < 0 e i >= tamaño de la tabla
+        self.emit(f"    sltiu $t8, {ri}, {len(self.jump_tables[label])}")
+        self.emit(f"    beq $t8, $zero, {dst}")
+        self.emit(f"    sll $t8, {ri}, 2")
+        self.emit(f"    la $t9, {label}")
+        self.emit("    add $t8, $t8, $t9")
+        self.emit("    lw $t8, 0($t8)")
+        self.emit("    jr $t8")
+
+    # ---------- ARG ----------
+    def op_arg(self, op, dst, a, b) -> None:
+        # vamos acumulando los argumentos hasta ver CALL
+        if a is not None:
+            self.pending_args.append(a)
+
+    # ---------- CALL: [dst =] CALL func ----------
+    def op_call(self, op, dst, a, b) -> None:
+        if a is None:
             return
-
-        # ---------- ALLOC ----------
-        if op == "ALLOC":
-            # ALLOC dst, a   ; a = número de enteros
-            if dst is None or not self.is_temp(dst):
-                return
-            if a is None:
-                return
-            self.uses_heap = True
-            rd = self.temp_reg(dst)
-            # bytes = a * 4
-            if self.is_immediate(a):
-                bytes_num = int(a) * 4
-                self.emit("    lw $t9, heap_ptr")
-                self.emit(f"    move {rd}, $t9")
-                self.emit(f"    addi $t9, $t9, {bytes_num}")
-                self.emit("    sw $t9, heap_ptr")
+        # Solo emitir 'jal' si a es una función real (por convención de prefijo)
+        if str(a).startswith('func_') or str(a).startswith('method_'):
+            n_regs = len(ARG_REGS) if self.convention == 'registers' else 0
+            reg_args, args = self.pending_args[:n_regs], self.pending_args[n_regs:]
+            if self.frame() is not None:
+                # dentro de una función: área de argumentos salientes al fondo del frame
+                for idx, arg in enumerate(args):
+                    reg = self.operand_reg(arg, "$t9")
+                    self.emit(f"    sw {reg}, {idx * 4}($sp)")
             else:
-                # a en registro
-                ra = self.load_operand_to_reg(a, "$t8")
-                self.emit("    lw $t9, heap_ptr")
-                self.emit(f"    move {rd}, $t9")
-                # bytes = a * 4
-                self.emit("    sll $t8, $t8, 2")
-                self.emit("    add $t9, $t9, $t8")
-                self.emit("    sw $t9, heap_ptr")
-            return
+                # código global (sin frame): apilar del último al primero, el primero en 0($sp)
+                for arg in reversed(args):
+                    reg = self.operand_reg(arg, "$t9")
+                    self.emit("    addi $sp, $sp, -4")
+                    self.emit(f"    sw {reg}, 0($sp)")
+            for reg, arg in zip(ARG_REGS, reg_args):
+                self.load_operand_to_reg(arg, reg)
+            self.emit(f"    jal {a}")
+            if args and self.frame() is None:
+                self.emit(f"    addi $sp, $sp, {4 * len(args)}")
+        # limpiar lista de args
+        self.pending_args = []
+        # resultado en dst si corresponde
+        kind = self.kind(dst)
+        if kind == TEMP:
+            rd = self.dest_reg(dst)
+            self.emit(f"    move {rd}, $v0")
+            self.spill_store(dst)
+        elif kind != NONE:
+            # variable: siempre guardar el valor retornado
+            self.emit(f"    sw $v0, {self.var_ref(dst)}")
+
+    # ---------- RET (RETURN) ----------
+    def op_ret(self, op, dst, a, b) -> None:
+        val = dst if dst is not None else a
+        if val is None and self.unit is not None and self.unit.name == 'func_main':
+            val = '0'
+        if val is not None:
+            self.load_operand_to_reg(val, "$v0")
+        if self.frame() is not None:
+            self.emit(f"    j {self.unit.name}_end")
+        elif val is not None:
+            # return con valor fuera de una función: termina el programa con ese código
+            self.emit("    move $a0, $v0")
+            self.emit("    li $v0, 17                # service: exit2")
+            self.emit("    syscall")
+        else:
+            self.emit("    li $v0, 10                # service: exit")
+            self.emit("    syscall")
 
-        # ---------- GETPROP ----------
-        if op == "GETPROP":
-            # GETPROP dst, obj, campo
-            if dst is None or not self.is_temp(dst):
-                return
-            if a is None or b is None:
-                return
-            rd = self.temp_reg(dst)
-            obj = a
-            field = b
-            offset = self.field_offset(field)  # bytes
-            # cargar puntero obj en $t9
-            self.load_operand_to_reg(obj, "$t9")
-            if offset != 0:
-                self.emit(f"    addi $t9, $t9, {offset}")
-            self.emit(f"    lw {rd}, 0($t9)")
-            return
+    # ---------- NEWOBJ dst, Clase ----------
+    def op_newobj(self, op, dst, a, b) -> None:
+        self.uses_heap = True
 
-        # ---------- SETPROP ----------
-        if op == "SETPROP":
-            # SETPROP obj, campo, val  (a=obj, b=campo, dst=val)
-            if a is None or b is None or dst is None:
-                return
-            obj = a
-            field = b
-            val = dst
-            offset = self.field_offset(field)
-            # obj -> $t9
-            self.load_operand_to_reg(obj, "$t9")
-            if offset != 0:
-                self.emit(f"    addi $t9, $t9, {offset}")
-            # val -> $t8
-            reg_val = self.load_operand_to_reg(val, "$t8")
-            if reg_val != "$t8":
-                self.emit(f"    move $t8, {reg_val}")
-            self.emit("    sw $t8, 0($t9)")
+    # ---------- ALLOC dst, a   ; a = número de enteros ----------
+    def op_alloc(self, op, dst, a, b) -> None:
+        if self.kind(dst) != TEMP or a is None:
             return
-
-        # ---------- PRINT ----------
-        if op == "PRINT":
-            if a is None:
-                return
-            # Detectar si es string o entero
-            if self.is_string_literal(a):
-                reg = self.load_operand_to_reg(a, "$a0")
-                if reg != "$a0":
-                    self.emit(f"    move $a0, {reg}")
-                self.emit("    li $v0, 4")
-                self.emit("    syscall")
-            else:
-                reg = self.load_operand_to_reg(a, "$a0")
-                if reg != "$a0":
-                    self.emit(f"    move $a0, {reg}")
-                self.emit("    li $v0, 1")
-                self.emit("    syscall")
+        self.uses_heap = True
+        # bytes = a * 4
+        if self.kind(a) == IMMEDIATE:
+            rd = self.dest_reg(dst)
+            bytes_num = int(a) * 4
+            self.emit("    lw $t9, heap_ptr")
+            self.emit(f"    move {rd}, $t9")
+            self.emit(f"    addi $t9, $t9, {bytes_num}")
+            self.emit("    sw $t9, heap_ptr")
+        else:
+            # a en registro; bytes = a * 4 antes de escribir rd (puede compartir registro)
+            ra = self.operand_reg(a, "$t8")
+            self.emit(f"    sll $t8, {ra}, 2")
+            rd = self.dest_reg(dst)
+            self.emit("    lw $t9, heap_ptr")
+            self.emit(f"    move {rd}, $t9")
+            self.emit("    add $t9, $t9, $t8")
+            self.emit("    sw $t9, heap_ptr")
+        self.spill_store(dst)
+
+    # ---------- PRINT (también None = PRINT t1) ----------
+    def op_print(self, op, dst, a, b) -> None:
+        if a is None:
             return
+        self.load_operand_to_reg(a, "$a0")
+        # syscall 4 para strings, 1 para enteros
+        self.emit("    li $v0, 4" if self.kind(a) == STRING else "    li $v0, 1")
+        self.emit("    syscall")
 
-        # Si llega aquí, es un opcode no soportado explícitamente.
-        # Lo ignoramos silenciosamente para no romper el backend.
-        return
-
-    def emit_from_emitter(self, emitter: Emitter, out_path: Optional[str] = None, static_arrays: Optional[dict] = None) -> str:
-        """Convierte todas las instrucciones TAC en código MIPS."""
-        
+    def translate(self, instrs: Iterable[Instr], static_arrays: Optional[dict] = None) -> None:
+        """Traduce el TAC a .text (vía self.emit) y junta lo que después necesita .data."""
         self.static_arrays = static_arrays or {}
-        
-        # recorrer instrucciones TAC
-        for instr in emitter.instrs:
-            self.instr_to_mips(instr)
-
-        # construir salida final
-        out_lines: List[str] = []
-
-        # Sección .data
-        out_lines.append(".data")
-        
-        # ✅ Primero emitir los arrays estáticos
-        if static_arrays:
-            for name, elems in static_arrays.items():
-                elems_str = ", ".join(str(e) for e in elems)
-                out_lines.append(f"{name}: .word {elems_str}")
-        
-        # Luego emitir las variables globales normales
+        # asignar registros a los temporales y recorrer instrucciones TAC
+        instrs = list(instrs)
+        self.allocation = allocate(instrs)
+        layout_frames(instrs, self.allocation, self.symtab, self.static_arrays, self.convention)
+        sink = self.sink
+        if self.peephole is not None:
+            # las líneas pasan por el peephole antes de llegar al destino real
+            self.peephole.out = sink
+            self.sink = self.peephole.push
+        try:
+            if not any(ins.op == 'LABEL' and ins.dst == 'func_main' for ins in instrs):
+                # programa sin main: la entrada es el código global, en orden
+                self.skip_functions = self.has_main = True
+                self.emit("main:")
+            unit_of = self.allocation.unit_of
+            pos: Dict[str, int] = {}  # posición dentro de la unidad, como en regalloc
+            i, n = 0, len(instrs)
+            while i < n:
+                instr, unit = instrs[i], unit_of[i]
+                self.unit = self.allocation.units[unit]
+                p = pos[unit] = pos.get(unit, -1) + 1
+                if self.fuse_branches and instr.op in self.FALSE_BRANCH and i + 1 < n:
+                    nxt = instrs[i + 1]
+                    if nxt.op == 'IFZ' and nxt.dst and nxt.a == instr.dst and self.is_temp(instr.dst) \
+                            and p + 1 in self.unit.dead_conditions:
+                        self.emit_fused_branch(instr, nxt.dst)
+                        pos[unit] = p + 1
+                        i += 2
+                        continue
+                self.instr_to_mips(instr)
+                i += 1
+            # una función sin end_ al final del TAC igual necesita su epílogo
+            while self.open_funcs:
+                self.unit = self.allocation.units[self.open_funcs[-1]]
+                self.close_function()
+            if self.peephole is not None:
+                self.peephole.flush()
+        finally:
+            self.sink = sink
+        self.unit = None
+
+    def data_lines(self) -> Iterator[str]:
+        """Sección .data y encabezado de .text; válido solo después de translate()."""
+        static_arrays = self.static_arrays
+        yield ".data"
+        # Primero los arrays estáticos
+        for name, elems in static_arrays.items():
+            elems_str = ", ".join(str(e) for e in elems)
+            yield f"{name}: .word {elems_str}"
+        # Luego las variables globales normales (saltando las que son arrays estáticos)
         for name in sorted(self.global_vars):
-            # ✅ Saltar si ya está en static_arrays
-            if static_arrays and name in static_arrays:
-                continue
-            out_lines.append(f"{name}: .word 0")
-
+            if name not in static_arrays:
+                yield f"{name}: .word 0"
+        # slots de spill del código global (fuera de funciones no hay frame)
+        for k in range(self.global_spills):
+            yield f"__spill{k}: .word 0"
+        # tablas de saltos (direcciones de las etiquetas de cada caso)
+        for lbl, targets in self.jump_tables.items():
+            yield f"{lbl}: .word {', '.join(targets)}"
         # literales de string
         for literal, lbl in self.string_literals.items():
-            val = literal[1:-1]
-            out_lines.append(f'{lbl}: .asciiz "{val}"')
-
+            yield f'{lbl}: .asciiz "{literal[1:-1]}"'
         # heap si es necesario
         if self.uses_heap:
-            out_lines.append("heap: .space 4096")
-            out_lines.append("heap_ptr: .word heap")
-
-        out_lines.append("")
-
-        # Sección .text
-        out_lines.append(".text")
+            yield "heap: .space 4096"
+            yield "heap_ptr: .word heap"
+        yield ""
+        yield ".text"
         if self.has_main:
-            out_lines.append(".globl main")
-
-        for line in self.text_lines:
-            # No emitir la etiqueta 'end_main:'
-            if line.strip() == 'end_main:':
-                continue
-            out_lines.append(line)
+            yield ".globl main"
 
-        out = "\n".join(out_lines)
+    def emit_from_emitter(self, emitter: Emitter, out_path: Optional[str] = None, static_arrays: Optional[dict] = None) -> str:
+        """Convierte todas las instrucciones TAC en código MIPS."""
+        self.translate(emitter.instrs, static_arrays)
+        # No emitir la etiqueta 'end_main:'
+        text = (line for line in self.text_lines if line.strip() != 'end_main:')
+        out = "\n".join(chain(self.data_lines(), text))
         # Siempre agregar el final profesional al final del archivo
-        out = out.rstrip() + '\n    li $v0, 10                # service: exit\n    syscall\n'
+        out = out.rstrip() + "\n" + "\n".join(self.EXIT_STUB) + "\n"
 
         if out_path is not None:
             with open(out_path, "w", encoding="utf-8") as f:
@@ -631,7 +665,47 @@ class MIPSBackend:
 
         return out
 
+    def stream_lines(self, emitter: Emitter, static_arrays: Optional[dict] = None) -> Iterator[str]:
+        """Genera el programa línea por línea sin armarlo en memoria.
 
-def emit_mips(emitter: Emitter, symtab=None, out_path: Optional[str] = None, static_arrays: Optional[dict] = None) -> str:
-    backend = MIPSBackend()
-    return backend.emit_from_emitter(emitter, out_path, static_arrays=static_arrays)
\ No newline at end of file
+        .data depende de lo que aparece al traducir (globales, strings, heap), así que el
+        .text se escribe primero a un archivo temporal y se relee después de .data."""
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as spill:
+            write = spill.write
+
+            def sink(line: str) -> None:
+                if line != 'end_main:':
+                    write(line + "\n")
+
+            self.sink = sink
+            try:
+                self.translate(emitter.instrs, static_arrays)
+            finally:
+                self.sink = self.text_lines.append
+            yield from self.data_lines()
+            spill.seek(0)
+            for line in spill:
+                yield line[:-1]
+            yield from self.EXIT_STUB
+
+    def emit_to_file(self, emitter: Emitter, out_path: str, static_arrays: Optional[dict] = None) -> str:
+        """Escribe el programa en `out_path` en modo streaming y devuelve la ruta."""
+        with open(out_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+            for line in self.stream_lines(emitter, static_arrays):
+                f.write(line + "\n")
+        return out_path
+
+
+def emit_mips(emitter: Emitter, symtab=None, out_path: Optional[str] = None, static_arrays: Optional[dict] = None,
+              stream: bool = False, convention: str = 'registers',
+              peephole: bool = False) -> Union[str, Iterator[str]]:
+    """Texto MIPS del programa. Con `stream=True` no se arma el texto en memoria: se
+    escribe en `out_path` y se devuelve la ruta o, sin `out_path`, un iterador de líneas.
+    `convention='stack'` vuelve a pasar todos los argumentos por la pila (compatibilidad).
+    `peephole=True` pasa el .text por las reglas de codegen/peephole.py."""
+    backend = MIPSBackend(symtab, convention, peephole)
+    if stream:
+        if out_path is not None:
+            return backend.emit_to_file(emitter, out_path, static_arrays=static_arrays)
+        return backend.stream_lines(emitter, static_arrays=static_arrays)
+    return backend.emit_from_emitter(emitter, out_path, static_arrays=static_arrays)
@@ -0,0 +1,473 @@
+"""
+Optimizaciones escalares sobre el TAC del Emitter.
+
+Los pases trabajan sobre el CFG de codegen/cfg.py (una unidad a la vez) y se apoyan en
+los análisis de codegen/dataflow.py:
+
+    constprop  propagación de constantes (copias disponibles con valor inmediato),
+               plegado de aritmética/relacionales/NOT, identidades algebraicas y saltos
+               IFZ/JUMPTABLE con condición o índice constante
+    copyprop   propagación de copias `d = t` / `STORE t -> d` hacia los usos de `d`
+    lvn        numeración de valores local (CSE por bloque): reutiliza expresiones,
+               lecturas de variables y de memoria ya calculadas
+    licm       ciclos: lo invariante (aritmética, lecturas de variables y de propiedades
+               que el ciclo no escribe) se calcula una vez en el preheader
+    ivs        ciclos: bases de arreglos al preheader y punteros de inducción en lugar
+               de `base + i*4` (ver codegen/loops.py)
+    strength   multiplicación por potencia de dos -> corrimiento SHL
+    dce        eliminación de código muerto (liveness) y de bloques inalcanzables
+
+Los pases reescriben instrucciones como copias `d = MOV v`, que `copyprop` y `dce`
+terminan de limpiar; por eso el pipeline se repite hasta que ningún pase cambie nada.
+Cada pase puede desactivarse y el `OptimizationReport` cuenta instrucciones eliminadas,
+agregadas y reescritas por pase.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from codegen.cfg import FunctionCFG, ProgramCFG
+from codegen.dataflow import (ARITH_OPS, available_copies, defs_uses, is_immediate, is_name,
+                              is_temp, liveness)
+from codegen.loops import induction_variables, loop_invariant_code_motion, strength_reduction
+from codegen.tac import Instr
+
+PASSES = ('constprop', 'copyprop', 'lvn', 'licm', 'ivs', 'strength', 'dce')
+COMMUTATIVE = ('ADD', 'MUL', 'EQ', 'NE', 'AND', 'OR')
+PURE_OPS = ARITH_OPS + ('NOT', 'MOV', 'LOAD', 'GETPROP')
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+class PassStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.removed = 0
+        self.added = 0  # licm/ivs pueden crear instrucciones (preheader, punteros)
+        self.rewritten = 0
+        self.hoisted = 0
+        self.runs = 0
+
+    def as_dict(self) -> Dict:
+        return {'pass': self.name, 'removed': self.removed, 'added': self.added,
+                'rewritten': self.rewritten, 'hoisted': self.hoisted, 'runs': self.runs}
+
+
+class OptimizationReport:
+    def __init__(self, passes: Iterable[str]):
+        self.passes: Dict[str, PassStats] = {p: PassStats(p) for p in passes}
+        self.before = 0
+        self.after = 0
+        self.rounds = 0
+
+    @property
+    def removed(self) -> int:
+        return self.before - self.after
+
+    def as_dict(self) -> Dict:
+        return {'before': self.before, 'after': self.after, 'rounds': self.rounds,
+                'passes': [s.as_dict() for s in self.passes.values()]}
+
+    def __str__(self):
+        lines = [f"[Opt] {self.before} -> {self.after} instrucciones TAC ({self.rounds} rondas)"]
+        for s in self.passes.values():
+            line = f"[Opt]   {s.name:<10} eliminadas {s.removed:>5}  reescritas {s.rewritten:>5}"
+            if s.added:
+                line += f"  agregadas {s.added:>5}"
+            if s.hoisted:
+                line += f"  al preheader {s.hoisted:>5}"
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+# ---------- Utilidades ----------
+def fold(op: str, a: int, b: Optional[int] = None) -> Optional[int]:
+    """Valor de `a op b` con la semántica del backend MIPS, o None si no se pliega
+    (división entre cero o resultado fuera de 32 bits)."""
+    if op == 'ADD':
+        r = a + b
+    elif op == 'SUB':
+        r = a - b
+    elif op == 'MUL':
+        r = a * b
+    elif op == 'SHL':
+        if not 0 <= b < 32:
+            return None
+        r = a << b
+    elif op == 'DIV':
+        if b == 0:
+            return None
+        r = abs(a) // abs(b)
+        if (a < 0) != (b < 0):
+            r = -r
+    elif op == 'MOD':
+        # como `div` + `mfhi`: el resto lleva el signo del dividendo
+        if b == 0:
+            return None
+        r = abs(a) % abs(b)
+        if a < 0:
+            r = -r
+    elif op == 'EQ':
+        r = int(a == b)
+    elif op == 'NE':
+        r = int(a != b)
+    elif op == 'LT':
+        r = int(a < b)
+    elif op == 'LE':
+        r = int(a <= b)
+    elif op == 'GT':
+        r = int(a > b)
+    elif op == 'GE':
+        r = int(a >= b)
+    elif op == 'AND':
+        r = a & b
+    elif op == 'OR':
+        r = a | b
+    elif op == 'NOT':
+        r = int(a == 0)
+    else:
+        return None
+    return r if INT_MIN <= r <= INT_MAX else None
+
+
+def _simplify(ins: Instr) -> Optional[Instr]:
+    """Plegado e identidades de una instrucción aritmética; None si no cambia."""
+    op, a, b = ins.op, ins.a, ins.b
+    if op == 'NOT' and is_immediate(a):
+        return Instr('MOV', ins.dst, str(fold('NOT', int(a))))
+    if op not in ARITH_OPS:
+        return None
+    if is_immediate(a) and is_immediate(b):
+        r = fold(op, int(a), int(b))
+        return Instr('MOV', ins.dst, str(r)) if r is not None else None
+    copyable = lambda x: is_temp(x) or is_immediate(x)
+    if op in ('ADD', 'OR') and b == '0' and copyable(a):
+        return Instr('MOV', ins.dst, a)
+    if op in ('ADD', 'OR') and a == '0' and copyable(b):
+        return Instr('MOV', ins.dst, b)
+    if op in ('SUB', 'SHL') and b == '0' and copyable(a):
+        return Instr('MOV', ins.dst, a)
+    if op in ('MUL', 'DIV') and b == '1' and copyable(a):
+        return Instr('MOV', ins.dst, a)
+    if op == 'MUL' and a == '1' and copyable(b):
+        return Instr('MOV', ins.dst, b)
+    if op in ('MUL', 'AND') and '0' in (a, b):
+        return Instr('MOV', ins.dst, '0')
+    if a == b and is_name(a):
+        if op in ('SUB', 'NE', 'LT', 'GT'):
+            return Instr('MOV', ins.dst, '0')
+        if op in ('EQ', 'LE', 'GE'):
+            return Instr('MOV', ins.dst, '1')
+    return None
+
+
+def _substitute(ins: Instr, env: Dict[str, str]) -> Instr:
+    """Reemplaza los usos de `ins` por sus valores conocidos en `env`.
+
+    En `LOAD t, a` con `a` temporal, `a` es una dirección y solo se cambia por otro
+    temporal; con `a` variable, la lectura entera se vuelve `MOV`."""
+    op = ins.op
+    if op == 'LOAD':
+        v = env.get(ins.a)
+        if v is None:
+            return ins
+        if is_temp(ins.a):
+            return Instr('LOAD', ins.dst, v, ins.b) if is_temp(v) else ins
+        return Instr('MOV', ins.dst, v)
+    if op in ARITH_OPS:
+        return Instr(op, ins.dst, env.get(ins.a, ins.a), env.get(ins.b, ins.b))
+    if op in ('MOV', 'NOT', 'STORE', 'IFZ', 'JUMPTABLE', 'ARG', 'PRINT', 'ALLOC', 'GETPROP'):
+        return Instr(op, ins.dst, env.get(ins.a, ins.a), ins.b)
+    if op == 'RET':
+        return Instr(op, env.get(ins.dst, ins.dst), ins.a, ins.b)
+    if op == 'SETPROP':
+        return Instr(op, env.get(ins.dst, ins.dst), ins.a, env.get(ins.b, ins.b))
+    return ins
+
+
+def _forget(env: Dict[str, str], name: str) -> None:
+    env.pop(name, None)
+    for k in [k for k, v in env.items() if v == name]:
+        del env[k]
+
+
+# ---------- Propagación (constantes y copias) ----------
+def _propagate(unit: FunctionCFG, stats: PassStats, constants: bool) -> bool:
+    accept = is_immediate if constants else is_temp
+    res = available_copies(unit, accept)
+    changed_any = False
+    branches = []  # bloques cuyo salto se plegó: hay que reenlazarlos
+    for b in unit.blocks:
+        env: Dict[str, str] = dict(res.universe.decode(res.in_.get(b, 0)))
+        out: List[Instr] = []
+        changed = False
+        for ins in b.instrs:
+            new = _substitute(ins, env) if env else ins
+            if constants:
+                new = _simplify(new) or new
+                if new.op == 'IFZ' and is_immediate(new.a):
+                    new = Instr('GOTO', new.dst) if int(new.a) == 0 else None
+                    branches.append(b)
+                elif new.op == 'JUMPTABLE' and is_immediate(new.a):
+                    table, k = new.b[1:-1].split(','), int(new.a)
+                    new = Instr('GOTO', table[k] if 0 <= k < len(table) else new.dst)
+                    branches.append(b)
+            if new is not None and new.op == 'MOV' and new.a == new.dst:
+                new = None
+            if new is None:
+                changed = True
+                continue
+            if new != ins:
+                stats.rewritten += 1
+                changed = True
+            if new.op == 'CALL':
+                for k in [k for k in env if not is_temp(k)]:
+                    del env[k]
+            for x in defs_uses(new)[0]:
+                _forget(env, x)
+            if new.op in ('MOV', 'STORE') and is_name(new.dst) and accept(new.a) \
+                    and new.a != new.dst:
+                env[new.dst] = new.a
+            out.append(new)
+        if changed:
+            b.instrs = out
+            changed_any = True
+    for b in branches:
+        if b in unit.blocks:
+            unit.rebuild_block(b)
+    return changed_any
+
+
+def constant_propagation(unit: FunctionCFG, stats: PassStats) -> bool:
+    return _propagate(unit, stats, constants=True)
+
+
+def copy_propagation(unit: FunctionCFG, stats: PassStats) -> bool:
+    return _propagate(unit, stats, constants=False)
+
+
+# ---------- Numeración de valores local ----------
+class _ValueTable:
+    """Números de valor de un bloque: qué nombre guarda qué valor y qué expresiones
+    (aritmética, lecturas de variables y de memoria) ya se calcularon."""
+
+    def __init__(self):
+        self.count = 0
+        self.of: Dict[str, int] = {}         # nombre -> número de valor
+        self.consts: Dict[str, int] = {}     # inmediato -> número de valor
+        self.literal: Dict[int, str] = {}    # número de valor -> inmediato
+        self.holders: Dict[int, List[str]] = {}  # número de valor -> temporales que lo tienen
+        self.exprs: Dict[Tuple, int] = {}
+        self.memory: List[Tuple] = []        # claves que dependen de memoria
+
+    def fresh(self) -> int:
+        self.count += 1
+        return self.count
+
+    def value(self, x) -> object:
+        if is_immediate(x):
+            n = self.consts.get(x)
+            if n is None:
+                n = self.consts[x] = self.fresh()
+                self.literal[n] = x
+            return n
+        if not is_name(x):
+            return ('lit', x)
+        n = self.of.get(x)
+        if n is None:
+            n = self.of[x] = self.fresh()
+            if is_temp(x):
+                self.holders.setdefault(n, []).append(x)
+        return n
+
+    def assign(self, name: str, n: int) -> None:
+        old = self.of.get(name)
+        if old is not None and name in self.holders.get(old, ()):
+            self.holders[old].remove(name)
+        self.of[name] = n
+        if is_temp(name):
+            self.holders.setdefault(n, []).append(name)
+
+    def holder(self, n: int) -> Optional[str]:
+        if n in self.literal:
+            return self.literal[n]
+        hs = self.holders.get(n)
+        return hs[0] if hs else None
+
+    def clobber_memory(self) -> None:
+        for key in self.memory:
+            self.exprs.pop(key, None)
+        self.memory = []
+
+    def clobber_variables(self) -> None:
+        for name in [x for x in self.of if not is_temp(x)]:
+            self.assign(name, self.fresh())
+
+
+def _expr_key(ins: Instr, vt: _ValueTable) -> Optional[Tuple]:
+    op = ins.op
+    if op in ARITH_OPS:
+        a, b = vt.value(ins.a), vt.value(ins.b)
+        if op in COMMUTATIVE and str(b) < str(a):
+            a, b = b, a
+        return (op, a, b)
+    if op == 'NOT':
+        return ('NOT', vt.value(ins.a))
+    if op == 'LOAD' and is_temp(ins.a):
+        return ('MEM', vt.value(ins.a))
+    if op == 'GETPROP':
+        return ('PROP', vt.value(ins.a), ins.b)
+    return None
+
+
+def local_value_numbering(unit: FunctionCFG, stats: PassStats) -> bool:
+    changed_any = False
+    for b in unit.blocks:
+        vt = _ValueTable()
+        out: List[Instr] = []
+        changed = False
+        for ins in b.instrs:
+            op = ins.op
+            n = None
+            seen = False  # el valor ya estaba calculado en el bloque
+            if op == 'LOAD' and is_name(ins.a) and not is_temp(ins.a):
+                n, seen = vt.value(ins.a), True
+            elif op == 'MOV':
+                n = vt.value(ins.a)
+            else:
+                key = _expr_key(ins, vt)
+                if key is not None:
+                    n = vt.exprs.get(key)
+                    seen = n is not None
+                    if n is None:
+                        n = vt.exprs[key] = vt.fresh()
+                        if key[0] in ('MEM', 'PROP'):
+                            vt.memory.append(key)
+            if seen and is_temp(ins.dst):
+                h = vt.holder(n)
+                if h == ins.dst:
+                    changed = True
+                    continue
+                if h is not None:
+                    ins = Instr('MOV', ins.dst, h)
+                    stats.rewritten += 1
+                    changed = True
+            if op == 'STORE' and is_name(ins.dst):
+                if is_temp(ins.dst):
+                    vt.clobber_memory()  # escritura indirecta
+                else:
+                    v = vt.value(ins.a)
+                    if isinstance(v, tuple):
+                        v = vt.fresh()
+                    elif vt.of.get(ins.dst) == v:
+                        changed = True  # la variable ya tiene ese valor
+                        continue
+                    vt.assign(ins.dst, v)
+                out.append(ins)
+                continue
+            if op in ('SETPROP', 'CALL'):
+                vt.clobber_memory()
+            if op == 'CALL':
+                vt.clobber_variables()
+            for x in defs_uses(ins)[0]:
+                vt.assign(x, n if n is not None and not isinstance(n, tuple) else vt.fresh())
+            out.append(ins)
+        if changed:
+            b.instrs = out
+            changed_any = True
+    return changed_any
+
+
+# ---------- Código muerto ----------
+def dead_code_elimination(unit: FunctionCFG, stats: PassStats) -> bool:
+    changed_any = False
+    reachable = set(unit.reverse_postorder())
+    for b in [b for b in unit.blocks if b not in reachable]:
+        keep = [ins for ins in b.instrs if ins.op == 'LABEL']
+        if len(keep) != len(b.instrs):
+            b.instrs = keep
+            unit.rebuild_block(b)
+            changed_any = True
+
+    res = liveness(unit)
+    u = res.universe
+    variables = u.mask(x for x in u.items if not is_temp(x))
+    for b in unit.blocks:
+        live = res.out[b]
+        kept: List[Instr] = []
+        for ins in reversed(b.instrs):
+            d, us = defs_uses(ins)
+            removable = ins.op in PURE_OPS or (ins.op == 'STORE' and is_name(ins.dst)
+                                               and not is_temp(ins.dst))
+            if removable and d and not any(live & u.bit(x) for x in d):
+                continue
+            for x in d:
+                live &= ~u.bit(x)
+            for x in us:
+                live |= u.bit(x)
+            if ins.op == 'CALL':
+                live |= variables
+            kept.append(ins)
+        if len(kept) != len(b.instrs):
+            kept.reverse()
+            b.instrs = kept
+            changed_any = True
+    return changed_any
+
+
+PASS_FUNCTIONS = {
+    'constprop': constant_propagation,
+    'copyprop': copy_propagation,
+    'lvn': local_value_numbering,
+    'licm': loop_invariant_code_motion,
+    'ivs': induction_variables,
+    'strength': strength_reduction,
+    'dce': dead_code_elimination,
+}
+
+
+def _size(unit: FunctionCFG) -> int:
+    return sum(len(b.instrs) for b in unit.blocks)
+
+
+def check_passes(names: Iterable[str]) -> List[str]:
+    """Los nombres de pase pedidos, o ValueError si alguno no existe."""
+    names = list(names)
+    unknown = [p for p in names if p not in PASS_FUNCTIONS]
+    if unknown:
+        raise ValueError(f"pases desconocidos: {', '.join(unknown)} (disponibles: {', '.join(PASSES)})")
+    return names
+
+
+class Optimizer:
+    """Pipeline de pases escalares; `passes` elige cuáles corren (en el orden de PASSES)."""
+
+    def __init__(self, passes: Optional[Iterable[str]] = None, max_rounds: int = 8):
+        chosen = PASSES if passes is None else check_passes(passes)
+        self.passes = [p for p in PASSES if p in chosen]
+        self.max_rounds = max_rounds
+
+    def run(self, instrs: Iterable[Instr]) -> Tuple[List[Instr], OptimizationReport]:
+        instrs = list(instrs)
+        report = OptimizationReport(self.passes)
+        report.before = len(instrs)
+        cfg = ProgramCFG(instrs)
+        for unit in cfg:
+            for rnd in range(1, self.max_rounds + 1):
+                changed = False
+                for name in self.passes:
+                    stats = report.passes[name]
+                    size = _size(unit)
+                    changed |= PASS_FUNCTIONS[name](unit, stats)
+                    stats.runs += 1
+                    delta = size - _size(unit)
+                    stats.removed += max(delta, 0)
+                    stats.added += max(-delta, 0)
+                report.rounds = max(report.rounds, rnd)
+                if not changed:
+                    break
+        out = cfg.instructions()
+        report.after = len(out)
+        return out, report
+
+
+def optimize(instrs: Iterable[Instr], passes: Optional[Iterable[str]] = None,
+             max_rounds: int = 8) -> Tuple[List[Instr], OptimizationReport]:
+    return Optimizer(passes, max_rounds).run(instrs)
@@ -0,0 +1,275 @@
+"""
+Optimización peephole sobre las líneas de .text que emite codegen/mips_backend.py.
+
+Las reglas son declarativas: una ventana de líneas con variables `{x}` y su reemplazo.
+Una variable captura un operando (o una etiqueta) y, si se repite, tiene que valer lo
+mismo en toda la ventana; `{*x}` captura una instrucción entera que no sea etiqueta. La
+condición opcional `when` recibe las variables y devuelve None para descartar la regla o
+un dict con variables calculadas para el reemplazo.
+
+El pase es de ventana deslizante sobre el final del buffer: cada línea nueva se agrega y
+se prueban las reglas cuya ventana termina en ella, repitiendo mientras alguna aplique
+(el reemplazo puede habilitar otra regla más atrás). Lo que queda a más de unas cuantas
+ventanas del final ya no puede cambiar y se entrega a la salida, así que funciona igual
+con el backend en modo streaming.
+
+Las reglas que pliegan un `li` en la instrucción siguiente usan que los scratch del
+backend ($t7-$t9, ver codegen/regalloc.py) solo viven desde que se cargan hasta la
+siguiente instrucción que los lee.
+"""
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from codegen.regalloc import SCRATCH
+
+_VAR = re.compile(r"\{(\*?)(\w+)\}")
+
+
+def _int(x: str) -> Optional[int]:
+    try:
+        return int(x, 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _imm16(x: str) -> bool:
+    v = _int(x)
+    return v is not None and -32768 <= v <= 32767
+
+
+def _log2(x: str) -> Optional[int]:
+    v = _int(x)
+    return v.bit_length() - 1 if v is not None and v > 0 and v & (v - 1) == 0 else None
+
+
+def _compile(pattern: List[str]):
+    """Regex de la ventana completa; una variable repetida es una backreference."""
+    seen = set()
+    lines = []
+    for p in pattern:
+        out, pos = [], 0
+        for m in _VAR.finditer(p):
+            out.append(re.escape(p[pos:m.start()]))
+            star, name = m.groups()
+            if name in seen:
+                out.append(f"(?P={name})")
+            else:
+                seen.add(name)
+                out.append(f"(?P<{name}>[^:\\n]+)" if star else f"(?P<{name}>[^,\\s]+)")
+            pos = m.end()
+        out.append(re.escape(p[pos:]))
+        lines.append(''.join(out))
+    return re.compile('\n'.join(lines) + r'\Z')
+
+
+class Rule:
+    def __init__(self, name: str, pattern: List[str], replacement: List[str],
+                 when: Optional[Callable[[Dict[str, str]], Optional[Dict[str, str]]]] = None):
+        self.name = name
+        self.pattern = pattern
+        self.replacement = replacement
+        self.when = when
+        self.size = len(pattern)
+        self.regex = _compile(pattern)
+        last = pattern[-1]
+        self.key = ':' if last.endswith(':') else ('*' if last.startswith('{*') else last.split()[0])
+
+    def apply(self, window: List[str]) -> Optional[List[str]]:
+        m = self.regex.match('\n'.join(window))
+        if m is None:
+            return None
+        env = m.groupdict()
+        if self.when is not None:
+            extra = self.when(env)
+            if extra is None:
+                return None
+            env.update(extra)
+        return [_VAR.sub(lambda v: env[v.group(2)], r) for r in self.replacement]
+
+
+def _scratch(*names):
+    """Condición: las variables dadas son registros scratch del backend."""
+    def check(env):
+        return {} if all(env[n] in SCRATCH for n in names) else None
+    return check
+
+
+def _fold_imm(negate: bool = False):
+    """`li $tS, c` + `op d, s, $tS` -> forma inmediata (c de 16 bits, s distinto del scratch)."""
+    def check(env):
+        if env['t'] not in SCRATCH or env['s'] == env['t']:
+            return None
+        c = _int(env['c'])
+        if c is None or not _imm16(str(-c if negate else c)):
+            return None
+        return {'c': str(-c if negate else c)}
+    return check
+
+
+def _pow2_scratch(env):
+    if env['t'] not in SCRATCH or env['s'] == env['t']:
+        return None
+    k = _log2(env['c'])
+    return None if k is None else {'k': str(k)}
+
+
+def _pow2(env):
+    k = _log2(env['c'])
+    return None if k is None else {'k': str(k)}
+
+
+def _base_differs(env):
+    # lw r, off(r) cambia la dirección: el sw siguiente ya no escribe en el mismo lugar
+    return None if f"({env['r']})" in env['m'] else {}
+
+
+def _distinct(a, b):
+    def check(env):
+        return None if env[a] == env[b] else {}
+    return check
+
+
+def _li_shift(env):
+    c, k = _int(env['c']), _int(env['k'])
+    if c is None or k is None:
+        return None
+    v = (c << k) & 0xFFFFFFFF
+    return {'v': str(v - (1 << 32) if v & 0x80000000 else v)}
+
+
+INVERSE_BRANCH = {'beq': 'bne', 'bne': 'beq', 'blt': 'bge', 'bge': 'blt', 'ble': 'bgt', 'bgt': 'ble'}
+
+RULES = (
+    # movimientos y sumas que no hacen nada
+    Rule('self-move', ['move {r}, {r}'], []),
+    Rule('add-zero', ['addi {r}, {r}, 0'], []),
+    Rule('addi-move', ['addi {d}, {s}, 0'], ['move {d}, {s}']),
+    # memoria: leer lo que se acaba de escribir (o escribir lo que se acaba de leer)
+    Rule('store-load', ['sw {r}, {m}', 'lw {r}, {m}'], ['sw {r}, {m}']),
+    Rule('store-forward', ['sw {r}, {m}', 'lw {d}, {m}'], ['sw {r}, {m}', 'move {d}, {r}']),
+    Rule('load-store', ['lw {r}, {m}', 'sw {r}, {m}'], ['lw {r}, {m}'], when=_base_differs),
+    # un scratch que solo sirve de puente
+    Rule('li-move', ['li {t}, {c}', 'move {d}, {t}'], ['li {d}, {c}'], when=_scratch('t')),
+    Rule('move-move', ['move {t}, {s}', 'move {d}, {t}'], ['move {d}, {s}'], when=_scratch('t')),
+    # inmediatos cargados en un scratch -> forma inmediata de la instrucción
+    Rule('imm-add', ['li {t}, {c}', 'add {d}, {s}, {t}'], ['addi {d}, {s}, {c}'], when=_fold_imm()),
+    Rule('imm-add-swap', ['li {t}, {c}', 'add {d}, {t}, {s}'], ['addi {d}, {s}, {c}'], when=_fold_imm()),
+    Rule('imm-sub', ['li {t}, {c}', 'sub {d}, {s}, {t}'], ['addi {d}, {s}, {c}'],
+         when=_fold_imm(negate=True)),
+    Rule('imm-slt', ['li {t}, {c}', 'slt {d}, {s}, {t}'], ['slti {d}, {s}, {c}'], when=_fold_imm()),
+    # multiplicar por una potencia de dos (índices de arreglos) -> corrimiento
+    Rule('mul-pow2', ['li {t}, {c}', 'mul {d}, {s}, {t}'], ['sll {d}, {s}, {k}'], when=_pow2_scratch),
+    Rule('mul-pow2-swap', ['li {t}, {c}', 'mul {d}, {t}, {s}'], ['sll {d}, {s}, {k}'],
+         when=_pow2_scratch),
+    Rule('mul-imm-pow2', ['mul {d}, {s}, {c}'], ['sll {d}, {s}, {k}'], when=_pow2),
+    Rule('li-shift', ['li {r}, {c}', 'sll {r}, {r}, {k}'], ['li {r}, {v}'], when=_li_shift),
+    # saltos
+    Rule('jump-next', ['j {L}', '{L}:'], ['{L}:']),
+    Rule('jump-next-label', ['j {L}', '{M}:', '{L}:'], ['{M}:', '{L}:'], when=_distinct('L', 'M')),
+    *(Rule(f'branch-over-jump-{op}', [f'{op} {{a}}, {{b}}, {{A}}', 'j {B}', '{A}:'],
+           [f'{inverse} {{a}}, {{b}}, {{B}}', '{A}:']) for op, inverse in INVERSE_BRANCH.items()),
+    Rule('dead-after-jump', ['j {L}', '{*x}'], ['j {L}']),
+)
+
+
+def _normalize(line: str) -> str:
+    return line.split('#', 1)[0].strip()
+
+
+def _is_label(text: str) -> bool:
+    return text.endswith(':') and ' ' not in text
+
+
+class Peephole:
+    """Filtro de líneas: `push` cada línea de .text y `flush` al final; las líneas
+    optimizadas salen por `out`. Lleva la cuenta de aplicaciones por regla."""
+
+    def __init__(self, out: Optional[Callable[[str], None]] = None, rules: Iterable[Rule] = RULES):
+        self.rules = list(rules)
+        self.out = out
+        self.hits: Dict[str, int] = {r.name: 0 for r in self.rules}
+        self.before = 0
+        self.after = 0
+        self._by_key: Dict[str, List[Rule]] = {}
+        for r in self.rules:
+            self._by_key.setdefault(r.key, []).append(r)
+        self._window = max((r.size for r in self.rules), default=1)
+        # (texto normalizado, línea original) de lo que todavía puede cambiar
+        self._buf: List[Tuple[str, str]] = []
+
+    def _candidates(self, text: str) -> List[Rule]:
+        if _is_label(text):
+            return self._by_key.get(':', [])
+        rules = self._by_key.get(text.split(' ', 1)[0], [])
+        wild = self._by_key.get('*')
+        return rules + wild if wild else rules
+
+    def _reduce(self) -> None:
+        buf = self._buf
+        changed = True
+        while changed and buf:
+            changed = False
+            for rule in self._candidates(buf[-1][0]):
+                if rule.size > len(buf):
+                    continue
+                window = buf[-rule.size:]
+                new = rule.apply([t for t, _ in window])
+                if new is None:
+                    continue
+                del buf[-rule.size:]
+                self.hits[rule.name] += 1
+                # lo reemplazado vuelve a pasar por las reglas, una línea a la vez
+                for text in new:
+                    buf.append((text, text if _is_label(text) else f"    {text}"))
+                    self._reduce()
+                changed = True
+                break
+
+    def push(self, line: str) -> None:
+        text = _normalize(line)
+        if not text or text.startswith('.'):
+            # líneas vacías y directivas cortan las ventanas
+            self.flush()
+            self._emit(line)
+            return
+        self.before += 1
+        self._buf.append((text, line))
+        self._reduce()
+        limit = 4 * self._window
+        if len(self._buf) > limit:
+            for _, original in self._buf[:-limit]:
+                self._emit(original)
+                self.after += 1
+            del self._buf[:-limit]
+
+    def flush(self) -> None:
+        for _, original in self._buf:
+            self._emit(original)
+            self.after += 1
+        self._buf = []
+
+    def _emit(self, line: str) -> None:
+        if self.out is not None:
+            self.out(line)
+
+    @property
+    def removed(self) -> int:
+        return self.before - self.after
+
+    def as_dict(self) -> Dict:
+        return {'before': self.before, 'after': self.after,
+                'hits': {k: v for k, v in self.hits.items() if v}}
+
+    def __str__(self):
+        used = ', '.join(f"{k} {v}" for k, v in self.hits.items() if v) or '-'
+        return f"[Peephole] {self.before} -> {self.after} líneas de .text; reglas: {used}"
+
+
+def peephole(lines: Iterable[str], rules: Iterable[Rule] = RULES) -> Tuple[List[str], Peephole]:
+    """Aplica las reglas a una lista de líneas de .text; devuelve (líneas, estadísticas)."""
+    out: List[str] = []
+    p = Peephole(out.append, rules)
+    for line in lines:
+        p.push(line)
+    p.flush()
+    return out, p
@@ -0,0 +1,208 @@
+"""
+Asignación de registros por linear scan (Poletto y Sarkar) para los temporales del TAC.
+
+Por cada unidad del CFG (función/método o código global) se calculan intervalos de vida
+de los temporales con la liveness de codegen/dataflow.py sobre la numeración lineal de
+las instrucciones. Los intervalos que cruzan un CALL solo pueden ir a registros
+callee-saved ($s0-$s7); el resto prefiere caller-saved ($t0-$t6). $t7-$t9 quedan libres
+como scratch del backend.
+
+Si no hay registro libre se derrama el intervalo activo que termina más tarde (o el
+nuevo). Un temporal derramado vive en un slot del frame de su función (ver
+codegen/frames.py): el backend lo guarda justo después de cada definición y lo recarga
+en un scratch antes de cada uso. El código global no tiene frame; sus slots son palabras
+en .data.
+"""
+from typing import Dict, List, Optional, Set
+
+from codegen.cfg import GLOBAL, ProgramCFG, is_end_label, is_function_label
+from codegen.dataflow import defs_uses, is_temp, liveness
+from codegen.tac import Instr
+
+CALLER_SAVED = ['$t0', '$t1', '$t2', '$t3', '$t4', '$t5', '$t6']
+CALLEE_SAVED = ['$s0', '$s1', '$s2', '$s3', '$s4', '$s5', '$s6', '$s7']
+SCRATCH = ('$t7', '$t8', '$t9')
+
+
+class Interval:
+    def __init__(self, name: str, start: int):
+        self.name = name
+        self.start = start
+        self.end = start
+        self.crosses_call = False
+        self.reg: Optional[str] = None
+        self.slot: Optional[int] = None  # índice del slot si se derramó
+
+    def extend(self, pos: int) -> None:
+        if pos < self.start:
+            self.start = pos
+        if pos > self.end:
+            self.end = pos
+
+    def __repr__(self):
+        where = self.reg if self.reg else f"slot{self.slot}"
+        return f"{self.name}[{self.start},{self.end}]->{where}"
+
+
+class UnitAllocation:
+    def __init__(self, name: str, intervals: Dict[str, Interval], calls: int,
+                 dead_conditions: Optional[Set[int]] = None):
+        self.name = name
+        self.intervals = intervals
+        self.calls = calls
+        # posiciones de los IFZ cuyo temporal de condición ya no se usa después del salto
+        self.dead_conditions = dead_conditions or set()
+        used = {iv.reg for iv in intervals.values() if iv.reg}
+        self.saved = [r for r in CALLEE_SAVED if r in used]  # callee-saved a preservar
+        self.frame = None      # FrameLayout de la función; lo asigna codegen/frames.py
+        self.spill_loads = 0   # los cuenta el backend al emitir
+        self.spill_stores = 0
+
+    @property
+    def spilled(self) -> int:
+        return sum(1 for iv in self.intervals.values() if iv.reg is None)
+
+    def reg(self, temp: str) -> Optional[str]:
+        iv = self.intervals.get(temp)
+        return iv.reg if iv is not None else None
+
+    def slot(self, temp: str) -> Optional[int]:
+        iv = self.intervals.get(temp)
+        return iv.slot if iv is not None else None
+
+    def as_dict(self) -> Dict:
+        return {'unit': self.name, 'temps': len(self.intervals), 'spilled': self.spilled,
+                'spill_loads': self.spill_loads, 'spill_stores': self.spill_stores,
+                'callee_saved': list(self.saved), 'frame': self.frame.size if self.frame else None}
+
+
+class Allocation:
+    """Resultado para todo el programa: asignación por unidad y unidad de cada instrucción."""
+
+    def __init__(self, units: Dict[str, UnitAllocation], unit_of: List[str]):
+        self.units = units
+        self.unit_of = unit_of
+
+    def report(self) -> str:
+        lines = []
+        for u in self.units.values():
+            if not u.intervals:
+                continue
+            frame = f", frame {u.frame.size} bytes" if u.frame else ""
+            lines.append(f"[RegAlloc] {u.name}: {len(u.intervals)} temporales, {u.spilled} spills "
+                         f"({u.spill_loads} lw / {u.spill_stores} sw), callee-saved "
+                         f"{','.join(u.saved) or '-'}{frame}")
+        return '\n'.join(lines)
+
+
+def live_intervals(unit, dead_conditions: Optional[Set[int]] = None) -> (Dict[str, Interval], int):
+    """Intervalos de vida de los temporales de una unidad y número de CALLs.
+
+    Los operandos de ARG se leen en el CALL siguiente (el backend junta los argumentos
+    hasta la llamada), así que su uso se extiende hasta esa posición. Si se pasa
+    `dead_conditions`, se agregan las posiciones de los IFZ que cierran un bloque con un
+    temporal de condición que no sale vivo del bloque."""
+    res = liveness(unit)
+    u = res.universe
+    temps = [(x, u.bit(x)) for x in u.items if is_temp(x)]
+    intervals: Dict[str, Interval] = {}
+    calls: List[int] = []
+
+    def touch(name: str, pos: int) -> None:
+        iv = intervals.get(name)
+        if iv is None:
+            intervals[name] = Interval(name, pos)
+        else:
+            iv.extend(pos)
+
+    pos = 0
+    for b in unit.blocks:
+        if not b.instrs:
+            continue
+        first, last = pos, pos + len(b.instrs) - 1
+        for name, bit in temps:
+            if res.in_[b] & bit:
+                touch(name, first)
+            if res.out[b] & bit:
+                touch(name, last)
+        term = b.instrs[-1]
+        if dead_conditions is not None and term.op == 'IFZ' and is_temp(term.a) \
+                and not res.out[b] & u.bit(term.a):
+            dead_conditions.add(last)
+        pending: List[str] = []
+        for ins in b.instrs:
+            d, us = defs_uses(ins)
+            if ins.op == 'ARG':
+                pending.extend(x for x in us if is_temp(x))
+            for x in us:
+                if is_temp(x):
+                    touch(x, pos)
+            if ins.op == 'CALL':
+                calls.append(pos)
+                for x in pending:
+                    touch(x, pos)
+                pending = []
+            for x in d:
+                if is_temp(x):
+                    touch(x, pos)
+            pos += 1
+    for iv in intervals.values():
+        iv.crosses_call = any(iv.start < c < iv.end for c in calls)
+    return intervals, len(calls)
+
+
+def linear_scan(intervals: Dict[str, Interval]) -> None:
+    order = sorted(intervals.values(), key=lambda iv: (iv.start, iv.end, iv.name))
+    free_t = list(CALLER_SAVED)
+    free_s = list(CALLEE_SAVED)
+    active: List[Interval] = []
+    slots = 0
+
+    def release(reg: str) -> None:
+        pool = free_s if reg in CALLEE_SAVED else free_t
+        pool.append(reg)
+        pool.sort(key=lambda r: int(r[2:]))
+
+    for iv in order:
+        for old in [a for a in active if a.end < iv.start]:
+            active.remove(old)
+            release(old.reg)
+        if not iv.crosses_call and free_t:
+            iv.reg = free_t.pop(0)
+        elif free_s:
+            iv.reg = free_s.pop(0)
+        else:
+            # sin registro libre: derramar el activo compatible que termina más tarde
+            candidates = [a for a in active if a.reg in CALLEE_SAVED or not iv.crosses_call]
+            victim = max(candidates, key=lambda a: a.end, default=None)
+            if victim is not None and victim.end > iv.end:
+                iv.reg, victim.reg = victim.reg, None
+                victim.slot, slots = slots, slots + 1
+                active.remove(victim)
+            else:
+                iv.slot, slots = slots, slots + 1
+                continue
+        active.append(iv)
+
+
+def allocate(instrs: List[Instr]) -> Allocation:
+    instrs = list(instrs)
+    cfg = ProgramCFG(instrs)
+    units: Dict[str, UnitAllocation] = {}
+    for unit in cfg:
+        dead_conditions: Set[int] = set()
+        intervals, calls = live_intervals(unit, dead_conditions)
+        linear_scan(intervals)
+        units[unit.name] = UnitAllocation(unit.name, intervals, calls, dead_conditions)
+    # misma partición en unidades que ProgramCFG, instrucción por instrucción
+    unit_of: List[str] = []
+    stack = [GLOBAL]
+    for ins in instrs:
+        if is_function_label(ins):
+            stack.append(ins.dst)
+            unit_of.append(ins.dst)
+        elif is_end_label(ins) and len(stack) > 1:
+            unit_of.append(stack.pop())
+        else:
+            unit_of.append(stack[-1])
+    return Allocation(units, unit_of)
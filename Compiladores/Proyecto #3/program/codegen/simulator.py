@@ -0,0 +1,572 @@
+"""
+Simulador MIPS32 en Python puro para el código que emite codegen/mips_backend.py.
+
+Cubre el subconjunto que usa el backend (y un poco más): aritmética y lógica con
+registros o inmediatos, mul/div/mflo, comparaciones `seq/sne/slt/sle/sgt/sge`, lw/sw
+(con `off($reg)` o etiqueta), saltos condicionales, j/jal/jr, las pseudo `li/la/move`, y
+los syscalls 1 (entero), 4 (string), 11 (carácter), 10 y 17 (salida). Las directivas de
+.data son .word (números o etiquetas), .asciiz, .ascii, .space y .align.
+
+Como en SPIM la ejecución empieza en `main` si existe (con $ra apuntando a una dirección
+de salida) y si no en la primera instrucción de .text; termina con el syscall de salida,
+al volver de main o al caer del final del .text.
+
+Cada instrucción se decodifica una vez a una clausura y en la ejecución solo se cuenta
+cuántas veces corrió cada una; al final se agregan las cuentas por opcode, por etiqueta
+(la más cercana hacia arriba) y por función (func_*/method_*/main y todo lo que sigue
+hasta la próxima; lo previo es 'global'). Además de las instrucciones escritas se
+estiman las instrucciones reales (expandiendo las pseudo como lo hace MARS) y los ciclos
+con un modelo simple: un ciclo por instrucción real más la latencia de mul y div.
+
+    python codegen/simulator.py programa.s [--counts] [--max-steps N]
+"""
+import re
+import sys
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+TEXT_BASE = 0x00400000
+DATA_BASE = 0x10010000
+STACK_TOP = 0x7FFFEFFC
+GP = 0x10008000
+EXIT_ADDR = 0x00000004  # $ra inicial: volver de main termina el programa
+
+REG_NAMES = ['zero', 'at', 'v0', 'v1', 'a0', 'a1', 'a2', 'a3',
+             't0', 't1', 't2', 't3', 't4', 't5', 't6', 't7',
+             's0', 's1', 's2', 's3', 's4', 's5', 's6', 's7',
+             't8', 't9', 'k0', 'k1', 'gp', 'sp', 'fp', 'ra']
+REGS = {f"${n}": i for i, n in enumerate(REG_NAMES)}
+REGS.update({f"${i}": i for i in range(32)})
+REGS['$s8'] = 30
+
+# instrucciones reales en que MARS expande cada pseudo (las que dependen de los
+# operandos, como li o lw con etiqueta, se calculan al decodificar)
+EXPANSION = {'seq': 3, 'sne': 3, 'sle': 3, 'sge': 3, 'blt': 2, 'ble': 2, 'bgt': 2, 'bge': 2,
+             'la': 2, 'rem': 2, 'neg': 1, 'not': 1, 'move': 1, 'b': 1, 'beqz': 1, 'bnez': 1}
+# operaciones que tienen forma con inmediato de 16 bits (addi, andi, slti, sll, ...)
+NATIVE_IMMEDIATE = {'add', 'addu', 'addi', 'addiu', 'sub', 'subu', 'and', 'andi', 'or', 'ori',
+                    'xor', 'xori', 'slt', 'slti', 'sltiu', 'sll', 'srl', 'sra'}
+# ciclos extra por latencia del multiplicador/divisor (aproximación tipo R3000)
+LATENCY = {'mul': 11, 'mult': 11, 'div': 34, 'rem': 34}
+
+_MEM_OPERAND = re.compile(r"^(-?\d*)\((\$\w+)\)$")
+_INT = re.compile(r"^-?(0x[0-9a-fA-F]+|\d+)$")
+
+
+class SimulationError(Exception):
+    pass
+
+
+def wrap(x: int) -> int:
+    """Entero con signo de 32 bits."""
+    return ((x + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+def _strip_comment(line: str) -> str:
+    out, quoted = [], False
+    for i, ch in enumerate(line):
+        if ch == '"' and (i == 0 or line[i - 1] != '\\'):
+            quoted = not quoted
+        elif ch == '#' and not quoted:
+            break
+        out.append(ch)
+    return ''.join(out).strip()
+
+
+def _split_operands(rest: str) -> List[str]:
+    return [x.strip() for x in rest.split(',')] if rest.strip() else []
+
+
+def _unescape(s: str) -> str:
+    return s.encode('utf-8').decode('unicode_escape')
+
+
+class Program:
+    """Un .s ensamblado: instrucciones de .text, etiquetas y memoria inicial de .data."""
+
+    def __init__(self, source: str):
+        self.instrs: List[Tuple[str, List[str], int]] = []  # (opcode, operandos, línea)
+        self.text_labels: Dict[str, int] = {}
+        self.data_labels: Dict[str, int] = {}
+        self.memory: Dict[int, int] = {}  # dirección de palabra -> valor con signo
+        self.label_of: List[str] = []     # etiqueta que encabeza cada instrucción
+        self.function_of: List[str] = []
+        self._parse(source)
+
+    # -- memoria de bytes sobre palabras (little-endian) --
+    def store_byte(self, addr: int, value: int) -> None:
+        word = addr & ~3
+        shift = 8 * (addr & 3)
+        old = self.memory.get(word, 0) & 0xFFFFFFFF
+        new = (old & ~(0xFF << shift)) | ((value & 0xFF) << shift)
+        self.memory[word] = wrap(new)
+
+    def _parse(self, source: str) -> None:
+        section = 'text'
+        addr = DATA_BASE
+        pending_words: List[Tuple[int, str]] = []
+        fresh: List[str] = []  # etiquetas de .data que todavía no tienen contenido
+        label, function = None, 'global'
+        for lineno, raw in enumerate(source.splitlines(), 1):
+            line = _strip_comment(raw)
+            while line:
+                m = re.match(r"^([A-Za-z_.$][\w.$]*)\s*:\s*", line)
+                if not m:
+                    break
+                name = m.group(1)
+                line = line[m.end():]
+                if section == 'data':
+                    self.data_labels[name] = addr
+                    fresh.append(name)
+                    continue
+                self.text_labels[name] = len(self.instrs)
+                label = name
+                if (name == 'main' or name.startswith(('func_', 'method_'))) and not name.endswith('_end'):
+                    function = name
+            if not line:
+                continue
+            if line.startswith('.'):
+                directive, _, rest = line.partition(' ')
+                rest = rest.strip()
+                if directive == '.data':
+                    section = 'data'
+                elif directive == '.text':
+                    section = 'text'
+                elif directive in ('.globl', '.global', '.extern'):
+                    pass
+                elif section != 'data':
+                    raise SimulationError(f"línea {lineno}: directiva {directive} fuera de .data")
+                elif directive == '.word':
+                    addr = (addr + 3) & ~3
+                    for name in fresh:  # como SPIM, la etiqueta sigue a la alineación
+                        self.data_labels[name] = addr
+                    for item in _split_operands(rest):
+                        if _INT.match(item):
+                            self.memory[addr] = wrap(int(item, 0))
+                        else:
+                            pending_words.append((addr, item))
+                        addr += 4
+                elif directive in ('.asciiz', '.ascii'):
+                    text = _unescape(rest[rest.index('"') + 1:rest.rindex('"')])
+                    data = text.encode('latin-1') + (b'\0' if directive == '.asciiz' else b'')
+                    for b in data:
+                        self.store_byte(addr, b)
+                        addr += 1
+                elif directive == '.space':
+                    addr += int(rest, 0)
+                elif directive == '.align':
+                    k = 1 << int(rest, 0)
+                    addr = (addr + k - 1) & ~(k - 1)
+                else:
+                    raise SimulationError(f"línea {lineno}: directiva no soportada {directive}")
+                fresh = []
+                continue
+            if section != 'text':
+                raise SimulationError(f"línea {lineno}: instrucción en .data: {line}")
+            op, _, rest = line.partition(' ')
+            self.instrs.append((op, _split_operands(rest), lineno))
+            self.label_of.append(label or 'global')
+            self.function_of.append(function)
+        for waddr, name in pending_words:
+            if name not in self.data_labels and name not in self.text_labels:
+                raise SimulationError(f".word con etiqueta desconocida: {name}")
+            self.memory[waddr] = self.address_of(name)
+
+    def address_of(self, label: str) -> int:
+        if label in self.data_labels:
+            return self.data_labels[label]
+        if label in self.text_labels:
+            return TEXT_BASE + 4 * self.text_labels[label]
+        raise SimulationError(f"etiqueta desconocida: {label}")
+
+
+class SimResult:
+    """Salida del programa y contadores dinámicos de una ejecución."""
+
+    def __init__(self, program: Program, counts: List[int], output: str, exit_code: int,
+                 registers: List[int], machine: List[int], cycles: List[int],
+                 memory: Optional[Dict[int, int]] = None):
+        self.output = output
+        self.exit_code = exit_code
+        self.registers = registers
+        self.memory = memory or {}
+        self.data_labels = program.data_labels
+        self.counts = counts
+        self.steps = sum(counts)
+        self.by_opcode: Counter = Counter()
+        self.by_label: Counter = Counter()
+        self.by_function: Counter = Counter()
+        self.machine = 0
+        self.cycles = 0
+        for i, n in enumerate(counts):
+            if not n:
+                continue
+            self.by_opcode[program.instrs[i][0]] += n
+            self.by_label[program.label_of[i]] += n
+            self.by_function[program.function_of[i]] += n
+            self.machine += n * machine[i]
+            self.cycles += n * cycles[i]
+
+    def reg(self, name: str) -> int:
+        return self.registers[REGS[name]]
+
+    def word(self, label: str) -> int:
+        """Palabra final en la etiqueta `label` de .data."""
+        return self.memory.get(self.data_labels[label], 0)
+
+    def as_dict(self) -> Dict:
+        return {'steps': self.steps, 'machine': self.machine, 'cycles': self.cycles,
+                'exit_code': self.exit_code, 'output': self.output,
+                'by_opcode': dict(self.by_opcode), 'by_label': dict(self.by_label),
+                'by_function': dict(self.by_function)}
+
+    def report(self, top: int = 10) -> str:
+        lines = [f"[Sim] {self.steps} instrucciones ({self.machine} reales, {self.cycles} ciclos)"]
+        for title, counter in (('función', self.by_function), ('etiqueta', self.by_label),
+                               ('opcode', self.by_opcode)):
+            items = ', '.join(f"{k} {v}" for k, v in counter.most_common(top))
+            lines.append(f"[Sim] por {title}: {items}")
+        return '\n'.join(lines)
+
+
+class Simulator:
+    def __init__(self, program: Program, max_steps: int = 10_000_000, entry: Optional[str] = None):
+        self.program = program
+        self.max_steps = max_steps
+        entry = entry or 'main'
+        if entry not in program.text_labels:
+            raise SimulationError(f"no existe la etiqueta de entrada '{entry}'")
+        self.entry = program.text_labels[entry]
+        self.regs = [0] * 32
+        self.regs[REGS['$sp']] = STACK_TOP
+        self.regs[REGS['$gp']] = GP
+        self.regs[REGS['$ra']] = EXIT_ADDR
+        self.hi = self.lo = 0
+        self.memory = dict(program.memory)
+        self.out: List[str] = []
+        self.exit_code = 0
+        self.machine: List[int] = []
+        self.cycles: List[int] = []
+        self.code: List[Callable[[int], int]] = [self._decode(i, op, args)
+                                                 for i, (op, args, _) in enumerate(program.instrs)]
+
+    # ---------- operandos ----------
+    def _reg(self, x: str, where: str) -> int:
+        r = REGS.get(x)
+        if r is None:
+            raise SimulationError(f"{where}: registro inválido {x}")
+        return r
+
+    def _target(self, label: str, where: str) -> int:
+        idx = self.program.text_labels.get(label)
+        if idx is None:
+            raise SimulationError(f"{where}: etiqueta desconocida {label}")
+        return idx
+
+    def _addr_operand(self, x: str, where: str) -> Tuple[int, int, bool]:
+        """(registro base, offset, es_etiqueta) de `off($r)` o `etiqueta`."""
+        m = _MEM_OPERAND.match(x)
+        if m:
+            return self._reg(m.group(2), where), int(m.group(1) or 0), False
+        return 0, self.program.address_of(x), True
+
+    # ---------- memoria ----------
+    def load_word(self, addr: int) -> int:
+        if addr & 3:
+            raise SimulationError(f"lw desalineado en 0x{addr:08x}")
+        return self.memory.get(addr, 0)
+
+    def store_word(self, addr: int, value: int) -> None:
+        if addr & 3:
+            raise SimulationError(f"sw desalineado en 0x{addr:08x}")
+        self.memory[addr] = value
+
+    def load_byte(self, addr: int) -> int:
+        return (self.memory.get(addr & ~3, 0) >> (8 * (addr & 3))) & 0xFF
+
+    def read_string(self, addr: int) -> str:
+        chars = []
+        while True:
+            b = self.load_byte(addr)
+            if b == 0:
+                return ''.join(chars)
+            chars.append(chr(b))
+            addr += 1
+            if len(chars) > 1 << 20:
+                raise SimulationError('string sin terminador')
+
+    # ---------- decodificación ----------
+    def _decode(self, i: int, op: str, args: List[str]) -> Callable[[int], int]:
+        where = f"línea {self.program.instrs[i][2]} ({op})"
+        regs = self.regs
+        machine = EXPANSION.get(op, 1)
+        fn = None
+
+        def r(k):
+            return self._reg(args[k], where)
+
+        def is_imm(k):
+            return k < len(args) and _INT.match(args[k]) is not None
+
+        def binary(f):
+            d, s = r(0), r(1)
+            if is_imm(2):
+                imm = int(args[2], 0)
+
+                def run(pc):
+                    if d:
+                        regs[d] = wrap(f(regs[s], imm))
+                    return pc + 1
+                # con forma inmediata nativa es una instrucción; si no, el inmediato se
+                # carga antes en $at (con lui/ori si no entra en 16 bits)
+                fits = -32768 <= imm <= 65535
+                return run, (0 if op in NATIVE_IMMEDIATE and fits else 1 + (not fits))
+            t = r(2)
+
+            def run(pc):
+                if d:
+                    regs[d] = wrap(f(regs[s], regs[t]))
+                return pc + 1
+            return run, 0
+
+        alu = {
+            'add': lambda a, b: a + b, 'addu': lambda a, b: a + b, 'addi': lambda a, b: a + b,
+            'addiu': lambda a, b: a + b, 'sub': lambda a, b: a - b, 'subu': lambda a, b: a - b,
+            'mul': lambda a, b: a * b, 'and': lambda a, b: a & b, 'andi': lambda a, b: a & b,
+            'or': lambda a, b: a | b, 'ori': lambda a, b: a | b, 'xor': lambda a, b: a ^ b,
+            'xori': lambda a, b: a ^ b, 'nor': lambda a, b: ~(a | b),
+            'sll': lambda a, b: a << (b & 31), 'sllv': lambda a, b: a << (b & 31),
+            'srl': lambda a, b: (a & 0xFFFFFFFF) >> (b & 31), 'srlv': lambda a, b: (a & 0xFFFFFFFF) >> (b & 31),
+            'sra': lambda a, b: a >> (b & 31), 'srav': lambda a, b: a >> (b & 31),
+            'seq': lambda a, b: int(a == b), 'sne': lambda a, b: int(a != b),
+            'slt': lambda a, b: int(a < b), 'slti': lambda a, b: int(a < b),
+            'sle': lambda a, b: int(a <= b), 'sgt': lambda a, b: int(a > b),
+            'sge': lambda a, b: int(a >= b),
+            'sltu': lambda a, b: int((a & 0xFFFFFFFF) < (b & 0xFFFFFFFF)),
+            'sltiu': lambda a, b: int((a & 0xFFFFFFFF) < (b & 0xFFFFFFFF)),
+        }
+        branches = {
+            'beq': lambda a, b: a == b, 'bne': lambda a, b: a != b, 'blt': lambda a, b: a < b,
+            'ble': lambda a, b: a <= b, 'bgt': lambda a, b: a > b, 'bge': lambda a, b: a >= b,
+        }
+
+        if op in alu and len(args) == 3:
+            fn, extra = binary(alu[op])
+            machine += extra
+        elif op in ('div', 'rem') and len(args) == 3:
+            d, s = r(0), r(1)
+            t_imm = int(args[2], 0) if is_imm(2) else None
+            t = None if t_imm is not None else r(2)
+            keep_rem = op == 'rem'
+
+            def fn(pc):
+                a, b = regs[s], (t_imm if t is None else regs[t])
+                if b == 0:
+                    raise SimulationError(f"{where}: división por cero")
+                q = wrap(int(a / b))
+                if d:
+                    regs[d] = wrap(a - q * b) if keep_rem else q
+                return pc + 1
+            machine = 2 + (t_imm is not None)
+        elif op in ('div', 'mult') and len(args) == 2:
+            s, t = r(0), r(1)
+            is_div = op == 'div'
+
+            def fn(pc):
+                a, b = regs[s], regs[t]
+                if is_div:
+                    if b == 0:
+                        raise SimulationError(f"{where}: división por cero")
+                    q = int(a / b)
+                    self.lo, self.hi = wrap(q), wrap(a - q * b)
+                else:
+                    p = a * b
+                    self.lo, self.hi = wrap(p), wrap(p >> 32)
+                return pc + 1
+        elif op in ('mflo', 'mfhi'):
+            d = r(0)
+            low = op == 'mflo'
+
+            def fn(pc):
+                if d:
+                    regs[d] = self.lo if low else self.hi
+                return pc + 1
+        elif op in ('li', 'lui'):
+            d, imm = r(0), int(args[1], 0)
+            value = wrap(imm << 16) if op == 'lui' else wrap(imm)
+            if op == 'li':
+                machine = 1 if -32768 <= imm <= 65535 else 2
+
+            def fn(pc):
+                if d:
+                    regs[d] = value
+                return pc + 1
+        elif op == 'la':
+            d = r(0)
+            base, off, is_label = self._addr_operand(args[1], where)
+
+            def fn(pc):
+                if d:
+                    regs[d] = off if is_label else wrap(regs[base] + off)
+                return pc + 1
+        elif op in ('move', 'neg', 'not'):
+            d, s = r(0), r(1)
+            f = {'move': lambda a: a, 'neg': lambda a: -a, 'not': lambda a: ~a}[op]
+
+            def fn(pc):
+                if d:
+                    regs[d] = wrap(f(regs[s]))
+                return pc + 1
+        elif op in ('lw', 'sw', 'lb', 'lbu', 'sb'):
+            t = r(0)
+            base, off, is_label = self._addr_operand(args[1], where)
+            if is_label:
+                machine = 2
+            if op == 'lw':
+                def fn(pc):
+                    v = self.load_word(regs[base] + off)
+                    if t:
+                        regs[t] = v
+                    return pc + 1
+            elif op == 'sw':
+                def fn(pc):
+                    self.store_word(regs[base] + off, regs[t])
+                    return pc + 1
+            elif op == 'sb':
+                def fn(pc):
+                    addr = regs[base] + off
+                    word = addr & ~3
+                    shift = 8 * (addr & 3)
+                    old = self.memory.get(word, 0) & 0xFFFFFFFF
+                    self.memory[word] = wrap((old & ~(0xFF << shift)) | ((regs[t] & 0xFF) << shift))
+                    return pc + 1
+            else:
+                signed = op == 'lb'
+
+                def fn(pc):
+                    v = self.load_byte(regs[base] + off)
+                    if t:
+                        regs[t] = v - 256 if signed and v > 127 else v
+                    return pc + 1
+        elif op in branches:
+            s = r(0)
+            t_imm = int(args[1], 0) if is_imm(1) else None
+            t = None if t_imm is not None else r(1)
+            target = self._target(args[2], where)
+            cond = branches[op]
+            if t_imm is not None:
+                machine += 1
+
+            def fn(pc):
+                return target if cond(regs[s], t_imm if t is None else regs[t]) else pc + 1
+        elif op in ('beqz', 'bnez'):
+            s, target = r(0), self._target(args[1], where)
+            zero = op == 'beqz'
+
+            def fn(pc):
+                return target if (regs[s] == 0) == zero else pc + 1
+        elif op in ('j', 'b'):
+            target = self._target(args[0], where)
+
+            def fn(pc):
+                return target
+        elif op == 'jal':
+            target = self._target(args[0], where)
+
+            def fn(pc):
+                regs[31] = TEXT_BASE + 4 * (pc + 1)
+                return target
+        elif op in ('jr', 'jalr'):
+            s = r(0)
+            link = op == 'jalr'
+
+            def fn(pc):
+                addr = regs[s]
+                if link:
+                    regs[31] = TEXT_BASE + 4 * (pc + 1)
+                return self._jump(addr, where)
+        elif op == 'syscall':
+            fn = self._syscall
+        elif op == 'nop':
+            def fn(pc):
+                return pc + 1
+        if fn is None:
+            raise SimulationError(f"{where}: instrucción no soportada {op} {', '.join(args)}")
+        self.machine.append(machine)
+        self.cycles.append(machine + LATENCY.get(op, 0))
+        return fn
+
+    def _jump(self, addr: int, where: str) -> int:
+        if addr == EXIT_ADDR:
+            return -1
+        idx, rem = divmod(addr - TEXT_BASE, 4)
+        if rem or not 0 <= idx <= len(self.code):
+            raise SimulationError(f"{where}: salto a una dirección inválida 0x{addr & 0xFFFFFFFF:08x}")
+        return idx
+
+    def _syscall(self, pc: int) -> int:
+        regs = self.regs
+        service = regs[2]
+        if service == 1:
+            self.out.append(str(regs[4]))
+        elif service == 4:
+            self.out.append(self.read_string(regs[4]))
+        elif service == 11:
+            self.out.append(chr(regs[4] & 0xFF))
+        elif service == 10:
+            return -1
+        elif service == 17:
+            self.exit_code = regs[4]
+            return -1
+        else:
+            raise SimulationError(f"syscall no soportado: {service}")
+        return pc + 1
+
+    def run(self) -> SimResult:
+        code = self.code
+        n = len(code)
+        counts = [0] * n
+        pc = self.entry
+        steps = 0
+        limit = self.max_steps
+        while 0 <= pc < n:
+            counts[pc] += 1
+            steps += 1
+            if steps > limit:
+                raise SimulationError(f"se superó el límite de {limit} instrucciones")
+            pc = code[pc](pc)
+        return SimResult(self.program, counts, ''.join(self.out), self.exit_code, list(self.regs),
+                         self.machine, self.cycles, self.memory)
+
+
+def run_text(source: str, max_steps: int = 10_000_000, entry: Optional[str] = None) -> SimResult:
+    return Simulator(Program(source), max_steps=max_steps, entry=entry).run()
+
+
+def run_file(path: str, **kwargs) -> SimResult:
+    with open(path, encoding='utf-8') as f:
+        return run_text(f.read(), **kwargs)
+
+
+def main(argv=None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description='Simula un .s generado por el compilador.')
+    ap.add_argument('path')
+    ap.add_argument('--counts', action='store_true', help='mostrar los contadores dinámicos')
+    ap.add_argument('--max-steps', type=int, default=10_000_000)
+    args = ap.parse_args(argv)
+    try:
+        result = run_file(args.path, max_steps=args.max_steps)
+    except SimulationError as e:
+        print(f"[Error] {e}")
+        return 1
+    sys.stdout.write(result.output)
+    if result.output and not result.output.endswith('\n'):
+        sys.stdout.write('\n')
+    if args.counts:
+        print(result.report())
+    return result.exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,32 @@
 """
 TAC (Three Address Code) emitter.
 Genera instrucciones de tres direcciones con reciclaje de temporales y etiquetas.
+
+Las instrucciones se guardan en un `InstrBuffer` compacto (struct-of-arrays): el
+opcode como entero interno y cada operando como índice a una tabla de strings
+internados. Al indexar o iterar el buffer se obtienen vistas `Instr`.
 """
-from dataclasses import dataclass
-from typing import List, Optional
+from array import array
+from typing import Dict, Iterable, List, Optional
 
 
-@dataclass
 class Instr:
-    op: str
-    dst: Optional[str] = None
-    a: Optional[str] = None
-    b: Optional[str] = None
+    __slots__ = ('op', 'dst', 'a', 'b')
+
+    def __init__(self, op: str, dst: Optional[str] = None, a: Optional[str] = None,
+                 b: Optional[str] = None):
+        self.op = op
+        self.dst = dst
+        self.a = a
+        self.b = b
+
+    def __eq__(self, other):
+        if not isinstance(other, Instr):
+            return NotImplemented
+        return (self.op, self.dst, self.a, self.b) == (other.op, other.dst, other.a, other.b)
+
+    def __repr__(self):
+        return f"Instr(op={self.op!r}, dst={self.dst!r}, a={self.a!r}, b={self.b!r})"
 
     def __str__(self):
         if self.op == "LABEL":
@@ -20,6 +35,9 @@ class Instr:
             return f"GOTO {self.dst}"
         if self.op == "IFZ":
             return f"IFZ {self.a} GOTO {self.dst}"
+        if self.op == "JUMPTABLE":
+            # JUMPTABLE índice, [L0,L1,...], default
+            return f"JUMPTABLE {self.a} {self.b} ELSE {self.dst}"
         if self.op == "ARG":
             return f"ARG {self.a}"
         if self.op == "CALL":
@@ -31,6 +49,8 @@ class Instr:
             return f"STORE {self.a} -> {self.dst}"
         if self.op == "LOAD":
             return f"{self.dst} = LOAD {self.a}"
+        if self.op == "MOV":
+            return f"{self.dst} = {self.a}"
         if self.op == "NEWOBJ":
             # NEWOBJ dst, ClassName
             return f"NEWOBJ {self.dst}, {self.a}"
@@ -49,15 +69,116 @@ class Instr:
         return f"{self.dst} = {self.op}"
 
 
+OPCODES: List[str] = [
+    'LABEL', 'GOTO', 'IFZ', 'ARG', 'CALL', 'RET', 'PRINT',
+    'LOAD', 'STORE', 'NEWOBJ', 'GETPROP', 'SETPROP', 'ALLOC',
+    'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'EQ', 'NE', 'LT', 'LE', 'GT', 'GE', 'AND', 'OR', 'NOT', 'MOV',
+    'JUMPTABLE', 'SHL',
+]
+OPCODE_IDS: Dict[str, int] = {op: i for i, op in enumerate(OPCODES)}
+
+
+def opcode_id(op: str) -> int:
+    """Entero interno del opcode; los desconocidos se registran al vuelo."""
+    i = OPCODE_IDS.get(op)
+    if i is None:
+        i = OPCODE_IDS[op] = len(OPCODES)
+        OPCODES.append(op)
+    return i
+
+
+class InstrBuffer:
+    """Secuencia compacta de instrucciones TAC.
+
+    Cada instrucción ocupa un byte de opcode y tres enteros de 32 bits (dst, a, b) que
+    apuntan a la tabla de operandos del buffer (0 = None). `buf[i]` e iterar devuelven
+    vistas `Instr` nuevas: modificarlas no cambia el buffer, para eso `buf[i] = instr`.
+    """
+    __slots__ = ('_ops', '_dst', '_a', '_b', '_operands', '_operand_ids')
+
+    def __init__(self, instrs: Iterable[Instr] = ()):
+        self._ops = array('B')
+        self._dst = array('I')
+        self._a = array('I')
+        self._b = array('I')
+        self._operands: List[Optional[str]] = [None]
+        self._operand_ids: Dict[Optional[str], int] = {None: 0}
+        for ins in instrs:
+            self.append(ins)
+
+    def _intern(self, value) -> int:
+        i = self._operand_ids.get(value)
+        if i is None:
+            i = self._operand_ids[value] = len(self._operands)
+            self._operands.append(value)
+        return i
+
+    def add(self, op: str, dst=None, a=None, b=None) -> None:
+        self._ops.append(opcode_id(op))
+        self._dst.append(self._intern(dst))
+        self._a.append(self._intern(a))
+        self._b.append(self._intern(b))
+
+    def append(self, ins: Instr) -> None:
+        self.add(ins.op, ins.dst, ins.a, ins.b)
+
+    def extend(self, instrs: Iterable[Instr]) -> None:
+        for ins in instrs:
+            self.append(ins)
+
+    def _view(self, i: int) -> Instr:
+        operands = self._operands
+        return Instr(OPCODES[self._ops[i]], operands[self._dst[i]], operands[self._a[i]],
+                     operands[self._b[i]])
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._view(j) for j in range(*i.indices(len(self._ops)))]
+        if i < 0:
+            i += len(self._ops)
+        if not 0 <= i < len(self._ops):
+            raise IndexError('índice de instrucción fuera de rango')
+        return self._view(i)
+
+    def __setitem__(self, i: int, ins: Instr) -> None:
+        if i < 0:
+            i += len(self._ops)
+        self._ops[i] = opcode_id(ins.op)
+        self._dst[i] = self._intern(ins.dst)
+        self._a[i] = self._intern(ins.a)
+        self._b[i] = self._intern(ins.b)
+
+    def __iter__(self):
+        operands = self._operands
+        for op, d, a, b in zip(self._ops, self._dst, self._a, self._b):
+            yield Instr(OPCODES[op], operands[d], operands[a], operands[b])
+
+    def nbytes(self) -> int:
+        """Bytes de los arreglos de instrucciones (sin contar la tabla de operandos)."""
+        return sum(arr.itemsize * len(arr) for arr in (self._ops, self._dst, self._a, self._b))
+
+
 class Emitter:
     def __init__(self):
-        self.instrs: List[Instr] = []
+        self._instrs = InstrBuffer()
         self.temp_counter = 0
         self.free_temps: List[str] = []
         self.label_counter = 0
 
+    @property
+    def instrs(self) -> InstrBuffer:
+        return self._instrs
+
+    @instrs.setter
+    def instrs(self, instrs: Iterable[Instr]) -> None:
+        # asignar una lista (p. ej. tras un pase de optimización) la recompacta
+        self._instrs = instrs if isinstance(instrs, InstrBuffer) else InstrBuffer(instrs)
+
     def emit(self, op, dst=None, a=None, b=None):
-        self.instrs.append(Instr(op, dst, a, b))
+        self._instrs.add(op, dst, a, b)
 
     def new_temp(self):
         if self.free_temps:
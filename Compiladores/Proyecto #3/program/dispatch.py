@@ -0,0 +1,46 @@
+"""
+Tablas de despacho para los visitors de Compiscript.
+
+En lugar de armar "visit" + nombre de clase y llamar hasattr/getattr en cada nodo,
+cada clase de visitor obtiene una sola vez un dict {clase *Context: (handler, es_expr)}.
+El handler es la función de la clase (se llama como handler(visitor, nodo)) o None si
+no existe; `es_expr` indica si el nodo es de un tipo de expresión cuyo tipo se registra.
+"""
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from antlr4 import ParserRuleContext
+
+from CompiscriptParser import CompiscriptParser
+
+Entry = Tuple[Optional[Callable], bool]
+
+_TABLES: Dict[type, Dict[type, Entry]] = {}
+
+
+def handler_for(visitor_cls: type, node_cls: type, expression_kinds: Iterable[str] = ()) -> Entry:
+    name = node_cls.__name__
+    base = name[:-7] if name.endswith('Context') else name
+    return getattr(visitor_cls, f"visit{base}", None), base in expression_kinds
+
+
+def dispatch_table(visitor_cls: type, expression_kinds: Iterable[str] = ()) -> Dict[type, Entry]:
+    """Tabla de `visitor_cls`, construida la primera vez con todas las *Context del parser.
+
+    Otras clases de nodo (terminales, por ejemplo) se agregan al vuelo con `lookup`."""
+    table = _TABLES.get(visitor_cls)
+    if table is None:
+        kinds = frozenset(expression_kinds)
+        table = {}
+        for attr in vars(CompiscriptParser).values():
+            if isinstance(attr, type) and issubclass(attr, ParserRuleContext):
+                table[attr] = handler_for(visitor_cls, attr, kinds)
+        _TABLES[visitor_cls] = table
+    return table
+
+
+def lookup(table: Dict[type, Entry], visitor_cls: type, node_cls: type,
+           expression_kinds: Iterable[str] = ()) -> Entry:
+    entry = table.get(node_cls)
+    if entry is None:
+        entry = table[node_cls] = handler_for(visitor_cls, node_cls, expression_kinds)
+    return entry
@@ -0,0 +1,126 @@
+"""
+Cliente del servidor de compilación (`server.py`) usado por el IDE.
+
+Arranca el servidor una vez, le envía peticiones JSON con IDs crecientes y espera las
+respuestas en un hilo lector. Si el servidor muere, `request` lanza `ServerUnavailable`
+para que el IDE use el camino por subprocess; la siguiente petición intenta relanzarlo.
+"""
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+HERE = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(HERE, '..'))
+
+
+class ServerUnavailable(Exception):
+    pass
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+class _Pending:
+    def __init__(self):
+        self.done = threading.Event()
+        self.reply: Optional[dict] = None
+
+
+class CompileClient:
+    def __init__(self, root: str = ROOT):
+        self.root = root
+        self.proc: Optional[subprocess.Popen] = None
+        self.ids = itertools.count(1)
+        self.pending: Dict[int, _Pending] = {}
+        self.lock = threading.Lock()
+
+    # ---------- ciclo de vida ----------
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self) -> None:
+        if self.alive():
+            return
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.join(self.root, 'server.py')],
+            cwd=self.root, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, encoding='utf-8', bufsize=1,
+        )
+        threading.Thread(target=self._reader, args=(self.proc,), daemon=True).start()
+
+    def close(self) -> None:
+        if not self.alive():
+            return
+        try:
+            self._send({'id': next(self.ids), 'action': 'shutdown'})
+            self.proc.wait(timeout=2)
+        except Exception:
+            self.proc.kill()
+        self.proc = None
+
+    def _reader(self, proc: subprocess.Popen) -> None:
+        for line in proc.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            with self.lock:
+                p = self.pending.get(msg.get('id'))
+            if p is not None:
+                p.reply = msg
+                p.done.set()
+        # EOF: el servidor murió; despertar a quien esté esperando
+        with self.lock:
+            waiting = list(self.pending.values())
+        for p in waiting:
+            p.done.set()
+
+    def _send(self, msg: dict) -> None:
+        try:
+            self.proc.stdin.write(json.dumps(msg) + '\n')
+            self.proc.stdin.flush()
+        except (OSError, ValueError, AttributeError) as e:
+            raise ServerUnavailable(str(e))
+
+    # ---------- peticiones ----------
+    def submit(self, action: str, source: str) -> int:
+        """Encola una petición y devuelve su ID sin esperar la respuesta."""
+        self.start()
+        req_id = next(self.ids)
+        with self.lock:
+            self.pending[req_id] = _Pending()
+        self._send({'id': req_id, 'action': action, 'source': source})
+        return req_id
+
+    def cancel(self, req_id: int) -> None:
+        if self.alive():
+            self._send({'id': next(self.ids), 'action': 'cancel', 'target': req_id})
+
+    def wait(self, req_id: int, timeout: Optional[float] = None) -> Tuple[int, str]:
+        with self.lock:
+            p = self.pending.get(req_id)
+        if p is None:
+            raise ServerUnavailable('petición desconocida o servidor reiniciado')
+        if not p.done.wait(timeout):
+            with self.lock:
+                self.pending.pop(req_id, None)
+            self.cancel(req_id)
+            raise RequestCancelled(f'La petición {req_id} excedió {timeout} s')
+        with self.lock:
+            self.pending.pop(req_id, None)
+        msg = p.reply
+        if msg is None:
+            raise ServerUnavailable('el servidor de compilación terminó inesperadamente')
+        if msg.get('cancelled'):
+            raise RequestCancelled(f'La petición {req_id} fue cancelada')
+        if 'error' in msg:
+            raise ServerUnavailable(msg['error'])
+        return msg['rc'], msg['output']
+
+    def request(self, action: str, source: str, timeout: Optional[float] = 60) -> Tuple[int, str]:
+        return self.wait(self.submit(action, source), timeout)
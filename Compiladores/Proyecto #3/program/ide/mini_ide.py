@@ -1,4 +1,4 @@
-import os, sys, tempfile, subprocess
+import os, sys, tempfile, subprocess, threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 
@@ -12,8 +12,25 @@ except Exception:
     CompiscriptLexer = None
     CompiscriptParser = None
 
+try:
+    from compile_client import CompileClient, ServerUnavailable, RequestCancelled
+except ImportError:
+    from ide.compile_client import CompileClient, ServerUnavailable, RequestCancelled
+
 HERE = os.path.dirname(__file__)
 ROOT = os.path.abspath(os.path.join(HERE, '..'))
+POLL_MS = 50
+
+
+class _CompileJob:
+    """Compilación en curso en un hilo de trabajo; el hilo de Tk la revisa con `after`."""
+
+    def __init__(self):
+        self.req_id = None        # petición al servidor
+        self.proc = None          # Driver.py por subprocess, si el servidor no está
+        self.cancelled = False
+        self.fallback = False
+        self.result = None        # (returncode, stdout, stderr) al terminar
 
 
 class CompiscriptIDE(tk.Tk):
@@ -42,6 +59,11 @@ class CompiscriptIDE(tk.Tk):
         }
         self.current_theme = 'dark'
 
+        # servidor de compilación persistente (se arranca en la primera petición)
+        self.compiler = CompileClient(ROOT)
+        self.job = None
+        self.protocol('WM_DELETE_WINDOW', self.salir)
+
         self.create_menu()
         self.create_widgets()
         self.apply_theme(self.current_theme)
@@ -57,7 +79,7 @@ class CompiscriptIDE(tk.Tk):
         filemenu.add_command(label='Guardar', command=self.guardar, accelerator='Ctrl+S')
         filemenu.add_command(label='Guardar como...', command=self.guardar_como)
         filemenu.add_separator()
-        filemenu.add_command(label='Salir', command=self.quit)
+        filemenu.add_command(label='Salir', command=self.salir)
         menubar.add_cascade(label='Archivo', menu=filemenu)
 
         # --- Edición ---
@@ -69,6 +91,7 @@ class CompiscriptIDE(tk.Tk):
         # --- Herramientas ---
         toolsmenu = tk.Menu(menubar, tearoff=0)
         toolsmenu.add_command(label='Compilar', command=self.compilar, accelerator='F5')
+        toolsmenu.add_command(label='Cancelar compilación', command=self.cancelar, accelerator='Esc')
         toolsmenu.add_command(label='Ver AST (Texto)', command=self.ver_ast)
         toolsmenu.add_command(label='Ver AST (Visual)', command=self.ver_ast_visual)
         toolsmenu.add_command(label='Ver TAC', command=self.ver_tac)
@@ -97,13 +120,14 @@ class CompiscriptIDE(tk.Tk):
         btn_open = ttk.Button(toolbar, text='📂 Abrir', command=self.abrir)
         btn_save = ttk.Button(toolbar, text='💾 Guardar', command=self.guardar)
         btn_run = ttk.Button(toolbar, text='▶ Compilar', command=self.compilar)
+        self.btn_cancel = ttk.Button(toolbar, text='⏹ Cancelar', command=self.cancelar, state='disabled')
         btn_ast = ttk.Button(toolbar, text='🌳 AST', command=self.ver_ast)
         btn_ast_vis = ttk.Button(toolbar, text='🌲 AST (Vis)', command=self.ver_ast_visual)
         btn_tac = ttk.Button(toolbar, text='⚙️ TAC', command=self.ver_tac)
         btn_save_tac = ttk.Button(toolbar, text='💾 TAC', command=self.guardar_cspt)
         btn_theme = ttk.Button(toolbar, text='🌓 Tema', command=self.toggle_theme)
         btn_misp = ttk.Button(toolbar, text='💾 MISP', command=self.guardar_misp)
-        for b in (btn_open, btn_save, btn_run, btn_ast, btn_ast_vis, btn_tac, btn_save_tac, btn_theme, btn_misp):
+        for b in (btn_open, btn_save, btn_run, self.btn_cancel, btn_ast, btn_ast_vis, btn_tac, btn_save_tac, btn_theme, btn_misp):
             b.pack(side='left', padx=3, pady=2)
 
         main = ttk.PanedWindow(container, orient='horizontal')
@@ -180,6 +204,7 @@ class CompiscriptIDE(tk.Tk):
         self.bind('<Control-o>', lambda e: self.abrir())
         self.bind('<Control-s>', lambda e: self.guardar())
         self.bind('<F5>', lambda e: self.compilar())
+        self.bind('<Escape>', lambda e: self.cancelar())
 
     def update_line_numbers(self, event=None):
         self.line_numbers.config(state='normal')
@@ -262,54 +287,107 @@ class CompiscriptIDE(tk.Tk):
         self.current_file = path
         self.guardar()
 
-    def compilar(self):
-        code = self.text.get('1.0', 'end-1c')
+    def salir(self):
+        self.compiler.close()
+        self.quit()
+
+    def _run_driver(self, code, action='compile', flags=(), on_done=None):
+        """Compila `code` en un hilo de trabajo con el servidor persistente; solo si el servidor
+        muere usa Driver.py por subprocess. Al terminar llama `on_done(returncode, stdout, stderr)`
+        en el hilo de Tk. Solo hay una compilación a la vez; `cancelar` la interrumpe."""
+        if self.job is not None:
+            self.status.set('Ya hay una compilación en curso')
+            return
+        self.job = job = _CompileJob()
+        self.btn_cancel.config(state='normal')
+        self.status.set('Compilando...')
+        threading.Thread(target=self._compile_worker, args=(job, code, action, flags), daemon=True).start()
+        self.after(POLL_MS, self._poll_job, job, on_done)
+
+    def _compile_worker(self, job, code, action, flags):
+        try:
+            job.req_id = self.compiler.submit(action, code)
+            if job.cancelled:
+                self.compiler.cancel(job.req_id)
+            rc, out = self.compiler.wait(job.req_id, timeout=60)
+            job.result = (rc, out, '')
+            return
+        except RequestCancelled as e:
+            job.result = (1, '', str(e))
+            return
+        except ServerUnavailable:
+            job.fallback = True
         with tempfile.NamedTemporaryFile('w', delete=False, suffix='.cps', encoding='utf-8') as tmp:
             tmp.write(code)
             tmp_path = tmp.name
         try:
-            p = subprocess.run(
-                [sys.executable, os.path.join(ROOT, 'Driver.py'), tmp_path],
-                capture_output=True, text=True
+            job.proc = subprocess.Popen(
+                [sys.executable, os.path.join(ROOT, 'Driver.py'), tmp_path, *flags],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
             )
-            self._update_output(self.errors_panel['text'], p.stdout + p.stderr)
-            if p.returncode == 0:
+            if job.cancelled:
+                job.proc.kill()
+            out, err = job.proc.communicate()
+            job.result = (1, '', 'Compilación cancelada') if job.cancelled else (job.proc.returncode, out, err)
+        except Exception as e:
+            job.result = (1, '', str(e))
+        finally:
+            os.unlink(tmp_path)
+
+    def _poll_job(self, job, on_done):
+        if job.result is None:
+            self.after(POLL_MS, self._poll_job, job, on_done)
+            return
+        self.job = None
+        self.btn_cancel.config(state='disabled')
+        if job.cancelled:
+            self.status.set('Compilación cancelada')
+        elif job.fallback:
+            self.status.set('Servidor de compilación no disponible, usando subprocess')
+        if on_done is not None and not job.cancelled:
+            on_done(*job.result)
+
+    def cancelar(self):
+        job = self.job
+        if job is None:
+            return
+        job.cancelled = True
+        if job.req_id is not None:
+            try:
+                self.compiler.cancel(job.req_id)
+            except ServerUnavailable:
+                pass
+        if job.proc is not None:
+            job.proc.kill()
+        self.status.set('Cancelando...')
+
+    def compilar(self):
+        code = self.text.get('1.0', 'end-1c')
+
+        def done(rc, out, err):
+            self._update_output(self.errors_panel['text'], out + err)
+            if rc == 0:
                 self.status.set('✔ Compilación exitosa')
             else:
                 self.status.set('❌ Errores detectados')
-        finally:
-            os.unlink(tmp_path)
+        self._run_driver(code, on_done=done)
 
     def ver_ast(self):
         code = self.text.get('1.0', 'end-1c')
-        with tempfile.NamedTemporaryFile('w', delete=False, suffix='.cps', encoding='utf-8') as tmp:
-            tmp.write(code)
-            tmp_path = tmp.name
-        try:
-            p = subprocess.run(
-                [sys.executable, os.path.join(ROOT, 'Driver.py'), tmp_path, '--ast'],
-                capture_output=True, text=True
-            )
-            self._update_output(self.ast_panel['text'], p.stdout)
-        finally:
-            os.unlink(tmp_path)
 
-    def _generate_tac(self):
-        """Genera TAC usando Driver.py --tac"""
+        def done(rc, out, err):
+            self._update_output(self.ast_panel['text'], out)
+            self.status.set('Listo')
+        self._run_driver(code, 'ast', ('--ast',), on_done=done)
+
+    def _generate_tac(self, on_done):
+        """Genera TAC (equivalente a Driver.py --tac) y llama `on_done(tac, returncode, stderr)`."""
         code = self.text.get('1.0', 'end-1c')
-        with tempfile.NamedTemporaryFile('w', delete=False, suffix='.cps', encoding='utf-8') as tmp:
-            tmp.write(code)
-            tmp_path = tmp.name
-        try:
-            p = subprocess.run(
-                [sys.executable, os.path.join(ROOT, 'Driver.py'), tmp_path, '--tac'],
-                capture_output=True,
-                text=True
-            )
-            output = p.stdout if p.stdout.strip() else p.stderr
-            return output or '', p.returncode, p.stderr
-        finally:
-            os.unlink(tmp_path)
+
+        def done(rc, out, err):
+            self.status.set('Listo')
+            on_done((out if out.strip() else err) or '', rc, err)
+        self._run_driver(code, 'tac', ('--tac',), on_done=done)
 
 
     def ver_ast_visual(self):
@@ -474,11 +552,12 @@ class CompiscriptIDE(tk.Tk):
 
 
     def ver_tac(self):
-        tac_text, _, _ = self._generate_tac()
-        self._update_output(self.tac_panel['text'], tac_text)
+        self._generate_tac(lambda tac_text, _rc, _err: self._update_output(self.tac_panel['text'], tac_text))
 
     def guardar_cspt(self):
-        tac_text, retcode, errors = self._generate_tac()
+        self._generate_tac(self._save_cspt)
+
+    def _save_cspt(self, tac_text, retcode, errors):
         if retcode != 0:
             messagebox.showerror('Error al generar TAC', errors or 'No se pudo generar TAC.')
             return
@@ -571,21 +650,6 @@ class CompiscriptIDE(tk.Tk):
             import traceback
             error_detail = traceback.format_exc()
             messagebox.showerror('Error al generar MIPS', f'Error:\n{str(e)}\n\nDetalle:\n{error_detail[:500]}')
-            def _generate_tac(self):
-                code = self.text.get('1.0', 'end-1c')
-                with tempfile.NamedTemporaryFile('w', delete=False, suffix='.cps', encoding='utf-8') as tmp:
-                    tmp.write(code)
-                    tmp_path = tmp.name
-                try:
-                    p = subprocess.run(
-                        [sys.executable, os.path.join(ROOT, 'Driver.py'), tmp_path, '--tac'],
-                        capture_output=True,
-                        text=True
-                    )
-                    output = p.stdout if p.stdout.strip() else p.stderr
-                    return output or '', p.returncode, p.stderr
-                finally:
-                    os.unlink(tmp_path)
 
 
     def _update_output(self, panel, text):
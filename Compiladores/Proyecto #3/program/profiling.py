@@ -0,0 +1,103 @@
+"""
+Perfilado por fase del pipeline de Compiscript (`Driver.py --profile`).
+
+Para cada fase (lex, parse, semantic, codegen, mips) se mide tiempo de pared, tiempo
+de CPU, pico de memoria con tracemalloc y objetos vivos creados; además se cuentan
+tokens, nodos del parse tree, instrucciones TAC y líneas MIPS. El resultado se puede
+imprimir como tabla o volcar como JSON para seguir regresiones en el tiempo.
+"""
+import gc
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+def count_tree_nodes(tree) -> int:
+    """Nodos del parse tree (reglas y terminales), sin recursión."""
+    if tree is None:
+        return 0
+    n = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        n += 1
+        children = getattr(node, 'children', None)
+        if children:
+            stack.extend(children)
+    return n
+
+
+class PhaseProfiler:
+    def __init__(self, memory: bool = True):
+        # memory=False omite tracemalloc y el conteo de objetos (que distorsionan los
+        # tiempos); útil para benchmarks que solo miden tiempo.
+        self.memory = memory
+        self.phases: List[Dict] = []
+        self.counts: Dict[str, int] = {}
+        self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.memory:
+            wall0 = time.perf_counter()
+            cpu0 = time.process_time()
+            try:
+                yield
+            finally:
+                self.phases.append({
+                    'name': name,
+                    'wall_ms': round((time.perf_counter() - wall0) * 1000, 3),
+                    'cpu_ms': round((time.process_time() - cpu0) * 1000, 3),
+                    'peak_kib': 0.0,
+                    'objects': 0,
+                })
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        objects_before = len(gc.get_objects())
+        mem_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.process_time() - cpu0
+            peak = tracemalloc.get_traced_memory()[1]
+            self.phases.append({
+                'name': name,
+                'wall_ms': round(wall * 1000, 3),
+                'cpu_ms': round(cpu * 1000, 3),
+                'peak_kib': round(max(0, peak - mem_before) / 1024, 1),
+                'objects': len(gc.get_objects()) - objects_before,
+            })
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def to_dict(self, **extra) -> Dict:
+        data = dict(extra)
+        data['phases'] = self.phases
+        data['counts'] = self.counts
+        data['total_wall_ms'] = round(sum(p['wall_ms'] for p in self.phases), 3)
+        data['total_cpu_ms'] = round(sum(p['cpu_ms'] for p in self.phases), 3)
+        return data
+
+    def to_json(self, **extra) -> str:
+        return json.dumps(self.to_dict(**extra), indent=2)
+
+    def report(self, title: Optional[str] = None) -> str:
+        lines = [f"=== Perfil{': ' + title if title else ''} ==="]
+        lines.append(f"{'fase':<10}{'pared ms':>11}{'cpu ms':>11}{'pico KiB':>11}{'objetos':>10}")
+        for p in self.phases:
+            lines.append(f"{p['name']:<10}{p['wall_ms']:>11.2f}{p['cpu_ms']:>11.2f}"
+                         f"{p['peak_kib']:>11.1f}{p['objects']:>10}")
+        if self.counts:
+            lines.append(', '.join(f"{k}={v}" for k, v in self.counts.items()))
+        return '\n'.join(lines)
@@ -8,6 +8,15 @@ from .errors import SemanticError, at
 
 from CompiscriptVisitor import CompiscriptVisitor
 from CompiscriptParser import CompiscriptParser
+from dispatch import dispatch_table, lookup
+
+# Nodos cuyo tipo resultante se guarda en node_types al visitarlos
+EXPRESSION_KINDS = frozenset([
+    'Expression', 'AssignmentExpr', 'ConditionalExpr', 'LogicalOrExpr',
+    'LogicalAndExpr', 'EqualityExpr', 'RelationalExpr', 'AdditiveExpr',
+    'MultiplicativeExpr', 'UnaryExpr', 'PrimaryExpr', 'LiteralExpr',
+    'ArrayLiteral', 'LeftHandSide',
+])
 
 class SemanticVisitor(CompiscriptVisitor):
     def __init__(self):
@@ -20,50 +29,36 @@ class SemanticVisitor(CompiscriptVisitor):
         self.capture_stack: List[set] = []
         self.block_terminated: List[bool] = []
         self.warnings: List[str] = []
+        self._dispatch = dispatch_table(type(self), EXPRESSION_KINDS)
     
     def visit(self, tree):
         """Override the default visit method to ensure our semantic methods are called"""
         if tree is None:
             return None
-        
-        # Get the method name for this node type
-        class_name = tree.__class__.__name__
-        
-        # Remove 'Context' suffix if present
-        if class_name.endswith('Context'):
-            base_name = class_name[:-7]  # Remove 'Context'
-        else:
-            base_name = class_name
-            
-        method_name = f"visit{base_name}"
-        
+
         # Robust: if tree is a list, visit each element
         if isinstance(tree, list):
             results = [self.visit(t) for t in tree]
             return results[-1] if results else None
 
+        entry = self._dispatch.get(tree.__class__)
+        if entry is None:
+            entry = lookup(self._dispatch, type(self), tree.__class__, EXPRESSION_KINDS)
+        method, is_expr = entry
+
         # If we have a specific method for this node type, call it
-        if hasattr(self, method_name):
-            method = getattr(self, method_name)
-            result = method(tree)
+        if method is not None:
+            result = method(self, tree)
             # Store the result in node_types for expression nodes
-            if base_name in ['Expression', 'AssignmentExpr', 'ConditionalExpr', 'LogicalOrExpr', 
-                           'LogicalAndExpr', 'EqualityExpr', 'RelationalExpr', 'AdditiveExpr', 
-                           'MultiplicativeExpr', 'UnaryExpr', 'PrimaryExpr', 'LiteralExpr', 
-                           'ArrayLiteral', 'LeftHandSide']:
-                if result is not None:
-                    self.node_types[tree] = result
+            if is_expr and result is not None:
+                self.node_types[tree] = result
             return result
 
         # Otherwise, use the default behavior
         result = self.visitChildren(tree)
         # For expression nodes, try to get the type from node_types
-        if base_name in ['Expression', 'AssignmentExpr', 'ConditionalExpr', 'LogicalOrExpr', 
-                       'LogicalAndExpr', 'EqualityExpr', 'RelationalExpr', 'AdditiveExpr', 
-                       'MultiplicativeExpr', 'UnaryExpr', 'PrimaryExpr', 'LiteralExpr', 
-                       'ArrayLiteral', 'LeftHandSide']:
-            if result is None and tree in self.node_types:
-                return self.node_types[tree]
+        if is_expr and result is None and tree in self.node_types:
+            return self.node_types[tree]
         return result
 
     # util
@@ -0,0 +1,132 @@
+"""
+Servidor de compilación persistente para el IDE.
+
+Mantiene el front end de Compiscript cargado y caliente, y habla JSON por líneas
+sobre stdin/stdout (un objeto por línea):
+
+    -> {"id": 1, "action": "compile" | "ast" | "tac" | "mips", "source": "..."}
+    <- {"id": 1, "rc": 0, "output": "..."}
+
+    -> {"id": 2, "action": "cancel", "target": 1}
+    <- {"id": 1, "cancelled": true}          (en lugar del resultado de 1)
+
+    -> {"id": 3, "action": "ping"}           <- {"id": 3, "ok": true}
+    -> {"id": 4, "action": "shutdown"}       <- {"id": 4, "ok": true}
+
+La salida de cada compilación es la misma que imprimiría `Driver.py` para ese modo.
+Las peticiones se atienden en orden por un único hilo de trabajo; cancelar una petición
+en cola evita compilarla, y cancelar la que está en curso descarta su resultado. Cancelar
+una petición que ya terminó (o que no existe) no hace nada.
+"""
+import contextlib
+import io
+import json
+import queue
+import sys
+import threading
+import traceback
+
+from session import CompilationSession
+from Driver import run_session
+
+ACTIONS = {
+    'compile': {},
+    'ast': {'ast': True},
+    'tac': {'tac': True},
+    'mips': {'mips': True},
+}
+
+
+def compile_source(source: str, action: str = 'compile'):
+    """Compila texto fuente en proceso y devuelve (rc, salida) como lo haría Driver.py."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        try:
+            rc = run_session(CompilationSession.from_source(source), **ACTIONS[action])
+        except Exception:
+            traceback.print_exc(file=buf)
+            rc = 70
+    return rc, buf.getvalue()
+
+
+class CompileServer:
+    def __init__(self, inp=None, out=None):
+        self.inp = inp or sys.stdin
+        self.out = out or sys.stdout
+        self.jobs: 'queue.Queue' = queue.Queue()
+        self.cancelled = set()
+        self.queued = set()       # IDs en la cola del hilo de trabajo
+        self.running = None       # ID que se está compilando
+        self.lock = threading.Lock()
+
+    def send(self, msg: dict) -> None:
+        with self.lock:
+            self.out.write(json.dumps(msg) + '\n')
+            self.out.flush()
+
+    def _take_cancel(self, req_id) -> bool:
+        with self.lock:
+            if req_id in self.cancelled:
+                self.cancelled.discard(req_id)
+                return True
+            return False
+
+    def cancel(self, target) -> None:
+        """Marca `target` para cancelarla, solo si sigue en cola o en curso."""
+        with self.lock:
+            if target in self.queued or target == self.running:
+                self.cancelled.add(target)
+
+    def worker(self) -> None:
+        while True:
+            req = self.jobs.get()
+            if req is None:
+                return
+            req_id = req.get('id')
+            with self.lock:
+                self.queued.discard(req_id)
+                self.running = req_id
+            cancelled = self._take_cancel(req_id)
+            if not cancelled:
+                rc, output = compile_source(req.get('source', ''), req['action'])
+            with self.lock:
+                self.running = None
+            if self._take_cancel(req_id) or cancelled:
+                self.send({'id': req_id, 'cancelled': True})
+            else:
+                self.send({'id': req_id, 'rc': rc, 'output': output})
+
+    def serve(self) -> int:
+        CompilationSession.warm_up()
+        th = threading.Thread(target=self.worker, daemon=True)
+        th.start()
+        for line in self.inp:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                req = json.loads(line)
+            except ValueError as e:
+                self.send({'id': None, 'error': f'JSON inválido: {e}'})
+                continue
+            action = req.get('action')
+            if action in ACTIONS:
+                with self.lock:
+                    self.queued.add(req.get('id'))
+                self.jobs.put(req)
+            elif action == 'cancel':
+                self.cancel(req.get('target'))
+            elif action == 'ping':
+                self.send({'id': req.get('id'), 'ok': True})
+            elif action == 'shutdown':
+                self.send({'id': req.get('id'), 'ok': True})
+                break
+            else:
+                self.send({'id': req.get('id'), 'error': f'Acción desconocida: {action}'})
+        self.jobs.put(None)
+        th.join()
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(CompileServer().serve())
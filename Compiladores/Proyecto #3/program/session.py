@@ -0,0 +1,315 @@
+"""
+Sesión de compilación compartida por todas las etapas del Driver.
+
+Cada etapa (tokens, árbol sintáctico, análisis semántico, TAC y MIPS) se calcula
+de forma perezosa una sola vez y se reutiliza en todas las salidas pedidas, de modo
+que `--tac --mips` cuesta un único pase del front end.
+
+Con `options={'optimize': True}` (o una lista de pases) el TAC pasa por el pipeline de
+codegen/optimize.py antes de llegar al backend. `options={'convention': 'stack'}` elige la
+convención de llamada de compatibilidad del backend (ver codegen/frames.py) y
+`options={'peephole': True}` pasa el .text por codegen/peephole.py.
+
+Con un `ArtifactCache`, una sesión cuyo fuente ya se compiló con las mismas opciones
+recupera TAC, static_arrays y MIPS del disco sin lexear, parsear ni analizar.
+"""
+from contextlib import nullcontext
+from typing import Dict, Optional
+
+from antlr4 import FileStream, InputStream, CommonTokenStream
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from semantic.visitor import SemanticVisitor
+from semantic.errors import SemanticError
+from codegen.codegen import CodeGenVisitor
+from codegen.mips_backend import MIPSBackend
+from codegen.cache import ArtifactCache
+from codegen.optimize import OptimizationReport, Optimizer
+from codegen.tac import Emitter, Instr
+from profiling import PhaseProfiler, count_tree_nodes
+
+
+class ThrowingSyntaxErrorListener(ErrorListener):
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.errors.append(f"[Syntax] line {line}:{column} {msg}")
+
+
+class CompilationSession:
+    """Dueña del token stream, el parse tree, el SemanticVisitor, el Emitter TAC y el texto MIPS."""
+
+    def __init__(self, input_stream, path: Optional[str] = None,
+                 cache: Optional[ArtifactCache] = None, options: Optional[Dict] = None,
+                 profiler: Optional[PhaseProfiler] = None):
+        self.path = path
+        self.cache = cache
+        self.profiler = profiler
+        self.options = dict(options or {})
+        self._input = input_stream
+        self._entry: Optional[dict] = None
+        self._entry_loaded = False
+        self._tokens = None
+        self._parser = None
+        self._tree = None
+        self._syntax = None
+        self.parse_mode: Optional[str] = None  # 'SLL' o 'LL', según el camino que tomó el parser
+        self._semantic = None
+        self._semantic_error: Optional[SemanticError] = None
+        self._semantic_done = False
+        self._semantic_reported = False
+        self._emitter = None
+        self._static_arrays = None
+        self._mips: Optional[str] = None
+        self.optimization: Optional[OptimizationReport] = None  # si options['optimize'] corrió
+        self.register_allocation = None  # Allocation del backend (no existe si el MIPS vino del caché)
+        self.simulation = None           # SimResult de la última simulate()
+        self.peephole = None             # Peephole del backend con sus contadores por regla
+
+    @classmethod
+    def from_file(cls, filepath: str, **kwargs) -> 'CompilationSession':
+        return cls(FileStream(filepath, encoding='utf-8'), path=filepath, **kwargs)
+
+    @classmethod
+    def from_source(cls, text: str, path: Optional[str] = None, **kwargs) -> 'CompilationSession':
+        return cls(InputStream(text), path=path, **kwargs)
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """Compila un programa mínimo para dejar cargados el ATN y las cachés DFA del parser."""
+        cls.from_source('let a: integer = 1;').emitter
+
+    def _phase(self, name: str):
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def _count(self, name: str, value: int) -> None:
+        if self.profiler is not None:
+            self.profiler.counts[name] = value
+
+    # ---------- Caché ----------
+    @property
+    def cache_key(self) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.key(self._input.strdata, self.options)
+
+    @property
+    def cached(self) -> Optional[dict]:
+        """Entrada del caché para este fuente y opciones, o None si no hay caché o no está."""
+        if not self._entry_loaded:
+            self._entry_loaded = True
+            if self.cache is not None:
+                self._entry = self.cache.get(self.cache_key)
+        return self._entry
+
+    def _store(self) -> None:
+        """Guarda la entrada con lo que ya produjo la sesión: el TAC en cuanto se genera y el
+        MIPS cuando se emite (en memoria o en streaming), completando una entrada sin MIPS."""
+        if self.cache is None:
+            return
+        entry = self.cached
+        if entry is not None and (entry['mips'] is not None or self._mips is None):
+            return
+        self._entry = {
+            'tac': [[i.op, i.dst, i.a, i.b] for i in self.emitter.instrs],
+            'static_arrays': self.static_arrays,
+            'mips': self._mips,
+            'warnings': list(self.warnings),
+            'semantic_error': str(self.semantic_error) if self.semantic_error is not None else None,
+        }
+        self.cache.put(self.cache_key, self._entry)
+
+    # ---------- Front end ----------
+    @property
+    def tokens(self) -> CommonTokenStream:
+        if self._tokens is None:
+            with self._phase('lex'):
+                lexer = CompiscriptLexer(self._input)
+                self._tokens = CommonTokenStream(lexer)
+                self._tokens.fill()
+            self._count('tokens', len(self._tokens.tokens) - 1)  # sin EOF
+        return self._tokens
+
+    def _parse(self) -> None:
+        """Parseo en dos etapas: SLL con bail-out primero (rápido y suficiente para casi
+        cualquier entrada válida) y, solo si falla, LL completo con el listener de errores."""
+        if self._tree is not None:
+            return
+        tokens = self.tokens
+        with self._phase('parse'):
+            parser = CompiscriptParser(tokens)
+            parser.removeErrorListeners()
+            parser._interp.predictionMode = PredictionMode.SLL
+            parser._errHandler = BailErrorStrategy()
+            syn = ThrowingSyntaxErrorListener()
+            try:
+                self._tree = parser.program()
+                self.parse_mode = 'SLL'
+            except ParseCancellationException:
+                parser.reset()
+                parser.addErrorListener(syn)
+                parser._interp.predictionMode = PredictionMode.LL
+                parser._errHandler = DefaultErrorStrategy()
+                self._tree = parser.program()
+                self.parse_mode = 'LL'
+        self._parser = parser
+        self._syntax = syn
+        if self.profiler is not None:
+            self._count('parse_nodes', count_tree_nodes(self._tree))
+
+    @property
+    def parser(self) -> CompiscriptParser:
+        self._parse()
+        return self._parser
+
+    @property
+    def tree(self):
+        self._parse()
+        return self._tree
+
+    @property
+    def syntax(self) -> ThrowingSyntaxErrorListener:
+        self._parse()
+        return self._syntax
+
+    @property
+    def syntax_errors(self):
+        if self.cached is not None:
+            return []  # solo se guardan compilaciones sin errores de sintaxis
+        return self.syntax.errors
+
+    @property
+    def analyzed(self) -> bool:
+        """True si hay un análisis semántico utilizable, recién hecho o recuperado del caché."""
+        return self.cached is not None or self.semantic is not None
+
+    @property
+    def semantic(self) -> Optional[SemanticVisitor]:
+        """SemanticVisitor ya ejecutado sobre el árbol, o None si hubo errores de sintaxis."""
+        if not self._semantic_done:
+            self._semantic_done = True
+            if not self.syntax_errors:
+                tree = self.tree
+                with self._phase('semantic'):
+                    visitor = SemanticVisitor()
+                    try:
+                        visitor.visit(tree)
+                    except SemanticError as se:
+                        self._semantic_error = se
+                self._semantic = visitor
+        return self._semantic
+
+    @property
+    def semantic_error(self) -> Optional[SemanticError]:
+        if self.cached is not None:
+            msg = self.cached['semantic_error']
+            return SemanticError(msg) if msg is not None else None
+        self.semantic  # fuerza el análisis si aún no corrió
+        return self._semantic_error
+
+    @property
+    def symtab(self):
+        return self.semantic.symtab if self.semantic is not None else None
+
+    @property
+    def warnings(self):
+        if self.cached is not None:
+            return self.cached['warnings']
+        return getattr(self.semantic, 'warnings', [])
+
+    def report_semantic(self) -> None:
+        """Imprime el error semántico (si lo hay) una sola vez por sesión."""
+        if self._semantic_reported:
+            return
+        self._semantic_reported = True
+        if self.semantic_error is not None:
+            print(self.semantic_error)
+
+    # ---------- Back end ----------
+    def _generate(self) -> None:
+        if self._emitter is not None:
+            return
+        if self.cached is not None:
+            self._emitter = Emitter()
+            self._emitter.instrs = [Instr(*row) for row in self.cached['tac']]
+            self._static_arrays = self.cached['static_arrays']
+            return
+        tree = self.tree
+        with self._phase('codegen'):
+            cg = CodeGenVisitor()
+            self._emitter, self._static_arrays = cg.visitProgram(tree)
+        self._count('tac_instrs', len(self._emitter.instrs))
+        passes = self.options.get('optimize')
+        if passes:
+            with self._phase('optimize'):
+                optimizer = Optimizer(None if passes is True else passes)
+                self._emitter.instrs, self.optimization = optimizer.run(self._emitter.instrs)
+            self._count('tac_instrs_opt', len(self._emitter.instrs))
+        self._store()
+
+    @property
+    def emitter(self):
+        self._generate()
+        return self._emitter
+
+    @property
+    def static_arrays(self):
+        self._generate()
+        return self._static_arrays
+
+    def _backend(self, symtab) -> MIPSBackend:
+        return MIPSBackend(symtab, self.options.get('convention', 'registers'),
+                           peephole=bool(self.options.get('peephole')))
+
+    def mips(self, out_path: Optional[str] = None) -> str:
+        """Texto MIPS del programa; si se da `out_path` también se escribe el archivo .s."""
+        if self._mips is None and self.cached is not None:
+            self._mips = self.cached['mips']
+        if self._mips is None:
+            symtab, emitter, static_arrays = self.symtab, self.emitter, self.static_arrays
+            with self._phase('mips'):
+                backend = self._backend(symtab)
+                self._mips = backend.emit_from_emitter(emitter, static_arrays=static_arrays)
+            self.register_allocation, self.peephole = backend.allocation, backend.peephole
+            self._count('mips_lines', self._mips.count('\n'))
+            self._store()
+        if out_path is not None:
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(self._mips)
+        return self._mips
+
+    def write_mips(self, out_path: str) -> str:
+        """Escribe el .s en `out_path` sin armar el programa en memoria (salvo que el MIPS ya
+        esté en la sesión o en el caché) y devuelve la ruta. El caché guarda lo escrito."""
+        if self._mips is None and self.cached is not None:
+            self._mips = self.cached['mips']
+        if self._mips is not None:
+            self.mips(out_path)
+            return out_path
+        symtab, emitter, static_arrays = self.symtab, self.emitter, self.static_arrays
+        with self._phase('mips'):
+            backend = self._backend(symtab)
+            backend.emit_to_file(emitter, out_path, static_arrays=static_arrays)
+        self.register_allocation, self.peephole = backend.allocation, backend.peephole
+        if self.cache is not None:
+            with open(out_path, encoding='utf-8') as f:
+                self._mips = f.read()
+            self._store()
+        return out_path
+
+    def simulate(self, max_steps: int = 10_000_000):
+        """Ejecuta el MIPS del programa en codegen/simulator.py y devuelve el SimResult
+        (salida y contadores dinámicos)."""
+        from codegen.simulator import run_text
+        text = self.mips()
+        with self._phase('simulate'):
+            result = run_text(text, max_steps=max_steps)
+        self._count('sim_steps', result.steps)
+        self.simulation = result
+        return result
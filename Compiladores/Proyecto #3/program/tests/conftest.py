@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Driver.run usa el caché por defecto: que las pruebas no escriban en ~/.cache."""
+    monkeypatch.setenv('COMPISCRIPT_CACHE_DIR', str(tmp_path / 'compiscript-cache'))
@@ -0,0 +1,194 @@
+"""Utilidades compartidas por las pruebas: corpus de programas, TAC de un fuente y un
+intérprete mínimo del TAC para comparar comportamiento."""
+import glob
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from antlr4.RuleContext import RuleContext
+from session import CompilationSession
+from codegen.codegen import CodeGenVisitor
+from codegen.dataflow import is_immediate, is_temp
+from codegen.frames import function_symbol
+
+PROGRAMS = sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', '*', '*.txt')) +
+                  glob.glob(os.path.join(ROOT, 'tests', '*.cps')) +
+                  glob.glob(os.path.join(ROOT, 'tests', 'NewTests', '*.cps')))
+
+
+def tac_of(code, monkeypatch=None):
+    s = CompilationSession.from_source(code)
+    assert s.syntax_errors == []
+    tree = s.tree
+    if monkeypatch is not None:
+        # el lowering de expresiones no debe reconstruir texto de subárboles
+        monkeypatch.setattr(RuleContext, 'getText',
+                            lambda self: (_ for _ in ()).throw(AssertionError('getText')))
+    gen = CodeGenVisitor()
+    gen.visit(tree)
+    return [str(i) for i in gen.em.instrs]
+
+
+class Ref(int):
+    """Dirección de un arreglo u objeto en el intérprete; no coincide con la del simulador."""
+
+
+def run_tac(instrs, static_arrays=None, max_steps=200000, params=None):
+    """Intérprete mínimo del TAC: devuelve (prints, variables finales, retorno de main)
+    o el nombre de la excepción. Los temporales son locales a cada llamada; con `params`
+    (etiqueta -> nombres, ver params_of) también los parámetros, ligados a los ARG."""
+    params = params or {}
+    code = list(instrs)
+    labels = {ins.dst: i for i, ins in enumerate(code) if ins.op == 'LABEL'}
+    ends = {}
+    stack = []
+    for i, ins in enumerate(code):
+        if ins.op == 'LABEL' and str(ins.dst).startswith(('func_', 'method_')):
+            stack.append(i)
+        elif ins.op == 'LABEL' and str(ins.dst).startswith('end_') and stack:
+            ends[stack.pop()] = i
+    mem, glob_vars, prints = {}, {}, []
+    heap = [100000]
+    for k, (name, elems) in enumerate((static_arrays or {}).items()):
+        glob_vars[name] = base = Ref(1000 * (k + 1))
+        for j, e in enumerate(elems):
+            mem[base + 4 * j] = int(e) if is_immediate(str(e)) else e
+
+    frames = [{'temps': {}, 'vars': {}, 'ret': None, 'dst': None}]
+    args = []
+
+    def val(x):
+        if x is None:
+            return 0
+        if is_immediate(x):
+            return int(x)
+        if x.startswith('"'):
+            return x[1:-1]
+        if is_temp(x):
+            return frames[-1]['temps'].get(x, 0)
+        if x in frames[-1]['vars']:
+            return frames[-1]['vars'][x]
+        return glob_vars.get(x, 0)
+
+    def setv(name, v):
+        if is_temp(name):
+            frames[-1]['temps'][name] = v
+        elif name in frames[-1]['vars']:
+            frames[-1]['vars'][name] = v
+        elif name not in (None, 'None'):
+            glob_vars[name] = v
+
+    def ret(v):
+        frame = frames.pop()
+        setv(frame['dst'], v)
+        return frame['ret']
+
+    arith = {
+        'ADD': lambda a, b: a + b, 'SUB': lambda a, b: a - b, 'MUL': lambda a, b: a * b,
+        'DIV': lambda a, b: int(a / b), 'MOD': lambda a, b: a - int(a / b) * b, 'SHL': lambda a, b: a << b, 'EQ': lambda a, b: int(a == b),
+        'NE': lambda a, b: int(a != b), 'LT': lambda a, b: int(a < b),
+        'LE': lambda a, b: int(a <= b), 'GT': lambda a, b: int(a > b),
+        'GE': lambda a, b: int(a >= b), 'AND': lambda a, b: a & b, 'OR': lambda a, b: a | b,
+    }
+    main_done = 'func_main' not in labels
+    pc = 0
+    result = None
+    try:
+        for _ in range(max_steps):
+            if pc >= len(code):
+                if len(frames) > 1:
+                    pc = ret(0)
+                    continue
+                if main_done:
+                    break
+                main_done = True
+                frames.append({'temps': {}, 'vars': {}, 'ret': len(code), 'dst': '__main_result'})
+                pc = labels['func_main'] + 1
+                continue
+            ins = code[pc]
+            pc += 1
+            op = ins.op
+            if op == 'LABEL':
+                if pc - 1 in ends:
+                    pc = ends[pc - 1] + 1  # definición de función alcanzada por flujo normal
+                elif str(ins.dst).startswith('end_') and len(frames) > 1:
+                    pc = ret(0)
+            elif op == 'GOTO':
+                pc = labels[ins.dst]
+            elif op == 'IFZ':
+                if val(ins.a) == 0:
+                    pc = labels[ins.dst]
+            elif op == 'JUMPTABLE':
+                table, k = ins.b[1:-1].split(','), val(ins.a)
+                pc = labels[table[k] if 0 <= k < len(table) else ins.dst]
+            elif op in arith:
+                setv(ins.dst, arith[op](val(ins.a), val(ins.b)))
+            elif op == 'NOT':
+                setv(ins.dst, int(val(ins.a) == 0))
+            elif op == 'MOV':
+                setv(ins.dst, val(ins.a))
+            elif op == 'LOAD':
+                setv(ins.dst, mem.get(val(ins.a), 0) if is_temp(ins.a) else val(ins.a))
+            elif op == 'STORE':
+                if is_temp(ins.dst):
+                    mem[val(ins.dst)] = val(ins.a)
+                elif str(ins.a).startswith('['):
+                    pass
+                else:
+                    setv(ins.dst, val(ins.a))
+            elif op == 'PRINT':
+                prints.append(val(ins.a))
+            elif op == 'ARG':
+                args.append(val(ins.a))
+            elif op == 'CALL':
+                bound = dict(zip(params.get(ins.a, ()), args))
+                args = []
+                target = labels.get(ins.a)
+                if target is None:
+                    setv(ins.dst, 0)
+                else:
+                    frames.append({'temps': {}, 'vars': bound, 'ret': pc, 'dst': ins.dst})
+                    pc = target + 1
+            elif op == 'RET':
+                v = val(ins.dst)
+                if len(frames) == 1:
+                    result = v
+                    break
+                pc = ret(v)
+            elif op in ('NEWOBJ', 'ALLOC'):
+                heap[0] += 64
+                setv(ins.dst, Ref(heap[0]))
+            elif op == 'GETPROP':
+                setv(ins.dst, mem.get((val(ins.a), ins.b), 0))
+            elif op == 'SETPROP':
+                mem[(val(ins.dst), ins.a)] = val(ins.b)
+        else:
+            return 'timeout'
+    except Exception as e:
+        return type(e).__name__
+    result = glob_vars.pop('__main_result', result)
+    return prints, glob_vars, result
+
+
+def params_of(session):
+    """Parámetros de cada función del TAC de `session`, según la tabla de símbolos."""
+    out = {}
+    for ins in session.emitter.instrs:
+        if ins.op == 'LABEL' and str(ins.dst).startswith(('func_', 'method_')):
+            sym = function_symbol(session.symtab, ins.dst)
+            if sym is not None:
+                out[ins.dst] = [p.name for p in sym.params]
+    return out
+
+
+def compiled(path=None, source=None):
+    s = CompilationSession.from_file(path) if path else CompilationSession.from_source(source)
+    if s.syntax_errors or not s.analyzed:
+        return None
+    try:
+        return list(s.emitter.instrs), s.static_arrays
+    except Exception:
+        return None
@@ -0,0 +1,48 @@
+import subprocess, sys, os, pathlib
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+GOOD = "let a: integer = 1;\nprint(a);\n"
+BAD = "let a: integer = ;\n"
+
+
+def test_batch_jobs_report_and_outputs(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.cps').write_text(GOOD, encoding='utf-8')
+    (tmp_path / 'sub' / 'b.cps').write_text(GOOD, encoding='utf-8')
+    (tmp_path / 'c.cps').write_text(BAD, encoding='utf-8')
+    p = subprocess.run([sys.executable, '-m', ROOT.name, '--jobs', '2', '--mips', str(tmp_path)],
+                       cwd=str(ROOT.parent), capture_output=True, text=True)
+    out = p.stdout + p.stderr
+    assert p.returncode == 1  # c.cps tiene error de sintaxis
+    assert '=== Resumen ===' in out
+    assert '3 archivos, 1 con errores' in out
+    assert '[Syntax]' in out
+    # orden de entrada, no de terminación
+    assert out.index('a.cps') < out.index('c.cps') < out.index('b.cps')
+    assert (tmp_path / 'a.s').exists() and (tmp_path / 'sub' / 'b.s').exists()
+    assert (tmp_path / 'a.s').read_text() == (tmp_path / 'sub' / 'b.s').read_text()
+
+
+def test_batch_stream_writes_without_printing_the_program(tmp_path):
+    (tmp_path / 'a.cps').write_text(GOOD, encoding='utf-8')
+    (tmp_path / 'b.cps').write_text(GOOD, encoding='utf-8')
+    p = subprocess.run([sys.executable, '-m', ROOT.name, '--jobs', '2', '--mips', '--stream', '--verbose',
+                        str(tmp_path)], cwd=str(ROOT.parent), capture_output=True, text=True)
+    out = p.stdout + p.stderr
+    assert p.returncode == 0
+    # en streaming cada worker solo informa la ruta del .s que escribió
+    assert out.count('[MIPS] ') == 2 and '.data' not in out
+    assert (tmp_path / 'a.s').read_text() == (tmp_path / 'b.s').read_text()
+    assert '.data' in (tmp_path / 'a.s').read_text()
+
+
+def test_cli_checks_pass_names_and_accepts_no_pass(tmp_path):
+    src = tmp_path / 'a.cps'
+    src.write_text(GOOD, encoding='utf-8')
+    for cli in ([sys.executable, '-m', ROOT.name], [sys.executable, str(ROOT / 'Driver.py')]):
+        p = subprocess.run(cli + [str(src), '--passes=typo'], cwd=str(ROOT.parent), capture_output=True, text=True)
+        assert p.returncode != 0 and 'pases desconocidos: typo' in p.stdout + p.stderr
+        p = subprocess.run(cli + [str(src), '-O', '--no-dce', '--no-lvn', '--run', '--no-cache'],
+                           cwd=str(ROOT.parent), capture_output=True, text=True)
+        assert p.returncode == 0 and '1' in p.stdout
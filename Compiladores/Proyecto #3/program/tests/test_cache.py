@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from session import CompilationSession
+from codegen.cache import ArtifactCache
+
+CODE = "let a: integer = 5;\nlet b = a + 2;\nprint(b);\n"
+
+
+def test_hit_skips_front_end_and_returns_same_artifacts(tmp_path, monkeypatch):
+    cache = ArtifactCache(str(tmp_path))
+    first = CompilationSession.from_source(CODE, cache=cache)
+    mips = first.mips()
+    tac = str(first.emitter)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    import session as session_mod
+    monkeypatch.setattr(session_mod.CompiscriptParser, 'program',
+                        lambda self: (_ for _ in ()).throw(AssertionError('front end ejecutado')))
+    second = CompilationSession.from_source(CODE, cache=cache)
+    assert second.mips() == mips
+    assert str(second.emitter) == tac
+    assert second.static_arrays == first.static_arrays
+    assert second.syntax_errors == []
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_source_and_options(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    k = cache.key(CODE)
+    assert k == cache.key(CODE, {})
+    assert k != cache.key(CODE + ' ')
+    assert k != cache.key(CODE, {'opt': ['fold']})
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=10 ** 9)
+    payload = {'blob': 'x' * 1000}
+    for name in ('a', 'b', 'c'):
+        cache.put(name, payload)
+        past = time.time() - 100 + ord(name)
+        os.utime(tmp_path / f'{name}.json', (past, past))
+    assert cache.get('a') is not None  # 'a' pasa a ser el más reciente
+    cache.max_bytes = 2500
+    cache.evict()
+    assert sorted(p.name for p in tmp_path.glob('*.json')) == ['a.json', 'c.json']
+    assert cache.evictions == 1
+
+
+def test_tac_only_run_fills_the_cache_and_mips_completes_it(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    tac = str(CompilationSession.from_source(CODE, cache=cache).emitter)
+    entry = cache.get(cache.key(CODE))
+    assert entry['tac'] and entry['mips'] is None
+
+    second = CompilationSession.from_source(CODE, cache=cache)
+    assert str(second.emitter) == tac
+    mips = second.mips()
+    assert cache.get(cache.key(CODE))['mips'] == mips
+
+
+def test_streamed_write_is_stored(tmp_path):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    out = tmp_path / 'p.s'
+    CompilationSession.from_source(CODE, cache=cache).write_mips(str(out))
+    assert cache.get(cache.key(CODE))['mips'] == out.read_text(encoding='utf-8')
+    again = tmp_path / 'q.s'
+    CompilationSession.from_source(CODE, cache=cache).write_mips(str(again))
+    assert again.read_text(encoding='utf-8') == out.read_text(encoding='utf-8')
+
+
+def test_version_covers_every_module_session_imports():
+    from codegen.cache import compiler_sources, ROOT as CACHE_ROOT
+    files = {os.path.relpath(p, CACHE_ROOT).replace(os.sep, '/') for p in compiler_sources()}
+    # dispatch.py y profiling.py no están en codegen/ ni en semantic/, y semantic/ usa
+    # imports relativos
+    assert {'session.py', 'dispatch.py', 'profiling.py', 'CompiscriptParser.py',
+            'codegen/codegen.py', 'codegen/loops.py', 'semantic/visitor.py',
+            'semantic/typesys.py'} <= files
+    assert not any(f.startswith(('tests/', 'benchmarks/', 'ide/')) for f in files)
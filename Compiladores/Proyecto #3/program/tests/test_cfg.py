@@ -0,0 +1,93 @@
+import glob
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from session import CompilationSession
+from codegen.cfg import GLOBAL, build_cfg
+from codegen.tac import Instr
+
+MIPS_PROGRAMS = sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', '*', '*.txt')))
+
+
+def tac_for(path):
+    s = CompilationSession.from_file(path)
+    if s.syntax_errors or not s.analyzed:
+        return None
+    try:
+        return list(s.emitter.instrs)
+    except Exception:
+        return None
+
+
+def shape(unit):
+    """Aristas por posición del bloque (los ids cambian al reconstruir)."""
+    pos = {b: i for i, b in enumerate(unit.blocks)}
+    return [sorted(pos[s] for s in b.succs) for b in unit.blocks]
+
+
+@pytest.mark.parametrize('path', MIPS_PROGRAMS, ids=os.path.basename)
+def test_cfg_invariants_on_mips_programs(path):
+    tac = tac_for(path)
+    if tac is None:
+        pytest.skip('el programa no genera TAC')
+    cfg = build_cfg(tac)
+    assert [str(i) for i in cfg.instructions()] == [str(i) for i in tac]
+    for unit in cfg:
+        if unit.name != GLOBAL:
+            assert unit.entry.label == unit.name
+        for b in unit.blocks:
+            if b.label:
+                assert unit.block_of(b.label) is b
+            for s in b.succs:
+                assert b in s.preds
+            for p in b.preds:
+                assert b in p.succs
+        for b in unit.reverse_postorder():
+            assert unit.dominates(unit.entry, b)
+        for loop in unit.loops():
+            assert all(unit.dominates(loop.header, b) for b in loop.body)
+            assert all(loop.header in l.succs for l in loop.latches)
+
+
+def test_while_with_if_has_one_loop_and_diamond():
+    tac = tac_for(os.path.join(ROOT, 'tests', 'MIPS', 'Complex', 'SentencesControl.txt'))
+    main = build_cfg(tac).function('func_main')
+    loops = main.loops()
+    assert len(loops) == 1
+    header = loops[0].header
+    assert header.label == 'L0'
+    assert main.block_of('L3') in loops[0].body and main.block_of('L1') not in loops[0].body
+    # L3 une las dos ramas del if: su dominador inmediato es el bloque del IFZ
+    join = main.block_of('L3')
+    assert len(join.preds) == 2
+    assert main.idom()[join].terminator.op == 'IFZ'
+
+
+def test_nested_loops_and_functions_are_split():
+    tac = tac_for(os.path.join(ROOT, 'tests', 'NewTests', '3.cps'))
+    cfg = build_cfg(tac)
+    assert set(cfg.functions) == {GLOBAL, 'func_complex'}
+    inner, outer = cfg.function('func_complex').loops()
+    assert inner.parent is outer and inner.depth == 2
+    assert inner.body < outer.body
+
+
+def test_rebuild_block_matches_fresh_build():
+    tac = tac_for(os.path.join(ROOT, 'tests', 'MIPS', 'Complex', 'SentencesControl.txt'))
+    cfg = build_cfg(tac)
+    main = cfg.function('func_main')
+    loop_body = main.block_of('L2')
+    # un salto en medio parte el bloque en dos
+    loop_body.instrs.insert(2, Instr('IFZ', 'L1', 't8'))
+    new_blocks = main.rebuild_block(loop_body)
+    assert len(new_blocks) == 2
+    fresh = build_cfg(cfg.instructions())
+    assert shape(main) == shape(fresh.function('func_main'))
+    assert main.block_of('L1') in new_blocks[0].succs
+    assert len(main.loops()) == 1
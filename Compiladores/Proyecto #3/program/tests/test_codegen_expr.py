@@ -0,0 +1,67 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+TESTS = os.path.dirname(__file__)
+if TESTS not in sys.path:
+    sys.path.insert(0, TESTS)
+
+from session import CompilationSession
+from helpers import tac_of
+
+
+def test_parenthesized_chain_is_lowered_left_to_right(monkeypatch):
+    assert tac_of("print((a + 1) * (b - 2) - a / 3 + 4);", monkeypatch) == [
+        't0 = LOAD a', 't1 = t0 ADD 1',
+        't2 = LOAD b', 't3 = t2 SUB 2',
+        't4 = t1 MUL t3',
+        't5 = LOAD a', 't6 = t5 DIV 3',
+        't7 = t4 SUB t6',
+        't8 = t7 ADD 4',
+        'None = PRINT t8',
+    ]
+
+
+def test_modulo_is_its_own_operation(monkeypatch):
+    assert tac_of("print(a % 3 / b);", monkeypatch) == [
+        't0 = LOAD a', 't1 = t0 MOD 3', 't2 = LOAD b', 't3 = t1 DIV t2', 'None = PRINT t3',
+    ]
+
+
+def test_modulo_runs_as_remainder():
+    code = """function r(a: integer, b: integer): integer { return a % b; }
+function main(): integer {
+    print(7 % 3);
+    print(r(7, 3));
+    print(r(20, 6) * 10 + 17 / 5);
+    let x: integer = 100;
+    print(x % 7 * 2);
+    return 0;
+}
+"""
+    for options in ({}, {'optimize': True, 'peephole': True}, {'convention': 'stack'}):
+        assert CompilationSession.from_source(code, options=options).simulate().output == '11234'
+
+
+def test_calls_and_members_inside_expressions(monkeypatch):
+    assert tac_of("print(k + f(k, 2) + o.m(1) + o.v + xs[i]);", monkeypatch) == [
+        't0 = LOAD k',
+        't1 = LOAD k', 'ARG t1', 'ARG 2', 't2 = CALL func_f',
+        't3 = t0 ADD t2',
+        't4 = LOAD o', 'ARG t4', 'ARG 1', 't5 = CALL method_o_m',
+        't6 = t3 ADD t5',
+        't7 = LOAD o', 'GETPROP t8, t7, "v"',
+        't9 = t6 ADD t8',
+        't10 = LOAD xs', 't11 = i MUL 4', 't12 = t10 ADD t11', 't13 = LOAD t12',
+        't14 = t9 ADD t13',
+        'None = PRINT t14',
+    ]
+
+
+def test_long_chain_keeps_every_operator():
+    terms = 300
+    code = "print(" + " + ".join(["k"] * terms) + ");"
+    tac = tac_of(code)
+    assert sum(1 for line in tac if ' ADD ' in line) == terms - 1
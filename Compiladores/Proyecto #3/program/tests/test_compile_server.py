@@ -0,0 +1,82 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from ide.compile_client import CompileClient, ServerUnavailable, RequestCancelled
+
+GOOD = "let a: integer = 1;\nprint(a);\n"
+BAD = "let a: integer = ;\n"
+
+
+def driver_output(tmp_path, code, *flags):
+    f = tmp_path / 'src.cps'
+    f.write_text(code, encoding='utf-8')
+    p = subprocess.run([sys.executable, os.path.join(ROOT, 'Driver.py'), str(f), *flags],
+                       capture_output=True, text=True)
+    return p.returncode, p.stdout
+
+
+@pytest.fixture
+def client():
+    c = CompileClient(ROOT)
+    yield c
+    c.close()
+
+
+def test_server_matches_driver_output(client, tmp_path):
+    for code, action, flags in ((GOOD, 'tac', ('--tac',)), (BAD, 'compile', ()), (GOOD, 'ast', ('--ast',))):
+        assert client.request(action, code) == driver_output(tmp_path, code, *flags)
+
+
+def test_replies_are_matched_by_request_id(client):
+    ids = [client.submit('tac', GOOD), client.submit('compile', BAD)]
+    assert client.wait(ids[1])[0] == 1
+    rc, out = client.wait(ids[0])
+    assert rc == 0 and 'STORE 1 -> a' in out
+
+
+def test_cancel_queued_request(client):
+    first = client.submit('mips', GOOD)
+    second = client.submit('tac', GOOD)
+    client.cancel(second)
+    assert client.wait(first)[0] == 0
+    with pytest.raises(RequestCancelled):
+        client.wait(second)
+
+
+def test_dead_server_raises_unavailable(tmp_path):
+    c = CompileClient(str(tmp_path))  # no hay server.py: el proceso muere al arrancar
+    with pytest.raises(ServerUnavailable):
+        c.request('compile', GOOD, timeout=10)
+
+
+def test_server_is_restarted_after_dying(client):
+    assert client.request('compile', GOOD)[0] == 0
+    client.proc.kill()
+    client.proc.wait()
+    assert client.request('compile', GOOD)[0] == 0
+
+
+def test_cancel_only_records_pending_requests():
+    import io
+    import json
+    from server import CompileServer
+    lines = [{'id': 1, 'action': 'tac', 'source': GOOD}, {'id': 2, 'action': 'shutdown'}]
+    out = io.StringIO()
+    server = CompileServer(io.StringIO(''.join(json.dumps(m) + '\n' for m in lines)), out)
+    server.serve()
+    replies = {m['id']: m for m in map(json.loads, out.getvalue().splitlines())}
+    assert replies[1]['rc'] == 0
+    # la 1 ya terminó y la 7 nunca existió: no quedan marcadas para siempre
+    server.cancel(1)
+    server.cancel(7)
+    assert server.cancelled == set() and server.queued == set() and server.running is None
+    server.queued.add(3)
+    server.cancel(3)
+    assert server.cancelled == {3}
@@ -0,0 +1,68 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from session import CompilationSession
+from codegen.cfg import build_cfg
+from codegen.dataflow import (Universe, available_expressions, liveness,
+                              reaching_definitions)
+from codegen.tac import Instr
+
+SENTENCES = os.path.join(ROOT, 'tests', 'MIPS', 'Complex', 'SentencesControl.txt')
+
+
+def main_unit():
+    s = CompilationSession.from_file(SENTENCES)
+    return build_cfg(list(s.emitter.instrs)).function('func_main')
+
+
+def test_universe_bitsets_roundtrip():
+    u = Universe(['a', 'b', 'c'])
+    assert u.mask(['a', 'c']) == 0b101
+    assert u.decode(u.mask(['c', 'b'])) == ['b', 'c']
+    assert u.full == 0b111 and len(u) == 3
+
+
+def test_liveness_in_loop():
+    main = main_unit()
+    res = liveness(main)
+    header = main.block_of('L0')
+    live_in = set(res.universe.decode(res.in_[header]))
+    assert {'i', 'acc'} <= live_in
+    # los temporales no cruzan bloques
+    assert not any(x.startswith('t') for x in live_in)
+    assert res.stats.changed_per_iteration[-1] == 0
+
+
+def test_reaching_definitions_of_loop_counter():
+    main = main_unit()
+    res = reaching_definitions(main)
+    header = main.block_of('L0')
+    sites = [(bid, name) for bid, _, name in res.universe.decode(res.in_[header]) if name == 'i']
+    # la inicialización antes del ciclo y el incremento en L3
+    assert sorted(sites) == sorted([(main.entry.id, 'i'), (main.block_of('L3').id, 'i')])
+
+
+def test_available_expressions_across_blocks():
+    main = main_unit()
+    res = available_expressions(main)
+    header = main.block_of('L0')
+    body = [s for s in header.succs if s.label is None][0]
+    load_i = res.universe.bit(('LOAD', 'i', None))
+    assert res.in_[body] & load_i
+    # el incremento de i en L3 mata la expresión antes de volver al encabezado
+    assert not res.in_[header] & load_i
+    assert res.stats.iterations >= 1
+
+
+def test_call_kills_variable_loads():
+    tac = [Instr('LABEL', 'func_f'), Instr('LOAD', 't0', 'x'), Instr('IFZ', 't0', 'L0'),
+           Instr('CALL', 't1', 'func_g'), Instr('LABEL', 'L0'), Instr('RET', 't0'),
+           Instr('LABEL', 'end_f')]
+    unit = build_cfg(tac).function('func_f')
+    res = available_expressions(unit)
+    join = unit.block_of('L0')
+    assert not res.in_[join] & res.universe.bit(('LOAD', 'x', None))
@@ -0,0 +1,25 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from CompiscriptParser import CompiscriptParser
+from codegen.codegen import CodeGenVisitor
+from dispatch import dispatch_table
+from semantic.visitor import SemanticVisitor, EXPRESSION_KINDS
+
+
+def test_table_is_built_once_per_visitor_class():
+    assert SemanticVisitor()._dispatch is SemanticVisitor()._dispatch
+    assert CodeGenVisitor()._dispatch is not SemanticVisitor()._dispatch
+
+
+def test_entries_map_contexts_to_handlers_and_expression_flag():
+    table = dispatch_table(SemanticVisitor, EXPRESSION_KINDS)
+    method, is_expr = table[CompiscriptParser.AdditiveExprContext]
+    assert method is SemanticVisitor.visitAdditiveExpr and is_expr
+    method, is_expr = table[CompiscriptParser.BlockContext]
+    assert method is SemanticVisitor.visitBlock and not is_expr
+    assert table[CompiscriptParser.LeftHandSideContext][1]
@@ -0,0 +1,150 @@
+import glob
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from session import CompilationSession
+from codegen.frames import layout_frames
+from codegen.mips_backend import MIPSBackend
+from codegen.regalloc import allocate
+
+PROGRAMS = sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', '*', '*.txt')) +
+                  glob.glob(os.path.join(ROOT, 'tests', '*.cps')))
+
+FACT = '''let total: integer = 0;
+function fact(n: integer): integer {
+    if (n <= 1) { return 1; }
+    let m: integer = n - 1;
+    return n * fact(m);
+}
+function main(): integer {
+    total = fact(5);
+    print(total);
+    return 0;
+}
+'''
+
+
+def frames_of(session, convention='registers'):
+    instrs = list(session.emitter.instrs)
+    return layout_frames(instrs, allocate(instrs), session.symtab, session.static_arrays, convention)
+
+
+def check_layout(frame):
+    """Todo lo del frame cae dentro de [-size, 0) de $fp y sin solaparse."""
+    offsets = [] if frame.leaf else [frame.ra_offset, frame.fp_offset]
+    offsets += [frame.saved_offset(r) for r in frame.saved]
+    offsets += [frame.var_offset(v) for v in frame.locals]
+    offsets += [frame.slot_offset(k) for k in range(frame.spills)]
+    offsets += [-frame.size + 4 * i for i in range(frame.outgoing)]
+    assert len(set(offsets)) == len(offsets)
+    assert all(-frame.size <= off < 0 for off in offsets)
+    assert frame.size % 8 == 0 and frame.size >= 4 * len(offsets)
+
+
+def stack_convention(src):
+    return CompilationSession.from_source(src, options={'convention': 'stack'})
+
+
+def test_recursive_function_layout():
+    s = CompilationSession.from_source(FACT)
+    fact = frames_of(s, 'stack')['func_fact']
+    assert fact.params == ['n'] and fact.locals == ['n', 'm']
+    assert fact.saved == ['$s0'] and fact.outgoing == 1 and fact.size == 24
+    check_layout(fact)
+
+
+def test_locals_use_fp_offsets_and_globals_keep_labels():
+    s = stack_convention(FACT)
+    out = s.mips()
+    data = out[:out.index('.text')]
+    assert 'total: .word 0' in data and 'n: .word' not in data and 'm: .word' not in data
+    assert 'sw $t0, total' in out
+    # n se copia del área del llamador a su slot; m se guarda en el frame
+    assert 'lw $t8, 0($fp)\n    sw $t8, -16($fp)' in out
+    assert 'sw $s0, -20($fp)' in out
+
+
+def test_returns_share_one_epilogue_and_calls_do_not_move_sp():
+    out = stack_convention(FACT).mips()
+    fact = out[out.index('func_fact:'):out.index('main:')]
+    assert fact.count('j func_fact_end') == 2 and fact.count('func_fact_end:') == 1
+    assert fact.count('jr $ra') == 1
+    # el argumento va al área saliente, sin apilar ni desapilar alrededor del jal
+    assert 'sw $t0, 0($sp)\n    jal func_fact' in fact
+    assert fact.count('addi $sp') == 2
+
+
+def test_function_without_end_label_still_gets_epilogue():
+    from codegen.tac import Emitter
+    em = Emitter()
+    em.emit('LABEL', dst='func_f')
+    em.emit('STORE', dst='x', a='1')
+    out = MIPSBackend().emit_from_emitter(em)
+    assert 'func_f_end:' in out and 'jr $ra' in out
+    assert 'x: .word' not in out
+
+
+@pytest.mark.parametrize('path', PROGRAMS, ids=os.path.basename)
+def test_layouts_do_not_overlap(path):
+    s = CompilationSession.from_file(path)
+    if s.syntax_errors or not s.analyzed:
+        pytest.skip('el programa no genera TAC')
+    for convention in ('registers', 'stack'):
+        for frame in frames_of(s, convention).values():
+            check_layout(frame)
+
+
+MANY = '''function five(a: integer, b: integer, c: integer, d: integer, e: integer): integer {
+    return a + b + c + d + e;
+}
+function main(): integer {
+    return five(1, 2, 3, 4, 5);
+}
+'''
+
+
+def test_register_arguments_and_fifth_on_the_stack():
+    s = CompilationSession.from_source(MANY)
+    five = frames_of(s)['func_five']
+    assert five.leaf and five.reg_params == 4 and five.param_offset(4) == 0
+    out = s.mips()
+    callee = out[out.index('func_five:'):out.index('main:')]
+    for k in range(4):
+        assert f"sw $a{k}, {five.ref(five.var_offset('abcd'[k]))}" in callee
+    assert f"lw $t8, {five.size}($sp)" in callee          # e, arriba del frame de la hoja
+    caller = out[out.index('main:'):]
+    assert 'li $t9, 5\n    sw $t9, 0($sp)' in caller       # área saliente
+    assert all(f"li $a{k}, {k + 1}" in caller for k in range(4))
+    assert frames_of(s)['func_main'].outgoing == 1
+
+
+def test_leaf_functions_skip_ra_and_fp():
+    out = CompilationSession.from_source(MANY).mips()
+    callee = out[out.index('func_five:'):out.index('main:')]
+    assert '$ra, ' not in callee and '$fp' not in callee and 'jr $ra' in callee
+    caller = out[out.index('main:'):]
+    assert 'sw $ra, -4($fp)' in caller
+
+
+def test_callee_saved_only_when_used_and_recursion_keeps_ra():
+    out = CompilationSession.from_source(FACT).mips()
+    fact = out[out.index('func_fact:'):out.index('main:')]
+    assert 'sw $ra' in fact and 'sw $s0' in fact and 'sw $a0, -16($fp)' in fact
+    main = out[out.index('main:'):]
+    assert not re.search(r'\$s\d', main)
+
+
+def test_register_convention_shrinks_procedure_calls():
+    path = os.path.join(ROOT, 'tests', 'MIPS', 'BlocCodes', 'ProcedureCalls&Returns.txt')
+    sizes = {c: CompilationSession.from_file(path, options={'convention': c}).mips().count('\n')
+             for c in ('stack', 'registers')}
+    assert sizes['registers'] < sizes['stack']
+    with pytest.raises(ValueError):
+        MIPSBackend(convention='fastcall')
@@ -0,0 +1,273 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+TESTS = os.path.dirname(__file__)
+if TESTS not in sys.path:
+    sys.path.insert(0, TESTS)
+
+import pytest
+
+from session import CompilationSession
+from codegen.cfg import build_cfg
+from codegen.optimize import PASSES, optimize
+from codegen.tac import Instr
+from helpers import PROGRAMS, compiled, run_tac
+
+SUM = '''function main(): integer {
+    let xs: integer[] = [4, 8, 15, 16, 23, 42];
+    let i: integer = 0;
+    let s: integer = 0;
+    while (i < 6) {
+        s = s + xs[i] * 2;
+        i = i + 1;
+    }
+    print(s);
+    print(xs[2]);
+    return 0;
+}
+'''
+
+NESTED = '''function main(): integer {
+    let xs: integer[] = [4, 8, 15, 16, 23, 42];
+    let ys: integer[] = [1, 2, 3, 4, 5, 6];
+    let i: integer = 5;
+    let s: integer = 0;
+    while (i >= 0) {
+        s = s + xs[i] * ys[i];
+        i = i - 1;
+    }
+    print(s);
+    let k: integer = 0;
+    while (k < 3) {
+        let j: integer = 0;
+        while (j < 6) {
+            s = s + xs[j] + k;
+            j = j + 2;
+        }
+        print(ys[k + 1]);
+        k = k + 1;
+    }
+    print(s);
+    let n: integer = 0;
+    while (n < 6) { xs[n] = ys[n] * 8; n = n + 1; }
+    print(xs[5]); print(n);
+    return 0;
+}
+'''
+
+SCALE = '''function scale(n: integer, k: integer): integer {
+    let s: integer = 0;
+    let i: integer = 0;
+    while (i < n * 2) {
+        let j: integer = 0;
+        while (j < k + 1) {
+            s = s + n * k + i * 3;
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    return s;
+}
+function main(): integer {
+    print(scale(3, 4));
+    print(scale(0, 5));
+    return 0;
+}
+'''
+WITHOUT_LICM = [p for p in PASSES if p != 'licm']
+
+
+def loop_body(opt, header='L0'):
+    names = [str(i) for i in opt]
+    start = names.index(f'{header}:')
+    return names[start:names.index(f'GOTO {header}', start) + 1]
+
+
+def test_multiply_by_power_of_two_becomes_shift():
+    tac = [Instr('LABEL', 'func_f'), Instr('LOAD', 't0', 'a'), Instr('MUL', 't1', 't0', '8'),
+           Instr('MUL', 't2', '2', 't0'), Instr('MUL', 't3', 't0', '6'), Instr('MUL', 't4', 't0', '1'),
+           Instr('ADD', 't5', 't1', 't2'), Instr('ADD', 't6', 't5', 't3'), Instr('ADD', 't7', 't6', 't4'),
+           Instr('PRINT', a='t7'), Instr('RET'), Instr('LABEL', 'end_f')]
+    opt, report = optimize(tac, passes=['strength'])
+    names = [str(i) for i in opt]
+    assert 't1 = t0 SHL 3' in names and 't2 = t0 SHL 1' in names
+    assert 't3 = t0 MUL 6' in names and 't4 = t0 MUL 1' in names
+    assert report.passes['strength'].rewritten == 2
+    assert run_tac(opt[1:-1], {}) == run_tac(tac[1:-1], {})
+
+
+def test_array_walk_uses_a_pointer():
+    tac, arrays = compiled(source=SUM)
+    opt, report = optimize(tac)
+    body = loop_body(opt)
+    # ni la base del arreglo ni i*4 se recalculan en la vuelta
+    assert not any('LOAD xs' in line or 'MUL' in line for line in body)
+    pointer = [line.split(' = ')[0] for line in body if line.endswith('ADD 4')]
+    assert len(pointer) == 1 and f'= LOAD {pointer[0]}' in ' '.join(body)
+    # la base la saca licm antes; ivs solo cambia el acceso por el puntero
+    assert report.passes['ivs'].rewritten == 1 and report.passes['licm'].hoisted >= 1
+    # lo que los pases de ciclos agregan se cuenta aparte, nunca como eliminadas negativas
+    assert all(p.removed >= 0 for p in report.passes.values())
+    assert report.passes['ivs'].added + report.passes['licm'].added > 0
+    assert 'agregadas' in str(report) and 'eliminadas    -' not in str(report)
+    prints, variables, _ = run_tac(opt, arrays)
+    assert run_tac(opt, arrays) == run_tac(tac, arrays)
+    assert prints == [216, 15] and variables['i'] == 6
+
+
+def test_preheader_is_created_when_the_loop_has_two_entries():
+    tac = [Instr('LABEL', 'func_f'), Instr('STORE', 'i', '0'), Instr('LOAD', 't0', 'c'),
+           Instr('IFZ', 'L0', 't0'), Instr('STORE', 'i', '2'),
+           Instr('LABEL', 'L0'), Instr('LOAD', 't1', 'i'), Instr('LT', 't2', 't1', '6'),
+           Instr('IFZ', 'L1', 't2'),
+           Instr('LOAD', 't3', 'xs'), Instr('LOAD', 't4', 'i'), Instr('MUL', 't5', 't4', '4'),
+           Instr('ADD', 't6', 't3', 't5'), Instr('LOAD', 't7', 't6'), Instr('PRINT', a='t7'),
+           Instr('LOAD', 't8', 'i'), Instr('ADD', 't9', 't8', '1'), Instr('STORE', 'i', 't9'),
+           Instr('GOTO', 'L0'), Instr('LABEL', 'L1'), Instr('RET'), Instr('LABEL', 'end_f')]
+    unit = build_cfg(tac).function('func_f')
+    loop = unit.loops()[0]
+    pre = unit.preheader(loop)
+    assert pre.label == 'L0_pre' and pre.succs == [loop.header]
+    assert [b for b in loop.header.preds if b not in loop.body] == [pre]
+
+    opt, _ = optimize(tac)
+    names = [str(i) for i in opt]
+    assert 'L0_pre:' in names and names.index('L0_pre:') < names.index('L0:')
+    arrays = {'xs': [5, 6, 7, 8, 9, 10]}
+    for c in (0, 1):
+        run = [Instr('STORE', 'c', str(c))]
+        assert run_tac(run + opt[1:-1], arrays) == run_tac(run + tac[1:-1], arrays)
+
+
+def test_loops_with_calls_are_left_alone():
+    tac, _ = compiled(source='''function g(): integer { return 1; }
+function main(): integer {
+    let xs: integer[] = [1, 2, 3];
+    let i: integer = 0;
+    while (i < 3) { print(xs[i] + g()); i = i + 1; }
+    return 0;
+}
+''')
+    _, report = optimize(tac)
+    assert report.passes['ivs'].rewritten == 0
+
+
+@pytest.mark.parametrize('convention', ['registers', 'stack'])
+@pytest.mark.parametrize('source', [SUM, NESTED], ids=['sum', 'nested'])
+def test_mips_output_is_unchanged_and_runs_faster(source, convention):
+    plain = CompilationSession.from_source(source, options={'convention': convention})
+    opt = CompilationSession.from_source(source, options={'convention': convention, 'optimize': True})
+    no_loops = CompilationSession.from_source(source, options={
+        'convention': convention, 'optimize': ['constprop', 'copyprop', 'lvn', 'dce']})
+    a, b, c = plain.simulate(), opt.simulate(), no_loops.simulate()
+    assert a.output == b.output == c.output
+    assert b.steps < c.steps
+
+
+@pytest.mark.parametrize('path', PROGRAMS, ids=os.path.basename)
+def test_loop_passes_keep_corpus_behaviour(path):
+    got = compiled(path)
+    if got is None:
+        pytest.skip('el programa no genera TAC')
+    tac, arrays = got
+    opt, _ = optimize(tac, passes=['ivs', 'strength', 'copyprop', 'dce'])
+    assert run_tac(opt, arrays) == run_tac(tac, arrays)
+
+
+def counted_loop(body, before=(), header=()):
+    """`while (i < 3) { body; i = i + 1; }` en TAC, con `c` = 0 saltándose el ciclo;
+    `header` va en la cabecera, antes de la condición."""
+    return ([Instr('LABEL', 'func_f'), *before, Instr('STORE', 'i', '0'),
+             Instr('LOAD', 't0', 'c'), Instr('IFZ', 'L1', 't0'),
+             Instr('LABEL', 'L0'), *header, Instr('LOAD', 't1', 'i'), Instr('LT', 't2', 't1', '3'),
+             Instr('IFZ', 'L1', 't2'), *body,
+             Instr('LOAD', 't8', 'i'), Instr('ADD', 't9', 't8', '1'), Instr('STORE', 'i', 't9'),
+             Instr('GOTO', 'L0'), Instr('LABEL', 'L1'), Instr('LOAD', 't9', 's'), Instr('PRINT', a='t9'),
+             Instr('RET'), Instr('LABEL', 'end_f')])
+
+
+def same_behaviour(tac, opt):
+    for c in ('0', '1'):
+        run = [Instr('STORE', 'c', c), Instr('STORE', 'n', '5'), Instr('STORE', 's', '1')]
+        assert run_tac(run + opt[1:-1]) == run_tac(run + tac[1:-1])
+
+
+def test_invariant_arithmetic_and_loads_leave_the_loop():
+    tac = counted_loop([Instr('LOAD', 't3', 'n'), Instr('MUL', 't4', 't3', '7'),
+                        Instr('ADD', 't5', 't4', 't3'), Instr('LOAD', 't6', 's'),
+                        Instr('ADD', 't7', 't6', 't5'), Instr('STORE', 's', 't7')])
+    opt, report = optimize(tac, passes=['licm', 'copyprop', 'dce'])
+    names = [str(i) for i in opt]
+    # el bloque del IFZ tiene dos sucesores: se genera el preheader
+    assert names.index('L0_pre:') == names.index('L0:') - 4
+    assert not any('LOAD n' in line or 'MUL' in line for line in loop_body(opt))
+    assert report.passes['licm'].hoisted == 3
+    same_behaviour(tac, opt)
+
+
+BOX = [Instr('NEWOBJ', 't10', 'Box'), Instr('SETPROP', 't10', '"n"', '4')]
+READ_N = [Instr('GETPROP', 't3', 't10', '"n"')]
+ADD_N = [Instr('LOAD', 't6', 's'), Instr('ADD', 't7', 't6', 't3'), Instr('STORE', 's', 't7')]
+
+
+@pytest.mark.parametrize('tac,hoisted', [
+    (counted_loop(ADD_N, BOX, READ_N), 1),
+    # en el cuerpo no domina la salida: con c = 0 nunca se ejecuta
+    (counted_loop(READ_N + ADD_N, BOX), 0),
+    # el ciclo escribe propiedades
+    (counted_loop(ADD_N + [Instr('SETPROP', 't10', '"n"', 't7')], BOX, READ_N), 0),
+], ids=['header', 'body', 'setprop'])
+def test_property_read_leaves_the_loop_only_when_safe(tac, hoisted):
+    opt, report = optimize(tac, passes=['licm', 'copyprop', 'dce'])
+    assert report.passes['licm'].hoisted == hoisted
+    assert any('GETPROP' in line for line in loop_body(opt)) == (not hoisted)
+    same_behaviour(tac, opt)
+
+
+@pytest.mark.parametrize('body', [
+    [Instr('LOAD', 't3', 's'), Instr('ADD', 't4', 't3', '1'), Instr('STORE', 's', 't4')],
+    [Instr('CALL', 't5', 'func_g'), Instr('LOAD', 't3', 'n'), Instr('STORE', 's', 't3')],
+    [Instr('LOAD', 't3', 'n'), Instr('DIV', 't4', '10', 't3'), Instr('STORE', 's', 't4')],
+], ids=['stored', 'call', 'div'])
+def test_what_may_change_or_fail_stays(body):
+    tac = counted_loop(body)
+    opt, report = optimize(tac, passes=['licm'])
+    names = loop_body(opt)
+    kept = [str(ins) for ins in body if ins.op != 'LOAD' or ins.a == 's' or body[0].op == 'CALL']
+    assert all(line in names for line in kept)
+    # solo puede salir `LOAD n` (en el caso de la división)
+    assert report.passes['licm'].hoisted == (1 if body[1].op == 'DIV' else 0)
+    same_behaviour(tac, opt)
+
+
+def test_recycled_temporary_keeps_its_value_from_before_the_loop():
+    # t3 entra al ciclo con el valor de antes y se redefine (invariante) más abajo
+    tac = counted_loop([Instr('LOAD', 't6', 's'), Instr('ADD', 't7', 't6', 't3'),
+                        Instr('STORE', 's', 't7'), Instr('LOAD', 't4', 'n'),
+                        Instr('MUL', 't3', 't4', '2')], [Instr('MOV', 't3', '100')])
+    opt, report = optimize(tac, passes=['licm', 'copyprop', 'dce'])
+    assert report.passes['licm'].hoisted == 2
+    same_behaviour(tac, opt)
+
+
+@pytest.mark.parametrize('convention', ['registers', 'stack'])
+def test_nested_loops_hoist_to_each_level(convention):
+    tac = CompilationSession.from_source(SCALE, options={'optimize': True}).emitter.instrs
+    names = [str(i) for i in tac]
+    outer, inner = names.index('L0:'), names.index('L2:')
+    # n*k sale de los dos ciclos; i*3 solo del interno
+    assert any(' MUL ' in line and 'LOAD' not in line for line in names[:outer])
+    assert not any(' MUL ' in line for line in names[inner:names.index('GOTO L2')])
+    plain = CompilationSession.from_source(SCALE, options={'convention': convention}).simulate()
+    without = CompilationSession.from_source(
+        SCALE, options={'convention': convention, 'optimize': WITHOUT_LICM}).simulate()
+    opt = CompilationSession.from_source(SCALE, options={'convention': convention, 'optimize': True})
+    got = opt.simulate()
+    assert plain.output == without.output == got.output == '5850'
+    assert got.steps < without.steps
+    assert opt.optimization.passes['licm'].hoisted >= 4
+    assert opt.optimization.as_dict()['passes'][3]['hoisted'] >= 4
+    assert 'al preheader' in str(opt.optimization)
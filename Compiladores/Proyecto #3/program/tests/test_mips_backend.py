@@ -1,3 +1,4 @@
+import glob
 import os
 import re
 import sys
@@ -6,10 +7,16 @@ ROOT = os.path.dirname(os.path.dirname(__file__))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from codegen.mips_backend import emit_mips
+import pytest
+
+from codegen.mips_backend import MIPSBackend, emit_mips
+from codegen.simulator import run_text
 from codegen.tac import Emitter
 from semantic.symbols import SymbolTable, VarSymbol, FuncSymbol
 from semantic.typesys import INTEGER
+from session import CompilationSession
+
+PROGRAMS = sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', '*', '*.txt')))
 
 
 def test_call_uses_stack_cleanup():
@@ -18,7 +25,7 @@ def test_call_uses_stack_cleanup():
     em.emit('ARG', a='10')
     em.emit('CALL', dst='t0', a='func_demo')
 
-    out = emit_mips(em)
+    out = emit_mips(em, convention='stack')
 
     assert 'addi $sp, $sp, -4' in out  # push args
     assert out.count('sw') >= 2  # two pushes
@@ -30,11 +37,13 @@ def test_call_uses_stack_cleanup():
 def test_spills_allocate_frame_slots():
     em = Emitter()
     em.emit('LABEL', dst='func_heavy')
-    # Generar más temporales que registros disponibles para forzar spills
-    for i in range(12):
+    # Generar más temporales vivos que registros disponibles para forzar spills
+    for i in range(24):
         em.emit('STORE', dst=f't{i}', a=str(i))
+    for i in range(1, 24):
+        em.emit('ADD', dst=f't{23 + i}', a=f't{22 + i}' if i > 1 else 't0', b=f't{i}')
 
-    out = emit_mips(em)
+    out = emit_mips(em, convention='stack')
 
     # Debe reservar un frame mayor que el mínimo (8 bytes)
     assert re.search(r"addi \$sp, \$sp, -[1-9][0-9]+", out)
@@ -47,7 +56,7 @@ def test_return_jumps_to_epilogue():
     em.emit('LABEL', dst='func_ret')
     em.emit('RET', dst='1')
 
-    out = emit_mips(em)
+    out = emit_mips(em, convention='stack')
 
     assert 'j func_ret_end' in out
     assert 'func_ret_end:' in out
@@ -85,7 +94,7 @@ def test_parameters_are_loaded_into_locals_and_use_frame_offsets():
     em.emit('CALL', dst='t7', a='func_Suma')
     em.emit('STORE', dst='res', a='t7')
 
-    out = emit_mips(em, symtab=symtab)
+    out = emit_mips(em, symtab=symtab, convention='stack')
 
     # parámetros se cargan desde offsets positivos (argumentos) y se guardan en slots locales
     assert 'ARG0_OFF' not in out and 'ARG1_OFF' not in out and 'ARG2_OFF' not in out
@@ -95,3 +104,74 @@ def test_parameters_are_loaded_into_locals_and_use_frame_offsets():
     assert re.search(r"-\d+\(\$fp\)", out)
     # la sección .data debe incluir la variable global
     assert '.data' in out and 'res: .word 0' in out
+
+
+@pytest.mark.parametrize('path', PROGRAMS, ids=os.path.basename)
+def test_streaming_writes_the_same_program(path, tmp_path):
+    s = CompilationSession.from_file(path)
+    if s.syntax_errors or not s.analyzed:
+        pytest.skip('el programa no genera TAC')
+    text = emit_mips(s.emitter, static_arrays=s.static_arrays)
+    out = tmp_path / 'out.s'
+    assert emit_mips(s.emitter, out_path=str(out), static_arrays=s.static_arrays, stream=True) == str(out)
+    assert out.read_text(encoding='utf-8') == text
+    lines = emit_mips(s.emitter, static_arrays=s.static_arrays, stream=True)
+    assert not isinstance(lines, str)
+    assert '\n'.join(lines) + '\n' == text
+
+
+def test_session_write_mips_streams_without_keeping_the_text(tmp_path):
+    path = os.path.join(ROOT, 'tests', 'MIPS', 'Complex', 'Arrays.txt')
+    out = tmp_path / 'Arrays.s'
+    s = CompilationSession.from_file(path)
+    assert s.write_mips(str(out)) == str(out)
+    assert s._mips is None and s.register_allocation is not None
+    assert out.read_text(encoding='utf-8') == CompilationSession.from_file(path).mips()
+
+
+def test_relational_condition_fuses_into_one_branch():
+    path = os.path.join(ROOT, 'tests', 'MIPS', 'Complex', 'SentencesControl.txt')
+    s = CompilationSession.from_file(path)
+    out = s.mips()
+    # while (i <= 10) e if (i % 2 == 0): salto invertido directo, sin sle/seq + beq
+    assert re.search(r"lw \$t\d, 4\(\$sp\)\n    bgt \$t\d, 10, L1", out)
+    assert re.search(r"mfhi (\$t\d)\n    bne \1, \$zero, L2", out)
+    assert 'sle' not in out and 'seq' not in out and 'beq' not in out
+
+    plain = MIPSBackend(s.symtab, fuse_branches=False)
+    old = plain.emit_from_emitter(s.emitter, static_arrays=s.static_arrays)
+    assert plain.fused_branches == 0 and 'sle' in old
+    a, b = run_text(old), run_text(out)
+    assert a.output == b.output and b.steps < a.steps
+
+
+def test_condition_used_after_the_branch_is_not_fused():
+    em = Emitter()
+    em.emit('LABEL', dst='func_main')
+    em.emit('LT', dst='t0', a='5', b='7')
+    em.emit('IFZ', dst='L0', a='t0')
+    em.emit('PRINT', a='t0')
+    em.emit('LABEL', dst='L0')
+    em.emit('GE', dst='t1', a='3', b='t0')
+    em.emit('IFZ', dst='L1', a='t1')
+    em.emit('PRINT', a='"si"')
+    em.emit('LABEL', dst='L1')
+    em.emit('RET', dst='0')
+    em.emit('LABEL', dst='end_main')
+    backend = MIPSBackend()
+    out = backend.emit_from_emitter(em)
+    assert backend.fused_branches == 1
+    assert 'slt $t0, $t9, $t8\n    beq $t0, $zero, L0' in out
+    # inmediato a la izquierda: se carga en un scratch; 3 >= t0 salta con blt
+    assert 'li $t9, 3\n    blt $t9, $t0, L1' in out
+    assert run_text(out).output == '1si'
+
+
+def test_indexed_operand_is_rejected():
+    # los accesos a arreglos llegan como direcciones calculadas, nunca como xs[2]
+    em = Emitter()
+    em.emit('LABEL', dst='func_main')
+    em.emit('PRINT', a='xs[2]')
+    em.emit('LABEL', dst='end_main')
+    with pytest.raises(ValueError, match=r'operando de arreglo no soportado: xs\[2\]'):
+        MIPSBackend().emit_from_emitter(em, static_arrays={'xs': ['4', '8', '15']})
@@ -0,0 +1,112 @@
+import glob
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+BENCH = os.path.join(ROOT, 'benchmarks')
+if BENCH not in sys.path:
+    sys.path.insert(0, BENCH)
+TESTS = os.path.dirname(__file__)
+if TESTS not in sys.path:
+    sys.path.insert(0, TESTS)
+
+import pytest
+
+from session import CompilationSession
+from codegen.optimize import PASSES, fold, optimize
+from codegen.tac import Instr
+from synth import generate_program
+from helpers import PROGRAMS, compiled, run_tac
+
+COMPLEX = sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', 'Complex', '*.txt')))
+
+
+@pytest.mark.parametrize('path', PROGRAMS, ids=os.path.basename)
+def test_optimized_tac_behaves_the_same(path):
+    got = compiled(path)
+    if got is None:
+        pytest.skip('el programa no genera TAC')
+    tac, arrays = got
+    opt, report = optimize(tac)
+    assert report.after == len(opt) <= len(tac)
+    assert run_tac(opt, arrays) == run_tac(tac, arrays)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_optimized_synthetic_programs_behave_the_same(seed):
+    src = generate_program(functions=3, classes=1, depth=3, chain=12, array=6, loops=2, seed=seed)
+    tac, arrays = compiled(source=src)
+    opt, _ = optimize(tac)
+    assert run_tac(opt, arrays) == run_tac(tac, arrays)
+
+
+def test_constants_fold_through_variables():
+    tac, _ = compiled(os.path.join(ROOT, 'tests', 'MIPS', 'Complex', 'Arit.txt'))
+    opt, report = optimize(tac)
+    assert [str(i) for i in opt] == ['func_main:', 'STORE 10 -> x', 'STORE 4 -> y', 'STORE 2 -> z',
+                                     'STORE 69 -> r', 'RETURN 69', 'end_main:']
+    assert report.passes['dce'].removed > 0 and report.passes['constprop'].rewritten > 0
+
+
+def test_modulo_folds_like_the_machine():
+    assert fold('MOD', 7, 3) == 1 and fold('MOD', -7, 3) == -1 and fold('MOD', 7, -3) == 1
+    assert fold('MOD', 7, 0) is None
+    assert fold('DIV', 7, 3) == 2
+
+
+def test_lvn_reuses_loads_and_array_base():
+    tac = [Instr('LABEL', 'func_f'), Instr('LOAD', 't0', 'xs'), Instr('MUL', 't1', 'i', '4'),
+           Instr('ADD', 't2', 't0', 't1'), Instr('LOAD', 't3', 't2'),
+           Instr('LOAD', 't4', 'xs'), Instr('MUL', 't5', 'i', '4'),
+           Instr('ADD', 't6', 't4', 't5'), Instr('LOAD', 't7', 't6'),
+           Instr('ADD', 't8', 't3', 't7'), Instr('RET', 't8'), Instr('LABEL', 'end_f')]
+    opt, report = optimize(tac, passes=['lvn', 'copyprop', 'dce'])
+    assert [str(i) for i in opt] == ['func_f:', 't0 = LOAD xs', 't1 = i MUL 4', 't2 = t0 ADD t1',
+                                     't3 = LOAD t2', 't8 = t3 ADD t3', 'RETURN t8', 'end_f:']
+    assert report.passes['lvn'].rewritten == 4
+
+
+def test_call_invalidates_variable_values():
+    tac = [Instr('LABEL', 'func_f'), Instr('STORE', 'g', '1'), Instr('CALL', 't0', 'func_g'),
+           Instr('LOAD', 't1', 'g'), Instr('RET', 't1'), Instr('LABEL', 'end_f')]
+    opt, _ = optimize(tac)
+    assert 't1 = LOAD g' in [str(i) for i in opt]
+
+
+def test_constant_branch_is_folded_and_dead_block_dropped():
+    tac = [Instr('LABEL', 'func_f'), Instr('MOV', 't0', '0'), Instr('IFZ', 'L0', 't0'),
+           Instr('PRINT', a='1'), Instr('LABEL', 'L0'), Instr('PRINT', a='2'), Instr('RET'),
+           Instr('LABEL', 'end_f')]
+    opt, _ = optimize(tac)
+    assert 'PRINT' not in [i.op for i in opt[:3]]
+    assert [i.a for i in opt if i.op == 'PRINT'] == ['2']
+
+
+def test_passes_are_toggleable():
+    tac, _ = compiled(os.path.join(ROOT, 'tests', 'MIPS', 'Complex', 'Arrays.txt'))
+    none, report = optimize(tac, passes=[])
+    assert none == tac and report.removed == 0
+    only_dce, report = optimize(tac, passes=['dce'])
+    assert set(report.passes) == {'dce'}
+    full, _ = optimize(tac)
+    assert len(full) < len(only_dce)
+    with pytest.raises(ValueError):
+        optimize(tac, passes=['nope'])
+
+
+def test_session_option_and_complex_mips_shrinks():
+    total_before = total_after = 0
+    for path in COMPLEX:
+        plain = CompilationSession.from_file(path)
+        opt = CompilationSession.from_file(path, options={'optimize': True})
+        if plain.syntax_errors or not plain.analyzed:
+            continue
+        before = plain.mips().count('\n')
+        after = opt.mips().count('\n')
+        assert after <= before, path
+        assert opt.optimization is not None
+        total_before += before
+        total_after += after
+    assert total_after < total_before * 0.9
@@ -0,0 +1,214 @@
+import glob
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from session import CompilationSession
+from codegen.mips_backend import MIPSBackend
+from codegen.peephole import RULES, Rule, peephole
+from codegen.simulator import DATA_BASE, STACK_TOP, TEXT_BASE, SimulationError, run_text
+
+PROGRAMS = sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', '*', '*.txt')) +
+                  glob.glob(os.path.join(ROOT, 'tests', '*.cps')))
+
+LOOPS = '''function fact(n: integer): integer {
+    if (n <= 1) { return 1; }
+    let m: integer = n - 1;
+    return n * fact(m);
+}
+function main(): integer {
+    let xs: integer[] = [4, 8, 15, 16, 23, 42];
+    let i: integer = 0;
+    let s: integer = 0;
+    while (i < 6) {
+        s = s + xs[i] * 4 - 3;
+        if (s > 100) { print(s); }
+        i = i + 1;
+    }
+    print(fact(6));
+    return s;
+}
+'''
+
+
+def data_words(result):
+    """Palabras finales de .data y del heap (la pila queda fuera). Las direcciones de
+    código (tablas de saltos) se corren al encoger el .text y no se comparan."""
+    return {addr: v for addr, v in result.memory.items()
+            if addr < STACK_TOP // 2 and not TEXT_BASE <= v < DATA_BASE}
+
+
+def opt(text):
+    lines, stats = peephole(['    ' + ln if not ln.endswith(':') else ln for ln in text.strip().splitlines()])
+    return [ln.strip() for ln in lines], stats
+
+
+@pytest.mark.parametrize('before,after,rule', [
+    ('move $t1, $t1', [], 'self-move'),
+    ('sw $t0, x\nlw $t0, x', ['sw $t0, x'], 'store-load'),
+    ('sw $t0, -12($fp)\nlw $t2, -12($fp)', ['sw $t0, -12($fp)', 'move $t2, $t0'], 'store-forward'),
+    ('li $t8, 3\nsub $t1, $t0, $t8', ['addi $t1, $t0, -3'], 'imm-sub'),
+    ('li $t8, 7\nslt $t1, $t0, $t8', ['slti $t1, $t0, 7'], 'imm-slt'),
+    ('li $t8, 4\nmul $t1, $t0, $t8', ['sll $t1, $t0, 2'], 'mul-pow2'),
+    ('li $t1, 2\nmul $t1, $t1, 4', ['li $t1, 8'], 'li-shift'),
+    ('j L1\nL1:', ['L1:'], 'jump-next'),
+    ('j f_end\nend_f:\nf_end:', ['end_f:', 'f_end:'], 'jump-next-label'),
+    ('beq $t0, $zero, L1\nj L2\nL1:', ['bne $t0, $zero, L2', 'L1:'], 'branch-over-jump-beq'),
+    ('bge $t0, 10, L1\nj L2\nL1:', ['blt $t0, 10, L2', 'L1:'], 'branch-over-jump-bge'),
+    ('j L2\nli $t0, 1\nmove $a0, $t0\nL3:', ['j L2', 'L3:'], 'dead-after-jump'),
+])
+def test_rules(before, after, rule):
+    got, stats = opt(before)
+    assert got == after
+    assert stats.hits[rule] >= 1
+    assert stats.before - stats.after == stats.removed
+
+
+GOLDEN_DATA = ['.data', 'x: .word 4', 'y: .word 0', '', '.text', '.globl main']
+
+
+def golden_program(body, shown=('$t1',)):
+    """.text de un programa completo: $t0 = 5, $t2 = 9, el cuerpo y los registros impresos."""
+    lines = ['main:', '    li $t0, 5', '    li $t2, 9']
+    lines += [ln if ln.endswith(':') else f'    {ln}' for ln in body.strip().splitlines()]
+    for reg in shown:
+        lines += [f'    move $a0, {reg}', '    li $v0, 1', '    syscall']
+    return lines + ['    move $a0, $t1', '    li $v0, 17', '    syscall']
+
+
+def branch_case(op):
+    # la condición se prueba en los dos órdenes: $t1 con (5, 9) y $t3 con (9, 5)
+    return f"""li $t1, 0
+{op} $t0, $t2, A1
+j B1
+A1:
+li $t1, 1
+B1:
+li $t3, 0
+{op} $t2, $t0, A2
+j B2
+A2:
+li $t3, 1
+B2:"""
+
+
+TAKEN = {'beq': '00', 'bne': '11', 'blt': '10', 'bge': '01', 'ble': '10', 'bgt': '01'}
+
+GOLDEN = {
+    'self-move': ('li $t1, 3\nmove $t1, $t1', '3'),
+    'add-zero': ('li $t1, 3\naddi $t1, $t1, 0', '3'),
+    'addi-move': ('addi $t1, $t0, 0', '5'),
+    'store-load': ('sw $t0, y\nlw $t0, y\nmove $t1, $t0', '5'),
+    'store-forward': ('sw $t0, y\nlw $t1, y\naddi $t0, $t0, 1\nsw $t0, y', '5'),
+    'load-store': ('lw $t1, x\nsw $t1, x\naddi $t1, $t1, 1', '5'),
+    'li-move': ('li $t8, 7\nmove $t1, $t8', '7'),
+    'move-move': ('move $t8, $t0\nmove $t1, $t8', '5'),
+    'imm-add': ('li $t8, 3\nadd $t1, $t0, $t8', '8'),
+    'imm-add-swap': ('li $t8, 3\nadd $t1, $t8, $t0', '8'),
+    'imm-sub': ('li $t8, 3\nsub $t1, $t0, $t8\nli $t9, -4\nsub $t1, $t1, $t9', '6'),
+    'imm-slt': ('li $t8, 7\nslt $t1, $t0, $t8\nli $t8, 5\nslt $t3, $t0, $t8\nadd $t1, $t1, $t3', '1'),
+    'mul-pow2': ('li $t8, 4\nmul $t1, $t0, $t8', '20'),
+    'mul-pow2-swap': ('li $t8, 4\nmul $t1, $t8, $t0', '20'),
+    'mul-imm-pow2': ('mul $t1, $t0, 8', '40'),
+    'li-shift': ('li $t1, 3\nsll $t1, $t1, 2\nli $t3, -2\nsll $t3, $t3, 1\nadd $t1, $t1, $t3', '8'),
+    'jump-next': ('li $t1, 1\nj L1\nL1:', '1'),
+    'jump-next-label': ('li $t1, 1\nj L2\nL1:\nL2:', '1'),
+    **{f'branch-over-jump-{op}': (branch_case(op), TAKEN[op], ('$t1', '$t3')) for op in TAKEN},
+    'dead-after-jump': ('li $t1, 1\nj L1\nli $t1, 2\naddi $t1, $t1, 5\nL1:', '1'),
+}
+
+
+def test_every_rule_has_a_golden_program():
+    assert set(GOLDEN) == {r.name for r in RULES}
+
+
+@pytest.mark.parametrize('rule', sorted(GOLDEN))
+def test_rule_keeps_golden_output(rule):
+    body, output, *shown = GOLDEN[rule]
+    text = golden_program(body, *shown)
+    optimized, stats = peephole(text)
+    assert stats.hits[rule] >= 1 and len(optimized) <= len(text)
+    plain = run_text('\n'.join(GOLDEN_DATA + text))
+    got = run_text('\n'.join(GOLDEN_DATA + optimized))
+    assert plain.output == got.output == output
+    assert plain.exit_code == got.exit_code
+    assert data_words(got) == data_words(plain)
+    assert got.steps <= plain.steps and got.cycles <= plain.cycles
+
+
+@pytest.mark.parametrize('text', [
+    'sw $t0, x\nL1:\nlw $t1, x',            # una etiqueta corta la ventana
+    'lw $t0, 4($t0)\nsw $t0, 4($t0)',      # la dirección cambia con el lw
+    'li $t0, 3\nsub $t1, $t2, $t0',        # $t0 no es scratch: puede seguir vivo
+    'li $t8, 70000\nadd $t1, $t2, $t8',    # no entra en 16 bits
+    'li $t8, 3\nadd $t1, $t8, $t8',        # el scratch es los dos operandos
+    'li $t8, 6\nmul $t1, $t0, $t8',        # no es potencia de dos
+])
+def test_rules_do_not_fire(text):
+    got, stats = opt(text)
+    assert got == text.splitlines()
+    assert not any(stats.hits.values())
+
+
+def test_rule_table_is_declarative():
+    extra = Rule('nop-out', ['nop'], [])
+    got, stats = peephole(['    nop', '    nop', '    li $t0, 1'], rules=list(RULES) + [extra])
+    assert got == ['    li $t0, 1'] and stats.hits['nop-out'] == 2
+    assert 'nop-out 2' in str(stats)
+    assert stats.as_dict()['hits'] == {'nop-out': 2}
+
+
+def test_comments_and_directives_are_kept():
+    lines = ['main:', '    li $v0, 10                # service: exit', '    syscall', '', '.text']
+    got, _ = peephole(lines)
+    assert got == lines
+
+
+def test_streaming_matches_string_output(tmp_path):
+    s = CompilationSession.from_source(LOOPS)
+    text = MIPSBackend(s.symtab, peephole=True).emit_from_emitter(s.emitter, static_arrays=s.static_arrays)
+    out = tmp_path / 'p.s'
+    backend = MIPSBackend(s.symtab, peephole=True)
+    backend.emit_to_file(s.emitter, str(out), static_arrays=s.static_arrays)
+    assert out.read_text() == text
+    assert backend.peephole.removed > 0
+
+
+def test_session_option_shrinks_and_keeps_output():
+    plain = CompilationSession.from_source(LOOPS)
+    opt_s = CompilationSession.from_source(LOOPS, options={'peephole': True})
+    assert plain.peephole is None
+    a, b = plain.simulate(), opt_s.simulate()
+    assert a.output == b.output == '160249414720'
+    assert b.steps < a.steps and b.cycles < a.cycles
+    assert opt_s.peephole.hits['mul-pow2'] >= 1 and opt_s.peephole.removed > 0
+    assert 'mul' not in b.by_opcode or b.by_opcode['mul'] < a.by_opcode['mul']
+
+
+@pytest.mark.parametrize('convention', ['registers', 'stack'])
+@pytest.mark.parametrize('path', PROGRAMS, ids=os.path.basename)
+def test_corpus_output_is_unchanged(path, convention):
+    s = CompilationSession.from_file(path)
+    if s.syntax_errors or not s.analyzed:
+        pytest.skip('el programa no compila')
+    try:
+        plain = MIPSBackend(s.symtab, convention).emit_from_emitter(s.emitter, static_arrays=s.static_arrays)
+    except Exception:
+        pytest.skip('el backend no genera MIPS')
+    optimized = MIPSBackend(s.symtab, convention, peephole=True).emit_from_emitter(
+        s.emitter, static_arrays=s.static_arrays)
+    assert optimized.count('\n') <= plain.count('\n')
+    try:
+        expected = run_text(plain, max_steps=100000)
+    except SimulationError:
+        pytest.skip('el programa no corre en el simulador')
+    got = run_text(optimized, max_steps=100000)
+    assert got.output == expected.output
+    assert got.exit_code == expected.exit_code
+    assert data_words(got) == data_words(expected)
+    assert got.steps <= expected.steps
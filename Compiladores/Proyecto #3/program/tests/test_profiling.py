@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from profiling import PhaseProfiler, count_tree_nodes
+from session import CompilationSession
+
+CODE = "let a: integer = 5;\nlet b = a + 2;\nprint(b);\n"
+
+
+def test_session_records_each_phase_once():
+    prof = PhaseProfiler()
+    s = CompilationSession.from_source(CODE, profiler=prof)
+    s.mips()
+    s.mips()
+    prof.stop()
+    assert [p['name'] for p in prof.phases] == ['lex', 'parse', 'semantic', 'codegen', 'mips']
+    assert prof.counts['tokens'] == 19
+    assert prof.counts['parse_nodes'] == count_tree_nodes(s.tree)
+    assert prof.counts['tac_instrs'] == len(s.emitter.instrs)
+    assert prof.counts['mips_lines'] > 0
+
+
+def test_driver_profile_json(tmp_path):
+    src = tmp_path / 'p.cps'
+    src.write_text(CODE, encoding='utf-8')
+    out = tmp_path / 'p.json'
+    p = subprocess.run([sys.executable, os.path.join(ROOT, 'Driver.py'), str(src), '--mips', '--no-cache',
+                        '--profile', f'--profile-json={out}'], capture_output=True, text=True)
+    assert p.returncode == 0
+    assert '=== Perfil' in p.stdout
+    data = json.loads(out.read_text())
+    assert {ph['name'] for ph in data['phases']} == {'lex', 'parse', 'semantic', 'codegen', 'mips'}
+    for ph in data['phases']:
+        assert set(ph) == {'name', 'wall_ms', 'cpu_ms', 'peak_kib', 'objects'}
+    assert data['counts']['tac_instrs'] > 0 and data['cache_hit'] is False
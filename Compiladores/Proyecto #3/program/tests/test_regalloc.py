@@ -0,0 +1,109 @@
+import glob
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from session import CompilationSession
+from codegen.cfg import build_cfg
+from codegen.mips_backend import MIPSBackend
+from codegen.regalloc import CALLEE_SAVED, SCRATCH, allocate, linear_scan, live_intervals
+from codegen.tac import Emitter, Instr
+
+PROGRAMS = sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', '*', '*.txt')))
+
+
+def pressure(n, call=False):
+    """Función con `n` temporales vivos a la vez (opcionalmente a través de un CALL)."""
+    tac = [Instr('LABEL', 'func_heavy')]
+    tac += [Instr('LOAD', f't{i}', f'v{i}') for i in range(n)]
+    if call:
+        tac.append(Instr('CALL', f't{n}', 'func_other'))
+    acc = 't0'
+    for i in range(1, n):
+        dst = f't{n + i}'
+        tac.append(Instr('ADD', dst, acc, f't{i}'))
+        acc = dst
+    tac += [Instr('RET', acc), Instr('LABEL', 'end_heavy')]
+    return tac
+
+
+def check_invariants(unit):
+    intervals, _ = live_intervals(unit)
+    linear_scan(intervals)
+    regs = [iv for iv in intervals.values() if iv.reg]
+    for iv in regs:
+        assert iv.reg not in SCRATCH
+        if iv.crosses_call:
+            assert iv.reg in CALLEE_SAVED
+    for i, x in enumerate(regs):
+        for y in regs[i + 1:]:
+            if x.reg == y.reg:
+                assert x.end < y.start or y.end < x.start, (x, y)
+    slots = [iv.slot for iv in intervals.values() if iv.reg is None]
+    assert len(slots) == len(set(slots))
+    return intervals
+
+
+def test_no_spills_under_low_pressure():
+    alloc = allocate(pressure(6))
+    heavy = alloc.units['func_heavy']
+    assert heavy.spilled == 0 and heavy.saved == []
+
+
+def test_high_pressure_spills_to_frame_slots():
+    em = Emitter()
+    em.instrs = pressure(20)
+    backend = MIPSBackend()
+    out = backend.emit_from_emitter(em)
+    heavy = backend.allocation.units['func_heavy']
+    assert heavy.spilled > 0
+    assert heavy.spill_stores >= heavy.spilled and heavy.spill_loads >= heavy.spilled
+    frame = heavy.frame
+    assert frame.spills == heavy.spilled and f"addi $sp, $sp, -{frame.size}" in out
+    # función hoja: el frame se direcciona desde $sp
+    assert frame.leaf and f"sw $t7, {frame.ref(frame.slot_offset(0))}" in out
+    assert re.search(r"lw \$t[789], \d+\(\$sp\)", out)
+    assert 'func_heavy: 39 temporales' in backend.allocation.report()
+
+
+def test_values_live_across_calls_use_callee_saved_registers():
+    em = Emitter()
+    em.instrs = pressure(5, call=True)
+    backend = MIPSBackend()
+    out = backend.emit_from_emitter(em)
+    heavy = backend.allocation.units['func_heavy']
+    frame = heavy.frame
+    assert heavy.saved == frame.saved == CALLEE_SAVED[:5]
+    # se guardan en el prólogo y se restauran antes de volver
+    for reg in frame.saved:
+        off = frame.saved_offset(reg)
+        assert f"sw {reg}, {off}($fp)" in out and f"lw {reg}, {frame.size + off}($sp)" in out
+
+
+def test_arg_operands_stay_live_until_the_call():
+    tac = [Instr('LABEL', 'func_f'), Instr('LOAD', 't0', 'a'), Instr('ARG', a='t0'),
+           Instr('LOAD', 't1', 'b'), Instr('ARG', a='t1'), Instr('CALL', 't2', 'func_g'),
+           Instr('RET', 't2'), Instr('LABEL', 'end_f')]
+    intervals = check_invariants(build_cfg(tac).function('func_f'))
+    assert intervals['t0'].end == 5 and intervals['t0'].reg != intervals['t1'].reg
+
+
+@pytest.mark.parametrize('n', [8, 16, 30])
+def test_invariants_under_pressure(n):
+    cfg = build_cfg(pressure(n, call=True))
+    check_invariants(cfg.function('func_heavy'))
+
+
+@pytest.mark.parametrize('path', PROGRAMS, ids=os.path.basename)
+def test_invariants_on_mips_programs(path):
+    s = CompilationSession.from_file(path)
+    if s.syntax_errors or not s.analyzed:
+        pytest.skip('el programa no genera TAC')
+    for unit in build_cfg(list(s.emitter.instrs)):
+        check_invariants(unit)
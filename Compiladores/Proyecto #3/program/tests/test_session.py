@@ -0,0 +1,76 @@
+import os
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from session import CompilationSession
+import pytest
+
+from Driver import optimize_flags, run_session
+
+CODE = textwrap.dedent('''
+function inc(x: integer): integer { return x + 1; }
+let a = 10;
+let b = inc(a);
+print(b);
+''')
+
+
+def test_stages_are_computed_once():
+    s = CompilationSession.from_source(CODE)
+    tree = s.tree
+    sem = s.semantic
+    em = s.emitter
+    assert s.syntax_errors == []
+    assert s.tree is tree
+    assert s.semantic is sem
+    assert s.emitter is em
+    assert s.mips() is s.mips()
+
+
+def test_tac_and_mips_share_one_front_end(monkeypatch, capsys):
+    import session as session_mod
+    calls = []
+    original = session_mod.CompiscriptParser.program
+
+    def counting_program(self):
+        calls.append(1)
+        return original(self)
+
+    monkeypatch.setattr(session_mod.CompiscriptParser, 'program', counting_program)
+    s = CompilationSession.from_source(CODE)
+    rc = run_session(s, tac=True, mips=True)
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert len(calls) == 1
+    assert 'CALL func_inc' in out and 'jal func_inc' in out
+
+
+def test_valid_source_parses_with_sll_only():
+    s = CompilationSession.from_source(CODE)
+    assert s.syntax_errors == []
+    assert s.parse_mode == 'SLL'
+
+
+def test_syntax_error_falls_back_to_full_ll():
+    s = CompilationSession.from_source("let a: integer = ;\n")
+    assert s.syntax_errors[0].startswith('[Syntax] line 1:17')
+    assert s.parse_mode == 'LL'
+
+
+def test_run_reports_backend_errors_instead_of_raising(capsys):
+    s = CompilationSession.from_source(CODE, options={'convention': 'foo'})
+    assert run_session(s, simulate=True) == 5
+    assert '[Error] Fallo en la simulación: convención de llamada desconocida: foo' in capsys.readouterr().out
+
+
+def test_pass_flags_are_checked_when_parsed():
+    assert optimize_flags(['-O']) is True
+    assert optimize_flags(['-O', '--no-dce']) == ['constprop', 'copyprop', 'lvn', 'licm', 'ivs', 'strength']
+    assert optimize_flags(['--passes=lvn,dce', '--no-dce']) == ['lvn']
+    assert optimize_flags(['--no-dce']) is None
+    with pytest.raises(ValueError, match='pases desconocidos: typo'):
+        optimize_flags(['--passes=lvn,typo'])
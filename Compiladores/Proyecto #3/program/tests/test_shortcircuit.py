@@ -0,0 +1,84 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+TESTS = os.path.dirname(__file__)
+if TESTS not in sys.path:
+    sys.path.insert(0, TESTS)
+
+import pytest
+
+from session import CompilationSession
+from helpers import tac_of
+
+PROGRAM = '''function f(x: integer): integer {
+    print(x);
+    return x;
+}
+function main(): integer {
+    let a: integer = 0;
+    let b: integer = 3;
+    if (a > 0 && f(1) > 0) { print(100); }
+    if (b > 0 || f(2) > 0) { print(200); }
+    if (!(a == 0) || f(3) > 0 && f(0) > 0) { print(300); }
+    let c: integer = 0;
+    do { c = c + 1; } while (c < 5 && f(c) != 3);
+    let v: integer = a > 0 && f(4) > 0 ? 1 : 2;
+    print(v);
+    while (b > 0 && (a < 0 || f(b) > 1)) { b = b - 1; }
+    return 0;
+}
+'''
+# f(1), f(2) y el f(4) del ternario nunca se evalúan
+EXPECTED = '200' + '30' + '123' + '2' + '321'
+
+
+def test_and_jumps_past_the_operands_it_does_not_need(monkeypatch):
+    assert tac_of("if (a > 0 && b < 2) { print(1); }", monkeypatch) == [
+        't0 = LOAD a', 't1 = t0 GT 0', 'IFZ t1 GOTO L0',
+        't2 = LOAD b', 't3 = t2 LT 2', 'IFZ t3 GOTO L0',
+        'None = PRINT 1', 'GOTO L1', 'L0:', 'L1:',
+    ]
+
+
+def test_or_jumps_into_the_body_on_the_first_true_operand(monkeypatch):
+    assert tac_of("while (a == 1 || !b) { print(1); }", monkeypatch) == [
+        'L0:',
+        't0 = LOAD a', 't1 = t0 NE 1', 'IFZ t1 GOTO L2',
+        't2 = LOAD b', 't3 = t2 EQ 0', 'IFZ t3 GOTO L1',
+        'L2:',
+        'None = PRINT 1', 'GOTO L0', 'L1:',
+    ]
+
+
+def test_do_while_jumps_back_while_true(monkeypatch):
+    tac = tac_of("do { print(1); } while (a < 3);", monkeypatch)
+    assert tac == ['L0:', 'None = PRINT 1', 't0 = LOAD a', 't1 = t0 GE 3', 'IFZ t1 GOTO L0', 'L1:']
+
+
+def test_logical_value_is_zero_or_one(monkeypatch):
+    assert tac_of("let x: boolean = a || b;", monkeypatch) == [
+        't1 = LOAD a', 't2 = t1 EQ 0', 'IFZ t2 GOTO L2',
+        't3 = LOAD b', 'IFZ t3 GOTO L0', 'L2:',
+        't0 = 1', 'GOTO L1', 'L0:', 't0 = 0', 'L1:',
+        'STORE t0 -> x',
+    ]
+
+
+def test_boolean_literals_become_plain_jumps(monkeypatch):
+    assert tac_of("while (true) { print(1); }", monkeypatch) == [
+        'L0:', 'None = PRINT 1', 'GOTO L0', 'L1:',
+    ]
+
+
+@pytest.mark.parametrize('convention', ['registers', 'stack'])
+def test_unneeded_operands_are_never_evaluated(convention):
+    s = CompilationSession.from_source(PROGRAM, options={'convention': convention})
+    assert s.syntax_errors == [] and s.analyzed
+    r = s.simulate()
+    assert r.output == EXPECTED
+    # ninguna condición llega a materializarse con set-on-less-than y compañía
+    assert not {'slt', 'sgt', 'sle', 'sge', 'seq', 'sne'} & set(r.by_opcode)
+    assert r.by_opcode['and'] == r.by_opcode['or'] == 0
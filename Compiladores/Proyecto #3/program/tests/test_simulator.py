@@ -0,0 +1,197 @@
+import glob
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+TESTS = os.path.dirname(__file__)
+if TESTS not in sys.path:
+    sys.path.insert(0, TESTS)
+
+import pytest
+
+from session import CompilationSession
+from codegen.simulator import SimulationError, run_file, run_text, wrap
+from helpers import params_of, run_tac
+
+PROGRAMS = sorted(glob.glob(os.path.join(ROOT, 'tests', 'MIPS', '*', '*.txt')) +
+                  glob.glob(os.path.join(ROOT, 'tests', '*.cps')))
+# programas que el backend todavía no traduce bien (no son fallas del simulador)
+KNOWN = {
+    'Procedimientos-Retornos.txt': 'las variables t1/t2 chocan con los temporales del TAC',
+    'ClassAndObj.txt': 'los métodos de clase no se emiten',
+    'class_ok.cps': 'los métodos de clase no se emiten',
+    'class_bad.cps': 'los métodos de clase no se emiten',
+    'obj_test.cps': 'los métodos de clase no se emiten',
+    'sem_types_ok.cps': 'los literales float se emiten como etiquetas',
+}
+
+LOOP = '''
+.data
+msg: .asciiz "suma="
+xs: .word 3, 4, 5
+.text
+.globl main
+main:
+    la $t0, xs
+    li $t1, 0
+    li $t2, 0
+loop:
+    li $t8, 3
+    slt $t3, $t1, $t8
+    beq $t3, $zero, done
+    lw $t4, 0($t0)
+    add $t2, $t2, $t4
+    addi $t0, $t0, 4
+    addi $t1, $t1, 1
+    j loop
+done:
+    la $a0, msg
+    li $v0, 4
+    syscall
+    move $a0, $t2
+    li $v0, 1
+    syscall
+    li $v0, 10
+    syscall
+'''
+
+FACT = '''function fact(n: integer): integer {
+    if (n <= 1) { return 1; }
+    let m: integer = n - 1;
+    return n * fact(m);
+}
+function main(): integer {
+    let k: integer = 1;
+    while (k < 6) { print(fact(k)); k = k + 1; }
+    return 0;
+}
+'''
+
+
+def test_loop_output_and_counts():
+    r = run_text(LOOP)
+    assert r.output == 'suma=12'
+    # 3 instrucciones de entrada, 4 vueltas de la guarda, 3 del cuerpo completo
+    assert r.by_label == {'main': 3, 'loop': 3 * 8 + 3, 'done': 8}
+    assert r.steps == sum(r.by_label.values()) == sum(r.by_opcode.values())
+    assert r.by_opcode['lw'] == 3 and r.by_opcode['beq'] == 4 and r.by_opcode['j'] == 3
+    assert r.by_function == {'main': r.steps}
+    # cada la se expande a dos instrucciones reales (lui + ori)
+    assert r.machine == r.steps + 2 and r.cycles == r.machine
+
+
+def test_arithmetic_wraps_and_divides_toward_zero():
+    r = run_text('''
+main:
+    li $t0, 2147483647
+    addi $t0, $t0, 1
+    li $t1, -7
+    li $t2, 2
+    div $t1, $t2
+    mflo $t3
+    mfhi $t4
+    sge $t5, $t1, $t2
+    sne $t6, $t1, $t2
+    li $v0, 10
+    syscall
+''')
+    assert r.reg('$t0') == -2 ** 31
+    assert (r.reg('$t3'), r.reg('$t4')) == (-3, -1)
+    assert (r.reg('$t5'), r.reg('$t6')) == (0, 1)
+    assert r.cycles > r.machine  # la división paga su latencia
+
+
+def test_jal_jr_and_falling_off_the_text():
+    r = run_text('''
+.text
+f:
+    sll $v0, $a0, 1
+    jr $ra
+main:
+    li $a0, 21
+    jal f
+    move $a0, $v0
+    li $v0, 1
+    syscall
+''')
+    assert r.output == '42'
+    assert r.by_label == {'f': 2, 'main': 5}
+
+
+def test_errors():
+    with pytest.raises(SimulationError, match='límite'):
+        run_text('main:\n    j main\n', max_steps=100)
+    with pytest.raises(SimulationError, match='no soportada'):
+        run_text('main:\n    frob $t0\n')
+    with pytest.raises(SimulationError, match='desconocida'):
+        run_text('main:\n    j nowhere\n')
+    with pytest.raises(SimulationError, match='división por cero'):
+        run_text('main:\n    div $t0, $t1\n')
+    with pytest.raises(SimulationError, match="etiqueta de entrada 'main'"):
+        run_text('f:\n    jr $ra\n')
+
+TOPLEVEL = '''function g(x: integer): integer { return x + 1; }
+print(g(1));
+print(g(g(3)));
+'''
+
+
+@pytest.mark.parametrize('options', [{}, {'optimize': True, 'peephole': True}, {'convention': 'stack'}],
+                         ids=['base', 'optimize', 'stack'])
+def test_program_without_main_runs_global_code(options):
+    s = CompilationSession.from_source(TOPLEVEL, options=options)
+    assert 'main:' in s.mips() and 'j func_g_skip' in s.mips()
+    assert s.simulate().output == '25'
+
+
+def test_main_return_value_is_the_exit_code():
+    s = CompilationSession.from_source(FACT.replace('return 0;', 'return fact(3) + 1;'))
+    r = s.simulate()
+    assert r.output == '12624120' and r.exit_code == 7
+    assert CompilationSession.from_source(TOPLEVEL).simulate().exit_code == 0
+
+def test_compiled_program_counts_per_function():
+    s = CompilationSession.from_source(FACT)
+    r = s.simulate()
+    assert r.output == '12624120' and s.simulation is r
+    assert set(r.by_function) == {'main', 'func_fact'}
+    assert r.by_opcode['jal'] == 15  # 1+2+3+4+5 llamadas a fact
+    assert r.by_opcode['syscall'] == 6
+
+
+def test_register_convention_runs_fewer_instructions():
+    results = {c: CompilationSession.from_source(FACT, options={'convention': c}).simulate()
+               for c in ('stack', 'registers')}
+    stack, regs = results['stack'], results['registers']
+    assert regs.output == stack.output
+    assert regs.steps < stack.steps
+    assert regs.by_opcode['lw'] + regs.by_opcode['sw'] < stack.by_opcode['lw'] + stack.by_opcode['sw']
+
+
+def test_run_file(tmp_path):
+    path = tmp_path / 'p.s'
+    path.write_text(CompilationSession.from_source(FACT).mips())
+    assert run_file(str(path)).output == '12624120'
+
+
+@pytest.mark.parametrize('path', PROGRAMS, ids=os.path.basename)
+def test_simulated_output_matches_tac(path):
+    name = os.path.basename(path)
+    if name in KNOWN:
+        pytest.skip(KNOWN[name])
+    s = CompilationSession.from_file(path)
+    if s.syntax_errors or not s.analyzed:
+        pytest.skip('el programa no compila')
+    expected = run_tac(list(s.emitter.instrs), s.static_arrays, params=params_of(s))
+    if not isinstance(expected, tuple):
+        pytest.skip(f'el TAC no termina bien ({expected})')
+    prints, variables, result = expected
+    r = s.simulate(max_steps=200000)
+    assert r.output == ''.join(str(x) for x in prints)
+    assert r.exit_code == wrap(result or 0)
+    # globales escalares: las direcciones (arreglos, objetos) dependen de cada máquina
+    scalars = {name: wrap(v) for name, v in variables.items()
+               if type(v) is int and name in r.data_labels and name not in s.static_arrays}
+    assert {name: r.word(name) for name in scalars} == scalars
@@ -0,0 +1,109 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+TESTS = os.path.dirname(__file__)
+if TESTS not in sys.path:
+    sys.path.insert(0, TESTS)
+
+import pytest
+
+from session import CompilationSession
+from codegen.cfg import build_cfg
+from codegen.codegen import CodeGenVisitor
+from codegen.optimize import optimize
+from codegen.tac import Instr
+from helpers import run_tac, tac_of
+
+
+def switch_program(values, default=True):
+    cases = '\n'.join(f'        case {v}: r = {k + 1};' for k, v in enumerate(values))
+    probes = '\n'.join(f'    print(pick({v}));' for v in sorted(set(values) | {0, max(values) + 1}))
+    return f'''function pick(d: integer): integer {{
+    let r: integer = 0;
+    switch (d) {{
+{cases}
+{'        default: r = 77;' if default else ''}
+    }}
+    return r;
+}}
+function main(): integer {{
+{probes}
+    return 0;
+}}
+'''
+
+
+def expected_output(values, default=True):
+    first = {}
+    for k, v in enumerate(values):
+        first.setdefault(v, k + 1)
+    probes = sorted(set(values) | {0, max(values) + 1})
+    return ''.join(str(first.get(v, 77 if default else 0)) for v in probes)
+
+
+DENSE = [3, 4, 5, 6, 8, 9, 10]
+SPARSE = [7, 300, 12, 9000, 45, 1, 640, 2048]
+
+
+@pytest.mark.parametrize('values,strategy', [
+    (DENSE, 'jumptable'),
+    (SPARSE, 'bsearch'),
+    ([5, 900], 'linear'),
+])
+def test_strategy_shows_up_in_the_tac(values, strategy):
+    tac = tac_of(switch_program(values))
+    assert f'sw0_{strategy}:' in tac
+    assert any(line.startswith('JUMPTABLE') for line in tac) == (strategy == 'jumptable')
+
+
+def test_dense_switch_is_one_indexed_jump(monkeypatch):
+    tac = tac_of('switch (x) { case 2: print(1); case 3: print(2); case 5: print(3); case 4: print(4); }',
+                 monkeypatch)
+    assert tac[:4] == ['t0 = LOAD x', 'sw0_jumptable:', 't1 = t0 SUB 2',
+                       'JUMPTABLE t1 [L0,L1,L3,L2] ELSE L4']
+    assert not any(' NE ' in line or ' LT ' in line for line in tac)
+
+
+def test_non_constant_cases_compare_in_order(monkeypatch):
+    tac = tac_of('switch (x) { case y: print(1); case 2: print(2); }', monkeypatch)
+    assert tac[:7] == ['t0 = LOAD x', 'sw0_linear:', 't1 = LOAD y', 't2 = t0 NE t1', 'IFZ t2 GOTO L0',
+                       't3 = t0 NE 2', 'IFZ t3 GOTO L1']
+
+
+@pytest.mark.parametrize('values', [DENSE, SPARSE, [5, 900], [1, 2, 2, 3, 4], [0, 1, 2, 3, 4, 5]])
+@pytest.mark.parametrize('default', [True, False])
+def test_dispatch_reaches_the_right_case(values, default):
+    source = switch_program(values, default)
+    expected = expected_output(values, default)
+    for options in ({}, {'optimize': True, 'peephole': True}, {'convention': 'stack'}):
+        s = CompilationSession.from_source(source, options=options)
+        assert s.simulate().output == expected, options
+
+
+def test_table_and_bsearch_beat_the_compare_chain(monkeypatch):
+    values = list(range(1, 33))
+    source = switch_program(values)
+    steps = {}
+    for name, linear_max, density in [('table', 3, 0.5), ('bsearch', 3, 2.0), ('linear', 100, 0.5)]:
+        monkeypatch.setattr(CodeGenVisitor, 'SWITCH_LINEAR_MAX', linear_max)
+        monkeypatch.setattr(CodeGenVisitor, 'SWITCH_MIN_DENSITY', density)
+        r = CompilationSession.from_source(source).simulate()
+        assert r.output == expected_output(values)
+        steps[name] = r.machine  # instrucciones reales: los saltos con inmediato se expanden
+    assert steps['table'] < steps['bsearch'] < steps['linear']
+
+
+def test_jumptable_edges_and_constant_folding():
+    tac = [Instr('LABEL', 'func_f'), Instr('MOV', 't0', '1'),
+           Instr('JUMPTABLE', 'L9', 't0', '[L0,L1,L0]'),
+           Instr('LABEL', 'L0'), Instr('PRINT', a='1'), Instr('RET'),
+           Instr('LABEL', 'L1'), Instr('PRINT', a='2'), Instr('RET'),
+           Instr('LABEL', 'L9'), Instr('PRINT', a='3'), Instr('RET'), Instr('LABEL', 'end_f')]
+    unit = build_cfg(tac).function('func_f')
+    assert [b.label for b in unit.entry.succs] == ['L0', 'L1', 'L9']
+    opt, _ = optimize(tac)
+    assert [i.a for i in opt if i.op == 'PRINT'] == ['2']
+    assert run_tac(tac[1:-1])[0] == [2]
@@ -0,0 +1,49 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+for p in (ROOT, os.path.join(ROOT, 'benchmarks')):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from session import CompilationSession
+from synth import generate_program, scaled
+from bench_pipeline import compare, fit_exponent
+
+
+def test_generated_programs_are_valid():
+    for n in (1, 2, 3):
+        s = CompilationSession.from_source(scaled(n, seed=n))
+        assert s.syntax_errors == []
+        assert s.semantic_error is None
+        assert 'func_f0:' in str(s.emitter)
+
+
+def test_generator_is_deterministic():
+    assert generate_program(seed=7) == generate_program(seed=7)
+    assert scaled(2) != scaled(3)
+
+
+def test_fit_exponent_recovers_power_law():
+    xs = [10, 20, 40, 80]
+    assert abs(fit_exponent(xs, [x for x in xs]) - 1.0) < 1e-9
+    assert abs(fit_exponent(xs, [x * x for x in xs]) - 2.0) < 1e-9
+
+
+def test_compare_flags_superlinear_regression():
+    base = {'scales': [1, 2], 'phases': {'codegen': {'exponent': 1.0, 'max_ms': 10.0, 'relative': 2.0}}}
+    ok = {'scales': [1, 2], 'phases': {'codegen': {'exponent': 1.1, 'max_ms': 12.0, 'relative': 2.4}}}
+    bad = {'scales': [1, 2], 'phases': {'codegen': {'exponent': 2.0, 'max_ms': 12.0, 'relative': 2.4}}}
+    assert compare(ok, base, 0.25, 3.0) == []
+    assert compare(bad, base, 0.25, 3.0)[0].startswith('codegen: exponente')
+
+
+def test_compare_uses_time_relative_to_calibration():
+    base = {'scales': [1, 2], 'phases': {'codegen': {'exponent': 1.0, 'max_ms': 10.0, 'relative': 2.0}}}
+    # máquina 10 veces más lenta: los ms crecen, el tiempo relativo no
+    slow = {'scales': [1, 2], 'phases': {'codegen': {'exponent': 1.0, 'max_ms': 100.0, 'relative': 2.1}}}
+    worse = {'scales': [1, 2], 'phases': {'codegen': {'exponent': 1.0, 'max_ms': 10.0, 'relative': 7.0}}}
+    assert compare(slow, base, 0.25, 3.0) == []
+    assert 'calibraciones' in compare(worse, base, 0.25, 3.0)[0]
+    old = {'scales': [1, 2], 'phases': {'codegen': {'exponent': 1.0, 'max_ms': 10.0}}}
+    assert 'update-baseline' in compare(slow, old, 0.25, 3.0)[0]
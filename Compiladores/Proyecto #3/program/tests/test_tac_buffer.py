@@ -0,0 +1,44 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from codegen.tac import Emitter, Instr, InstrBuffer
+
+
+def test_buffer_round_trips_instructions():
+    em = Emitter()
+    em.emit('LOAD', dst='t0', a='x')
+    em.emit('ADD', dst='t1', a='t0', b='1')
+    em.emit('PRINT', a='t1')
+    assert list(em.instrs) == [Instr('LOAD', 't0', 'x'), Instr('ADD', 't1', 't0', '1'),
+                               Instr('PRINT', None, 't1')]
+    assert em.instrs[-1].op == 'PRINT'
+    assert str(em) == "t0 = LOAD x\nt1 = t0 ADD 1\nNone = PRINT t1"
+
+
+def test_operands_and_opcodes_are_interned():
+    buf = InstrBuffer()
+    for _ in range(100):
+        buf.add('ADD', 't0', 't0', '1')
+    assert len(buf) == 100
+    assert len(buf._operands) == 3  # None, 't0', '1'
+    assert buf.nbytes() == 100 * (1 + 3 * 4)
+
+
+def test_views_are_copies_and_setitem_writes_back():
+    buf = InstrBuffer([Instr('GOTO', 'L0')])
+    view = buf[0]
+    view.dst = 'L9'
+    assert buf[0].dst == 'L0'
+    buf[0] = Instr('FOO', 'L1')  # opcode nuevo se registra al vuelo
+    assert buf[0] == Instr('FOO', 'L1')
+
+
+def test_assigning_a_list_recompacts():
+    em = Emitter()
+    em.instrs = [Instr('LABEL', 'L0'), Instr('GOTO', 'L0')]
+    assert isinstance(em.instrs, InstrBuffer)
+    assert [i.op for i in em.instrs] == ['LABEL', 'GOTO']